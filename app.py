@@ -1,20 +1,19 @@
 import logging
+import os
 from pathlib import Path
 
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
-from PIL import Image
 
-from src.analysis import analyze_sentiment, calculate_volatility
-from src.charts import (
-    create_line_chart_figure,
-    create_relative_returns_figure,
-    create_sentiment_chart_figure,
-)
-
-# Import custom modules
-from src.data import get_stock_data, get_stock_news
+# Import custom modules. The data layer, analytics and VADER are only imported
+# by the views that need them, keeping cold start and first paint fast.
+from src.cache import NEWS_TTL_SECONDS, PRICE_TTL_SECONDS, interval_for_period
+from src.instrumentation import annotate, get_recorder, span
+from src.memo import SessionCache, time_bucket
+from src.prefetch import PREFETCH_ENABLED, PrefetchScheduler
+from src.providers import INTRADAY_INTERVALS
+from src.stream import STREAM_POLL_SECONDS, QuoteStream
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +22,46 @@ logger = logging.getLogger(__name__)
 # Configuration
 PAGE_TITLE = "Intelligence Flux: Finance Edition"
 PAGE_ICON = ":chart_with_upwards_trend:"
+# History horizons offered in the sidebar; long ones are read from the
+# weekly/monthly tiers stored next to the daily bars
+PERIODS = ["1mo", "3mo", "6mo", "ytd", "1y", "2y", "5y", "10y", "max"]
+DEFAULT_PERIOD = "2y"
+TIER_NAMES = {"1wk": "weekly", "1mo": "monthly"}
+# Daily history the sentiment view charts headlines against
+SENTIMENT_PERIOD = "3mo"
+
+# Dashboard views; only the selected one is computed on each rerun
+VIEWS = [
+    "Project Overview",
+    "Market Dynamics",
+    "Portfolio Construction",
+    "Sentiment Intelligence",
+]
+
+# Hidden Diagnostics view: enable with STOCK_DIAGNOSTICS=1 or ?diagnostics=1
+DIAGNOSTICS_VIEW = "Diagnostics"
+DIAGNOSTICS_ENABLED = os.environ.get("STOCK_DIAGNOSTICS", "0") == "1"
+
+TICKER_UNIVERSE = [
+    "AAPL",
+    "TSLA",
+    "MSFT",
+    "GOOGL",
+    "AMZN",
+    "META",
+    "BABA",
+    "WMT",
+    "GE",
+    "JPM",
+    "TSM",
+    "CMCSA",
+    "CVX",
+    "PG",
+    "BA",
+    "INTC",
+    "CSCO",
+    "PFE",
+]
 
 st.set_page_config(
     page_title=PAGE_TITLE,
@@ -63,6 +102,19 @@ def load_css(file_path: Path) -> None:
             st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
 
+@st.cache_resource
+def start_prefetcher() -> PrefetchScheduler:
+    """Starts one background prefetch thread per server process."""
+    return PrefetchScheduler(TICKER_UNIVERSE, period=DEFAULT_PERIOD).start()
+
+
+def get_session_cache() -> SessionCache:
+    """Returns this session's memo of downloaded data, analytics and figures."""
+    if "memo" not in st.session_state:
+        st.session_state["memo"] = SessionCache()
+    return st.session_state["memo"]
+
+
 def render_header() -> None:
     st.markdown(
         """
@@ -84,76 +136,57 @@ def render_sidebar():
         st.caption("Configuring high-fidelity signals.")
         st.markdown("---")
 
-        tickers = [
-            "AAPL",
-            "TSLA",
-            "MSFT",
-            "GOOGL",
-            "AMZN",
-            "META",
-            "BABA",
-            "WMT",
-            "GE",
-            "JPM",
-            "TSM",
-            "CMCSA",
-            "CVX",
-            "PG",
-            "BA",
-            "INTC",
-            "CSCO",
-            "PFE",
-        ]
-        selected = st.multiselect("Select Assets", tickers, default=["MSFT", "TSLA"])
+        selected = st.multiselect(
+            "Select Assets", TICKER_UNIVERSE, default=["MSFT", "TSLA"]
+        )
+        period = st.select_slider(
+            "History", PERIODS, value=DEFAULT_PERIOD, key="period"
+        )
+
+        if st.button("Refresh Signals"):
+            get_session_cache().invalidate()
 
         st.markdown("---")
         st.caption("Environment: Intelligence Flux V3.0")
         st.caption("Aesthetic: Soft Rose / Sky")
-    return selected
+    return selected, period
 
 
-def render_metrics(selected_tickers, stocks_df):
+def render_metrics(selected_tickers, snapshot):
     """
     Renders metric cards for selected tickers.
 
     Args:
         selected_tickers (list): List of ticker symbols.
-        stocks_df (pd.DataFrame): Stock data DataFrame.
+        snapshot (MarketSnapshot | QuoteSnapshot): Precomputed analytics or
+            live intraday quotes for the tickers.
     """
-    if stocks_df is None or stocks_df.empty:
+    if snapshot is None:
         return
 
     try:
         cols = st.columns(len(selected_tickers))
         for i, ticker in enumerate(selected_tickers):
             try:
-                # Check if ticker exists in columns
-                if ticker not in stocks_df.columns:
+                # Check if ticker exists in the snapshot
+                col = snapshot.index_of(ticker)
+                if col is None:
                     cols[i % len(cols)].metric(ticker, "N/A", "Data unavailable")
                     continue
 
-                # Access ticker data
-                ticker_data = stocks_df[ticker]
-
                 # Check if we have enough data
-                if len(ticker_data) < 2:
+                if snapshot.observations[col] < 2:
                     cols[i % len(cols)].metric(ticker, "N/A", "Insufficient data")
                     continue
 
-                # Check if Close column exists
-                if "Close" not in ticker_data.columns:
-                    cols[i % len(cols)].metric(ticker, "N/A", "No price data")
-                    continue
-
-                latest_price = ticker_data["Close"].iloc[-1]
-                prev_price = ticker_data["Close"].iloc[-2]
+                latest_price = snapshot.last_price[col]
+                delta = snapshot.delta_pct[col]
 
                 # Handle NaN values
-                if pd.isna(latest_price) or pd.isna(prev_price):
+                if pd.isna(latest_price) or pd.isna(delta):
                     cols[i % len(cols)].metric(ticker, "N/A", "Invalid data")
                     continue
 
-                delta = (latest_price - prev_price) / prev_price * 100
                 cols[i % len(cols)].metric(
                     ticker, f"${latest_price:.2f}", f"{delta:.2f}%"
                 )
@@ -173,22 +206,123 @@ def main():
     if not validate_environment():
         return
 
+    if PREFETCH_ENABLED:
+        start_prefetcher()
+
     load_css(CSS_FILE)
     render_header()
 
-    selected_tickers = render_sidebar()
+    selected_tickers, period = render_sidebar()
+    views = list(VIEWS)
+    if DIAGNOSTICS_ENABLED or st.query_params.get("diagnostics") == "1":
+        views.append(DIAGNOSTICS_VIEW)
+
+    # Only the selected view is computed; st.tabs would run every tab's body
+    # (price load, news fetch, sentiment scoring) on each rerun
+    view = st.segmented_control(
+        "View", views, default=views[0], key="view", label_visibility="collapsed"
+    )
+    view = view or views[0]
+
+    if view == DIAGNOSTICS_VIEW:
+        render_diagnostics(st.session_state.get("last_run"))
+        return
+
+    with span("app:run", view=view, tickers=len(selected_tickers)) as run_span:
+        render_dashboard(view, selected_tickers, period)
+    st.session_state["last_run"] = run_span
+
+
+def render_dashboard(view, selected_tickers, period=DEFAULT_PERIOD):
+    """
+    Renders one view of the dashboard for the selected tickers.
 
+    Args:
+        view (str): One of ``VIEWS``.
+        selected_tickers (list): List of ticker symbols.
+        period (str): History period, one of ``PERIODS``.
+    """
     if len(selected_tickers) < 2:
         st.warning("Please select at least 2 assets to initiate analysis.")
         return
 
-    # Load data
+    if view == "Market Dynamics":
+        render_market_dynamics(selected_tickers, period)
+    elif view == "Portfolio Construction":
+        render_portfolio(selected_tickers, period)
+    elif view == "Sentiment Intelligence":
+        render_sentiment(selected_tickers)
+    else:
+        render_overview()
+
+
+def memo_figure(name, key, build, ttl):
+    """
+    Returns a figure from the session memo, else from the shared cache (built
+    once across sessions and replicas), else from ``build``.
+
+    Args:
+        name (str): Figure name, e.g. "line".
+        key (tuple): Memo key suffix identifying the figure's data.
+        build (callable): Zero-argument figure builder.
+        ttl (float): Seconds the figure is shared for.
+    """
+    from src.charts import get_or_build_figure
+
+    return get_session_cache().get_or_compute(
+        (f"figure:{name}", *key),
+        lambda: get_or_build_figure(name, key, build, ttl),
+    )
+
+
+def render_chart(name, fig):
+    """
+    Renders a figure in a ``render:chart:<name>`` span, recording its trace
+    count and the size of the JSON sent to the browser.
+    """
+    from src.charts import figure_to_json
+
+    with span(f"render:chart:{name}"):
+        annotate(rows=len(fig.data), bytes=len(figure_to_json(fig)))
+        st.plotly_chart(fig, width="stretch")
+
+
+def price_memo_key(selected_tickers, period):
+    """Memo key suffix: prices are reused until the selection or data changes."""
+    return (tuple(selected_tickers), period, time_bucket(PRICE_TTL_SECONDS))
+
+
+def load_market_data(selected_tickers, period=DEFAULT_PERIOD):
+    """
+    Loads prices and the analytics snapshot, reporting failures in the page.
+
+    Long periods are read from the weekly or monthly tier (see
+    ``interval_for_period``), so they cost about as many bars as two years of
+    daily history.
+
+    Args:
+        selected_tickers (list): List of ticker symbols.
+        period (str): History period, one of ``PERIODS``.
+
+    Returns:
+        tuple: (price_store, snapshot, price_key), or None if no data.
+    """
+    from src.analysis import compute_market_snapshot
+    from src.data import get_price_store
+
+    memo = get_session_cache()
+    price_key = price_memo_key(selected_tickers, period)
     ticker_string = " ".join(selected_tickers)
 
     with st.spinner("Synchronizing with market data stream..."):
-        stocks_df = get_stock_data(ticker_string)
+        price_store = memo.get_or_compute(
+            ("prices", *price_key),
+            lambda: get_price_store(
+                ticker_string, period=period, interval=interval_for_period(period)
+            ),
+        )
 
-    if stocks_df is None:
+    if price_store is None:
         st.error(
             """
             **Terminal Error: Could not synchronize with market data stream.**
@@ -202,9 +336,9 @@ def main():
             Please try again in a few moments or select different tickers.
             """
         )
-        return
+        return None
 
-    if stocks_df.empty:
+    if price_store.empty:
         tickers_str = ", ".join(selected_tickers)
         st.error(
             f"""
@@ -216,75 +350,326 @@ def main():
             - Your internet connection is stable
             """
         )
+        return None
+
+    # One vectorized analytics pass shared by metrics, volatility and charts
+    snapshot = memo.get_or_compute(
+        ("snapshot", *price_key),
+        lambda: compute_market_snapshot(price_store, selected_tickers),
+    )
+    return price_store, snapshot, price_key
+
+
+def render_market_dynamics(selected_tickers, period=DEFAULT_PERIOD):
+    """
+    Renders metrics, volatility and the price/return charts.
+
+    Args:
+        selected_tickers (list): List of ticker symbols.
+        period (str): History period, one of ``PERIODS``.
+    """
+    from src.charts import create_line_chart_figure, create_relative_returns_figure
+
+    market = load_market_data(selected_tickers, period)
+    if market is None:
+        return
+    price_store, snapshot, price_key = market
+    if price_store.interval != "1d":
+        st.caption(
+            f"{period} history is shown as {TIER_NAMES[price_store.interval]} "
+            "bars: changes are per bar and volatility is annualized from them."
+        )
+
+    # Live mode swaps the daily metrics for intraday quotes refreshed by a
+    # fragment, so the daily charts below are not rerun on every tick
+    if st.toggle("Live intraday quotes", key="live"):
+        interval = st.segmented_control(
+            "Bar interval", list(INTRADAY_INTERVALS), default="1m", key="interval"
+        )
+        render_live_quotes(selected_tickers, interval or "1m", price_store)
+    else:
+        render_metrics(selected_tickers, snapshot)
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    fig_line = memo_figure(
+        "line",
+        price_key,
+        lambda: create_line_chart_figure(selected_tickers, price_store, snapshot),
+        PRICE_TTL_SECONDS,
+    )
+    if fig_line:
+        render_chart("line", fig_line)
+
+    st.markdown("---")
+
+    st.markdown("### Risk Velocity (Volatility Analysis)")
+    v_cols = st.columns(len(selected_tickers))
+    for i, ticker in enumerate(selected_tickers):
+        col = snapshot.index_of(ticker) if snapshot else None
+        if col is not None:
+            vol = snapshot.volatility[col]
+            v_cols[i % len(v_cols)].metric(f"{ticker} Volatility", f"{vol:.2f}%")
+
+    st.markdown("---")
+
+    fig_returns = memo_figure(
+        "returns",
+        price_key,
+        lambda: create_relative_returns_figure(selected_tickers, price_store, snapshot),
+        PRICE_TTL_SECONDS,
+    )
+    if fig_returns:
+        render_chart("returns", fig_returns)
+
+
+@st.fragment(run_every=STREAM_POLL_SECONDS)
+def render_live_quotes(selected_tickers, interval, price_store):
+    """
+    Polls the intraday stream and renders live metrics and the session chart.
+
+    Reruns on its own every ``STREAM_POLL_SECONDS``: each tick appends only the
+    new bars and refreshes the chart's data in place, without reloading daily
+    history or rerunning the rest of the page.
+
+    Args:
+        selected_tickers (list): List of ticker symbols.
+        interval (str): Bar length, "1m" or "5m".
+        price_store (PriceStore): Daily history, for day-change references.
+    """
+    from src.charts import create_intraday_figure, update_intraday_figure
+
+    memo = get_session_cache()
+    key = (tuple(selected_tickers), interval)
+
+    with span("app:tick", interval=interval, tickers=len(selected_tickers)):
+        # Not keyed on the data version: the stream keeps appending bars
+        stream = memo.get_or_compute(
+            ("stream", *key),
+            lambda: QuoteStream(selected_tickers, interval, daily=price_store),
+        )
+        stream.poll()
+        quotes = stream.quotes()
+        render_metrics(selected_tickers, quotes)
+
+        fig = memo.get_or_compute(
+            ("figure:intraday", *key), lambda: create_intraday_figure(stream)
+        )
+        update_intraday_figure(fig, stream)
+        render_chart("intraday", fig)
+
+    if quotes.updated_at is not None:
+        st.caption(
+            f"Last {interval} bar {quotes.updated_at:%H:%M} UTC · "
+            f"{stream.buffer.size} bars this session"
+        )
+
+
+def render_portfolio(selected_tickers, period=DEFAULT_PERIOD):
+    """
+    Renders the correlation heatmap and portfolio weights for the selection.
+
+    Args:
+        selected_tickers (list): List of ticker symbols.
+        period (str): History period, one of ``PERIODS``.
+    """
+    from src.charts import create_correlation_heatmap_figure
+    from src.portfolio import PortfolioModel
+
+    market = load_market_data(selected_tickers, period)
+    if market is None or market[1] is None:
+        return
+    price_store, snapshot, price_key = market
+    memo = get_session_cache()
+
+    # Not keyed on the data version: the model is synced with each new
+    # snapshot, applying only the days that entered or left the window
+    model = memo.get_or_compute(
+        ("portfolio", tuple(snapshot.tickers), period),
+        lambda: PortfolioModel(
+            snapshot.tickers, periods_per_year=price_store.bars_per_year
+        ),
+    )
+    model.sync(snapshot.dates, snapshot.returns)
+
+    fig_corr = memo_figure(
+        "correlation",
+        price_key,
+        lambda: create_correlation_heatmap_figure(
+            model.tickers, model.correlation(), snapshot.interval
+        ),
+        PRICE_TTL_SECONDS,
+    )
+    if fig_corr:
+        render_chart("correlation", fig_corr)
+
+    st.markdown("---")
+    st.markdown("### Allocation Engine")
+
+    # Weights come from the model's cached factorization, so switching
+    # methods only costs a few matrix-vector products
+    method = st.radio("Weighting", ["Risk parity", "Minimum variance"], horizontal=True)
+    if method == "Minimum variance":
+        long_only = st.toggle("Long only", value=True)
+        weights = model.min_variance_weights(long_only=long_only)
+    else:
+        weights = model.risk_parity_weights()
+
+    equal = [1 / len(model.tickers)] * len(model.tickers)
+    volatility = model.volatility(weights)
+    st.metric(
+        "Portfolio Volatility",
+        f"{volatility:.2f}%",
+        f"{volatility - model.volatility(equal):.2f}% vs equal weight",
+        delta_color="inverse",
+    )
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "ticker": model.tickers,
+                "weight_pct": weights * 100,
+                "risk_share_pct": model.risk_contributions(weights) * 100,
+            }
+        ),
+        width="stretch",
+        hide_index=True,
+    )
+
+
+def render_sentiment(selected_tickers):
+    """
+    Fetches news and renders the sentiment charts and headline table.
+
+    Args:
+        selected_tickers (list): List of ticker symbols.
+    """
+    from src.analysis import analyze_sentiment
+    from src.charts import create_sentiment_chart_figure, create_sentiment_price_figure
+    from src.data import get_stock_data, get_stock_news
+    from src.sentiment import align_returns, daily_sentiment
+
+    memo = get_session_cache()
+    news_key = (tuple(selected_tickers), time_bucket(NEWS_TTL_SECONDS))
+
+    st.markdown("### Neural Sentiment Stream")
+    news_df = memo.get_or_compute(
+        ("news", *news_key), lambda: get_stock_news(selected_tickers)
+    )
+    if news_df.empty:
+        st.info("Digital Silence: No recent signals found for selected assets.")
         return
 
-    # Layout
-    tab1, tab2, tab3 = st.tabs(
-        ["Project Overview", "Market Dynamics", "Sentiment Intelligence"]
+    sentiment_df = memo.get_or_compute(
+        ("sentiment", *news_key), lambda: analyze_sentiment(news_df)
     )
 
-    with tab2:
-        render_metrics(selected_tickers, stocks_df)
-        st.markdown("<br>", unsafe_allow_html=True)
+    # Decayed per-day sentiment, shared by both charts
+    panel = memo.get_or_compute(
+        ("sentiment:daily", *news_key), lambda: daily_sentiment(sentiment_df)
+    )
 
-        col_left, col_right = st.columns([2, 1])
+    fig_sentiment = memo_figure(
+        "sentiment",
+        news_key,
+        lambda: create_sentiment_chart_figure(sentiment_df, panel),
+        NEWS_TTL_SECONDS,
+    )
+    if fig_sentiment:
+        render_chart("sentiment", fig_sentiment)
 
-        fig_line = create_line_chart_figure(selected_tickers, stocks_df)
-        if fig_line:
-            st.plotly_chart(fig_line, width="stretch")
+    price_key = price_memo_key(selected_tickers, SENTIMENT_PERIOD)
+    stocks_df = memo.get_or_compute(
+        ("prices:frame", *price_key),
+        lambda: get_stock_data(" ".join(selected_tickers), period=SENTIMENT_PERIOD),
+    )
+    if stocks_df is not None and panel is not None:
+        fig_price = memo_figure(
+            "sentiment:price",
+            (*news_key, *price_key[1:]),
+            lambda: create_sentiment_price_figure(
+                selected_tickers, align_returns(panel, stocks_df)
+            ),
+            NEWS_TTL_SECONDS,
+        )
+        if fig_price:
+            render_chart("sentiment:price", fig_price)
 
-        st.markdown("---")
+    st.markdown("#### Signal Intelligence Preview")
+    st.dataframe(
+        sentiment_df[["symbol", "title", "sentiment_score", "url"]].head(15),
+        width="stretch",
+    )
 
-        st.markdown("### Risk Velocity (Volatility Analysis)")
-        v_cols = st.columns(len(selected_tickers))
-        for i, ticker in enumerate(selected_tickers):
-            if ticker in stocks_df.columns:
-                vol = calculate_volatility(stocks_df[ticker]["Close"])
-                v_cols[i % len(v_cols)].metric(f"{ticker} Volatility", f"{vol:.2f}%")
 
-        st.markdown("---")
+def render_overview():
+    if IMAGE_FILE.exists():
+        from PIL import Image
 
-        fig_returns = create_relative_returns_figure(selected_tickers, stocks_df)
-        if fig_returns:
-            st.plotly_chart(fig_returns, width="stretch")
-
-    with tab3:
-        st.markdown("### Neural Sentiment Stream")
-        news_df = get_stock_news(selected_tickers)
-        if not news_df.empty:
-            sentiment_df = analyze_sentiment(news_df)
-
-            fig_sentiment = create_sentiment_chart_figure(sentiment_df)
-            if fig_sentiment:
-                st.plotly_chart(fig_sentiment, width="stretch")
-
-            st.markdown("#### Signal Intelligence Preview")
-            st.dataframe(
-                sentiment_df[["symbol", "title", "sentiment_score", "url"]].head(15),
-                width="stretch",
-            )
-        else:
-            st.info("Digital Silence: No recent signals found for selected assets.")
-
-    with tab1:
-        if IMAGE_FILE.exists():
-            image = Image.open(IMAGE_FILE)
-            st.image(image, width="stretch")
+        image = Image.open(IMAGE_FILE)
+        st.image(image, width="stretch")
 
-        st.markdown(
-            """
-        ### Strategic Overview
-        This project showcases high-fidelity financial analysis techniques using Python.
-        Utilizing `yfinance`, `Plotly`, `Streamlit`, and `VaderSentiment` to deconstruct
-        market data and news cycles.
-
-        ### Methodology
-        - **Market Dynamics:** Historical price trends and realized volatility metrics.
-        - **Sentiment Flux:** Natural Language Processing (NLP) applied to live news
-          feeds for ticker-specific resonance.
-        - **Aesthetic:** Driven by the Intelligence Flux design system (Soft Rose/Sky).
+    st.markdown(
         """
-        )
+    ### Strategic Overview
+    This project showcases high-fidelity financial analysis techniques using Python.
+    Utilizing `yfinance`, `Plotly`, `Streamlit`, and `VaderSentiment` to deconstruct
+    market data and news cycles.
+
+    ### Methodology
+    - **Market Dynamics:** Historical price trends and realized volatility metrics.
+    - **Portfolio Construction:** Return correlations with minimum-variance and
+      risk-parity allocations.
+    - **Sentiment Flux:** Natural Language Processing (NLP) applied to live news
+      feeds for ticker-specific resonance.
+    - **Aesthetic:** Driven by the Intelligence Flux design system (Soft Rose/Sky).
+    """
+    )
+
+
+def render_diagnostics(run_span):
+    """
+    Renders per-stage timings for the last dashboard run and process totals.
+
+    Args:
+        run_span (Span): Root span of this session's last run, or None.
+    """
+    recorder = get_recorder()
+    st.markdown("### Pipeline Diagnostics")
+    if run_span is None:
+        st.caption("Open another view to record a run.")
+    else:
+        view = run_span.attrs.get("view")
+        st.caption(f"Last run ({view}) took {run_span.duration * 1000:.1f} ms")
+
+    trace = [
+        {
+            "stage": "\u00a0\u00a0" * depth + child.stage,
+            "ms": child.duration * 1000,
+            "cache": child.cache,
+            "rows": child.rows,
+            "bytes": child.bytes,
+            "thread": child.thread,
+        }
+        for depth, child in (recorder.trace(run_span.span_id) if run_span else [])
+    ]
+    if trace:
+        st.dataframe(pd.DataFrame(trace), width="stretch", hide_index=True)
+
+    st.markdown("#### Totals since start")
+    st.dataframe(pd.DataFrame(recorder.summary()), width="stretch", hide_index=True)
+
+    col_json, col_prom = st.columns(2)
+    col_json.download_button(
+        "Export spans (JSON)",
+        recorder.to_json(),
+        file_name="spans.json",
+        mime="application/json",
+    )
+    col_prom.download_button(
+        "Export metrics (Prometheus)",
+        recorder.to_prometheus(),
+        file_name="metrics.prom",
+        mime="text/plain",
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,448 @@
+"""
+Offline benchmark suite for the data -> analysis -> chart pipeline.
+
+Runs on the deterministic FixtureProvider, so no network access is needed:
+    python -m benchmarks.run              # full grid, compared to the baseline
+    python -m benchmarks.run --quick      # small grid for a fast local check
+    python -m benchmarks.run --save       # record a new baseline
+
+Every case is timed over several repeats and its median compared with
+benchmarks/baseline.json. Cases slower than the baseline by more than the
+tolerance are reported as regressions and the run exits with status 1.
+Baselines are machine specific; record them on the machine used for review.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Isolate the benchmark from the user's caches and background threads
+os.environ["STOCK_DATA_PROVIDER"] = "fixture"
+os.environ["STOCK_PREFETCH_ENABLED"] = "0"
+os.environ.setdefault("STOCK_CACHE_DIR", tempfile.mkdtemp(prefix="stock-bench-"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from src import analysis, data  # noqa: E402
+from src.analysis import (  # noqa: E402
+    analyze_sentiment,
+    calculate_volatility,
+    compute_market_snapshot,
+)
+from src.archive import PriceArchive, build_archive  # noqa: E402
+from src.cache import get_price_cache, interval_for_period, period_start  # noqa: E402
+from src.charts import (  # noqa: E402
+    create_line_chart_figure,
+    create_relative_returns_figure,
+    create_sentiment_chart_figure,
+    figure_from_json,
+    figure_to_json,
+)
+from src.lexicon import score_compound  # noqa: E402
+from src.portfolio import PortfolioModel  # noqa: E402
+from src.providers import FixtureProvider, set_provider  # noqa: E402
+from src.sentiment import (  # noqa: E402
+    align_returns,
+    daily_sentiment,
+    lagged_correlations,
+)
+from src.stream import QuoteStream  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT / "app.py"
+
+# Modules only the views load; importing app.py must not pull them in
+APP_DEFERRED_MODULES = ("src.data", "src.lexicon", "vaderSentiment")
+
+# Fixed end date so every run sees the same synthetic history
+FIXTURE_END = "2026-10-16"
+
+# Grid of universe sizes and history lengths ("max" is ~30y of fixture data)
+TICKER_COUNTS = (2, 10, 50, 200, 500)
+HISTORIES = ("1y", "5y", "10y", "max")
+QUICK_TICKER_COUNTS = (2, 50)
+QUICK_HISTORIES = ("1y", "10y")
+
+# Selection sizes for the end-to-end app cases (limited to the app universe)
+APP_TICKER_COUNTS = (2, 18)
+
+# Session lengths (bars already held) for the streaming tick case
+STREAM_HISTORY_BARS = (100, 3000)
+
+# Differences below this many seconds are treated as noise
+NOISE_FLOOR = 0.002
+
+
+def synthetic_tickers(n_tickers):
+    return [f"T{i:03d}" for i in range(n_tickers)]
+
+
+def time_case(func, repeat):
+    """
+    Times a zero-argument callable after one warm-up call.
+
+    Returns:
+        dict: Median and minimum wall time in seconds.
+    """
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {"median": statistics.median(samples), "min": min(samples)}
+
+
+def pipeline_cases(n_tickers, period):
+    """
+    Builds the price pipeline cases for one universe size and history length.
+
+    Inputs for each stage are prepared up front so a case only times its own
+    stage.
+
+    Returns:
+        dict: Case name -> zero-argument callable.
+    """
+    tickers = synthetic_tickers(n_tickers)
+    ticker_string = " ".join(tickers)
+    stocks_df = data.get_stock_data(ticker_string, period=period, use_cache=False)
+    store = data.get_price_store(ticker_string, period=period, use_cache=False)
+    snapshot = compute_market_snapshot(store, tickers)
+    closes = [stocks_df[ticker]["Close"].dropna() for ticker in tickers]
+
+    # Incremental case: one day enters and leaves a model synced to the rest
+    model = PortfolioModel.from_snapshot(snapshot)
+    head_dates, head_returns = snapshot.dates[:-1], snapshot.returns[:-1]
+    model.sync(head_dates, head_returns)
+
+    # What another session pays for a line chart found in the shared cache
+    line_json = figure_to_json(create_line_chart_figure(tickers, store, snapshot))
+
+    # Reads from the on-disk cache (filled by the warm-up call): daily bars
+    # versus the tier the app picks for the period
+    interval = interval_for_period(period)
+
+    return {
+        "get_stock_data": lambda: data.get_stock_data(
+            ticker_string, period=period, use_cache=False
+        ),
+        "get_price_store": lambda: data.get_price_store(
+            ticker_string, period=period, use_cache=False
+        ),
+        "load_cached_daily": lambda: data.get_price_store(ticker_string, period=period),
+        "load_cached_tier": lambda: data.get_price_store(
+            ticker_string, period=period, interval=interval
+        ),
+        "calculate_volatility": lambda: [calculate_volatility(c) for c in closes],
+        "compute_market_snapshot": lambda: compute_market_snapshot(store, tickers),
+        "create_line_chart_figure": lambda: create_line_chart_figure(
+            tickers, store, snapshot
+        ),
+        "create_relative_returns_figure": lambda: create_relative_returns_figure(
+            tickers, store, snapshot
+        ),
+        "line_chart_from_json": lambda: figure_from_json(line_json),
+        "portfolio_build": lambda: PortfolioModel.from_snapshot(snapshot),
+        "portfolio_append_day": lambda: (
+            model.sync(snapshot.dates, snapshot.returns),
+            model.sync(head_dates, head_returns),
+        ),
+    }
+
+
+def archive_cases(n_tickers):
+    """
+    Builds the archive case for one universe size: a two-ticker, one-year
+    slice of a full-history archive, whose cost should not grow with the
+    universe.
+
+    Returns:
+        dict: Case name -> zero-argument callable.
+    """
+    tickers = synthetic_tickers(n_tickers)
+    data.get_price_store(" ".join(tickers), period="max")
+    directory = Path(os.environ["STOCK_CACHE_DIR"]) / f"archive-{n_tickers}"
+    build_archive(directory, tickers, get_price_cache())
+    archive = PriceArchive(directory)
+    start = period_start("1y", now=pd.Timestamp(FIXTURE_END))
+    return {"archive_slice": lambda: archive.store(tickers[:2], start)}
+
+
+def news_cases(n_tickers):
+    """
+    Builds the news cases for one universe size (they do not depend on history).
+
+    Returns:
+        dict: Case name -> zero-argument callable.
+    """
+    tickers = synthetic_tickers(n_tickers)
+    news_df = data.get_stock_news(tickers)
+    news_df = news_df.drop(columns="sentiment_score")
+    sentiment_df = analyze_sentiment(news_df)
+    # A historical headline archive: 100 distinct variants of each title
+    archive_titles = [
+        f"{title} ({i})" for i in range(100) for title in news_df["title"]
+    ]
+
+    # Two years of scored headlines, three per ticker and weekday, and the
+    # daily prices a sentiment/return study joins them to
+    days = pd.bdate_range(end=FIXTURE_END, periods=2 * 252, tz="UTC")
+    rng = np.random.default_rng(0)
+    n_news = len(days) * n_tickers * 3
+    history_df = pd.DataFrame(
+        {
+            "symbol": np.tile(np.repeat(tickers, 3), len(days)),
+            "publishedAt": np.repeat(days, n_tickers * 3)
+            + pd.to_timedelta(rng.integers(0, 86400, n_news), unit="s"),
+            "sentiment_score": rng.uniform(-1, 1, n_news).round(4),
+        }
+    )
+    stocks_df = data.get_stock_data(" ".join(tickers), period="2y")
+    panel = daily_sentiment(history_df)
+    aligned = align_returns(panel, stocks_df)
+
+    def score_cold():
+        # Measure real scoring work, not the headline score cache
+        analysis._sentiment_cache.clear()
+        return analyze_sentiment(news_df)
+
+    return {
+        "analyze_sentiment": score_cold,
+        "score_headline_archive": lambda: score_compound(archive_titles),
+        "daily_sentiment": lambda: daily_sentiment(history_df),
+        "align_returns": lambda: align_returns(panel, stocks_df),
+        "lagged_correlations": lambda: lagged_correlations(aligned),
+        "create_sentiment_chart_figure": lambda: create_sentiment_chart_figure(
+            sentiment_df
+        ),
+    }
+
+
+def stream_cases(n_tickers):
+    """
+    Builds the streaming case: one new 1m bar per ticker pushed into a stream
+    holding a short or a long session, then the live quotes read back. The
+    cost should not depend on the session length.
+
+    Returns:
+        dict: Case name -> zero-argument callable.
+    """
+    tickers = synthetic_tickers(n_tickers)
+    cases = {}
+    for n_bars in STREAM_HISTORY_BARS:
+        stream = QuoteStream(tickers, "1m", max_bars=2 * max(STREAM_HISTORY_BARS))
+        times = pd.date_range(FIXTURE_END, periods=n_bars, freq="min")
+        history = pd.DataFrame({"Open": 100.0, "Close": 100.0}, index=times)
+        stream.push(dict.fromkeys(tickers, history))
+        clock = iter(pd.date_range(times[-1], periods=10_000, freq="min")[1:])
+
+        def tick(stream=stream, clock=clock):
+            bar = pd.DataFrame({"Open": 100.0, "Close": 101.0}, index=[next(clock)])
+            stream.push(dict.fromkeys(tickers, bar))
+            return stream.quotes()
+
+        cases[f"stream_tick[tickers={n_tickers},bars={n_bars}]"] = tick
+    return cases
+
+
+def import_cases():
+    """
+    Builds cold-import cases, each timed in a fresh interpreter.
+
+    ``import:app_startup`` imports app.py as Streamlit does before the first
+    paint, and fails if any of ``APP_DEFERRED_MODULES`` got loaded with it.
+
+    Returns:
+        dict: Case name -> zero-argument callable.
+    """
+
+    def cold_import(statement):
+        def run():
+            done = subprocess.run(
+                [sys.executable, "-c", statement],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+            )
+            if done.returncode:
+                raise RuntimeError(done.stderr.strip().splitlines()[-1])
+
+        return run
+
+    deferred = ", ".join(repr(m) for m in APP_DEFERRED_MODULES)
+    return {
+        "import:interpreter": cold_import("pass"),
+        "import:app_startup": cold_import(
+            f"import sys, app; loaded = [m for m in ({deferred}) if m in sys.modules]; "
+            "assert not loaded, f'loaded at startup: {loaded}'"
+        ),
+    }
+
+
+def app_cases(n_tickers):
+    """
+    Builds end-to-end cases that run ``app.main()`` through Streamlit's AppTest.
+
+    ``first_paint`` starts a fresh session on the default view; ``first_run``
+    does the same and then opens Market Dynamics (empty memo); ``rerun``
+    repeats the script on Market Dynamics in a warm session, as happens on
+    every widget interaction.
+
+    Returns:
+        dict: Case name -> zero-argument callable.
+    """
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest runs the script in bare mode, which Streamlit warns about
+    set_log_level("error")
+
+    def new_session(view=None):
+        at = AppTest.from_file(str(APP_PATH), default_timeout=300)
+        at.run()
+        ticker_select = at.multiselect[0]
+        ticker_select.set_value(ticker_select.options[:n_tickers]).run()
+        if view is not None:
+            at.button_group[0].set_value(view).run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        return at
+
+    session = new_session("Market Dynamics")
+    return {
+        "app:first_paint": new_session,
+        "app:first_run": lambda: new_session("Market Dynamics"),
+        "app:rerun": lambda: session.run(),
+    }
+
+
+def run(ticker_counts, histories, repeat, include_app, name_filter=None):
+    """
+    Runs the benchmark grid.
+
+    Returns:
+        dict: Case id -> timing dict.
+    """
+    set_provider(FixtureProvider(end=FIXTURE_END))
+    results = {}
+
+    def record(case_id, func):
+        if name_filter and name_filter not in case_id:
+            return
+        results[case_id] = time_case(func, repeat)
+        print(f"{case_id:<60} {results[case_id]['median'] * 1000:10.2f} ms")
+
+    for n_tickers in ticker_counts:
+        for period in histories:
+            for name, func in pipeline_cases(n_tickers, period).items():
+                record(f"{name}[tickers={n_tickers},history={period}]", func)
+        for name, func in archive_cases(n_tickers).items():
+            record(f"{name}[tickers={n_tickers}]", func)
+        for name, func in news_cases(n_tickers).items():
+            record(f"{name}[tickers={n_tickers}]", func)
+        for case_id, func in stream_cases(n_tickers).items():
+            record(case_id, func)
+
+    for name, func in import_cases().items():
+        record(name, func)
+
+    if include_app:
+        for n_tickers in APP_TICKER_COUNTS:
+            for name, func in app_cases(n_tickers).items():
+                record(f"{name}[tickers={n_tickers}]", func)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares medians against a baseline.
+
+    Returns:
+        list: (case id, baseline seconds, current seconds) for regressions.
+    """
+    regressions = []
+    for case_id, timing in results.items():
+        reference = baseline.get(case_id)
+        if reference is None:
+            continue
+        before, after = reference["median"], timing["median"]
+        if after > before * (1 + tolerance) and after - before > NOISE_FLOOR:
+            regressions.append((case_id, before, after))
+    return regressions
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "recorded": time.strftime("%Y-%m-%d"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="Run the small grid")
+    parser.add_argument("--no-app", action="store_true", help="Skip app cases")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--filter", help="Only run cases containing this text")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25=25%%)"
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="Write results as the new baseline"
+    )
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = run(
+        QUICK_TICKER_COUNTS if args.quick else TICKER_COUNTS,
+        QUICK_HISTORIES if args.quick else HISTORIES,
+        args.repeat,
+        include_app=not args.no_app,
+        name_filter=args.filter,
+    )
+
+    if args.save:
+        baseline = {}
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text())["results"]
+        baseline.update(results)
+        payload = {"environment": environment(), "results": baseline}
+        args.baseline.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save to record one")
+        return 0
+
+    regressions = compare(
+        results, json.loads(args.baseline.read_text())["results"], args.tolerance
+    )
+    for case_id, before, after in regressions:
+        print(
+            f"REGRESSION {case_id}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms "
+            f"({after / before - 1:+.0%})"
+        )
+    if not regressions:
+        print("No regressions against baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,41 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
 import numpy as np
+import pandas as pd
+
+from src.cache import INTERVAL_BARS_PER_YEAR
+from src.instrumentation import CACHE_HIT, CACHE_MISS, annotate, timed
+from src.lexicon import score_compound
+from src.store import PriceStore
+
+# Maximum number of headline scores kept in memory, overridable via .env
+SENTIMENT_CACHE_SIZE = int(os.environ.get("STOCK_SENTIMENT_CACHE_SIZE", 50_000))
+
+TRADING_DAYS = 252
+
+
+def _annualized_volatility(returns, periods_per_year=TRADING_DAYS):
+    """
+    Annualized volatility (%) of each column of a returns matrix.
+
+    Args:
+        returns (np.ndarray): (dates x tickers) simple returns, NaN for gaps.
+        periods_per_year (int): Bars per year (252 for daily returns).
+
+    Returns:
+        np.ndarray: Volatility per column; 0.0 where fewer than 2 returns.
+    """
+    valid = ~np.isnan(returns)
+    count = valid.sum(axis=0)
+    filled = np.where(valid, returns, 0.0)
+    mean = filled.sum(axis=0) / np.maximum(count, 1)
+    sq_dev = np.where(valid, (returns - mean) ** 2, 0.0).sum(axis=0)
+    variance = sq_dev / np.maximum(count - 1, 1)
+    return np.where(count >= 2, np.sqrt(variance * periods_per_year) * 100, 0.0)
 
 
 def calculate_volatility(stock_series):
@@ -14,43 +51,221 @@ def calculate_volatility(stock_series):
     if stock_series.empty or len(stock_series) < 2:
         return 0.0
 
-    returns = stock_series.pct_change()
-    # Drop the first NaN value created by pct_change
-    returns = returns.dropna()
+    prices = stock_series.to_numpy(dtype=float)
+    returns = prices[1:] / prices[:-1] - 1
+    return float(_annualized_volatility(returns[:, None])[0])
 
-    if returns.empty:
-        return 0.0
 
-    volatility = returns.std() * np.sqrt(252)
-    volatility_pct = volatility * 100
-    return volatility_pct
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+    Per-ticker analytics computed in one pass over a (dates x tickers) matrix.
+
+    Attributes:
+        tickers (list): Tickers, in column order.
+        dates (pd.DatetimeIndex): Shared date index.
+        close (np.ndarray): Close prices, NaN where a ticker has no bar.
+        returns (np.ndarray): Simple returns per bar (first row NaN).
+        volatility (np.ndarray): Annualized volatility (%) per ticker.
+        observations (np.ndarray): Number of valid prices per ticker.
+        last_price (np.ndarray): Latest valid close per ticker.
+        prev_price (np.ndarray): Close before the latest one per ticker.
+        delta_pct (np.ndarray): Latest change per bar (%) per ticker.
+        interval (str): Bar interval, "1d", "1wk" or "1mo".
+    """
+
+    tickers: list
+    dates: pd.DatetimeIndex
+    close: np.ndarray
+    returns: np.ndarray
+    volatility: np.ndarray
+    observations: np.ndarray
+    last_price: np.ndarray
+    prev_price: np.ndarray
+    delta_pct: np.ndarray
+    interval: str = "1d"
+
+    def index_of(self, ticker):
+        """Column of ``ticker``, or None if it has no data."""
+        try:
+            return self.tickers.index(ticker)
+        except ValueError:
+            return None
+
+
+@timed("analytics:snapshot")
+def compute_market_snapshot(stocks_df, tickers=None):
+    """
+    Computes returns, volatility and latest prices for all tickers at once.
+
+    Args:
+        stocks_df (PriceStore | pd.DataFrame): Columnar price store, or
+            MultiIndex (ticker, field) stock data.
+        tickers (list, optional): Tickers to include, in order. Defaults to
+            every ticker in ``stocks_df``.
+
+    Returns:
+        MarketSnapshot: Snapshot, or None if there is no Close data.
+    """
+    if stocks_df is None or stocks_df.empty:
+        return None
+
+    if isinstance(stocks_df, PriceStore):
+        if "Close" not in stocks_df.fields:
+            return None
+        selection = stocks_df.tickers if tickers is None else tickers
+        names = [t for t in selection if t in stocks_df]
+        dates, interval = stocks_df.dates, stocks_df.interval
+        close = stocks_df.matrix("Close", names).astype(float, copy=False)
+    else:
+        try:
+            close_df = stocks_df.xs("Close", axis=1, level=1)
+        except KeyError:
+            return None
+        if tickers is not None:
+            close_df = close_df[[t for t in tickers if t in close_df.columns]]
+        names, dates = list(close_df.columns), close_df.index
+        interval = "1d"
+        close = close_df.to_numpy(dtype=float)
+
+    n_dates, n_tickers = close.shape
+    returns = np.full_like(close, np.nan)
+    returns[1:] = close[1:] / close[:-1] - 1
 
+    # Locate the last two valid prices per column without a Python loop
+    valid = ~np.isnan(close)
+    rank = valid.cumsum(axis=0)
+    observations = rank[-1] if n_dates else np.zeros(n_tickers, dtype=int)
+    columns = np.arange(n_tickers)
+    last_idx = np.argmax(valid & (rank == observations), axis=0)
+    prev_idx = np.argmax(valid & (rank == observations - 1), axis=0)
+    last_price = np.where(observations >= 1, close[last_idx, columns], np.nan)
+    prev_price = np.where(observations >= 2, close[prev_idx, columns], np.nan)
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return MarketSnapshot(
+        tickers=names,
+        dates=dates,
+        close=close,
+        returns=returns,
+        volatility=_annualized_volatility(
+            returns[1:], INTERVAL_BARS_PER_YEAR[interval]
+        ),
+        observations=observations,
+        last_price=last_price,
+        prev_price=prev_price,
+        delta_pct=(last_price - prev_price) / prev_price * 100,
+        interval=interval,
+    )
 
 
+class SentimentCache:
+    """
+    Bounded LRU mapping of headline hash -> VADER compound score.
+
+    Keys are digests of the whitespace-normalized title. Case and punctuation
+    are kept because VADER scores them.
+    """
+
+    def __init__(self, maxsize=SENTIMENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(title):
+        normalized = " ".join(title.split())
+        return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+    def get_many(self, keys):
+        """Returns cached scores for the keys found, refreshing their recency."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._scores:
+                    self._scores.move_to_end(key)
+                    found[key] = self._scores[key]
+        return found
+
+    def put_many(self, scores):
+        """Stores scores, evicting the least recently used beyond maxsize."""
+        with self._lock:
+            self._scores.update(scores)
+            for key in scores:
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.maxsize:
+                self._scores.popitem(last=False)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+
+
+_sentiment_cache = SentimentCache()
+
+
+@timed("sentiment:score")
+def score_titles(titles):
+    """
+    Scores headlines with VADER, deduplicating and reusing cached scores.
+
+    Only titles not seen before (after whitespace normalization) are scored,
+    in one batch (see ``src.lexicon``). Non-string titles score 0.0.
+
+    Args:
+        titles (iterable): Headline strings.
+
+    Returns:
+        np.ndarray: Compound score for each title, in input order.
+    """
+    titles = list(titles)
+    keys = [
+        SentimentCache.key(title) if isinstance(title, str) else None
+        for title in titles
+    ]
+    unique = {key: title for key, title in zip(keys, titles, strict=True) if key}
+
+    scores = _sentiment_cache.get_many(unique)
+    missing = {key: title for key, title in unique.items() if key not in scores}
+    annotate(cache=CACHE_MISS if missing else CACHE_HIT, scored=len(missing))
+    if missing:
+        new_scores = dict(
+            zip(missing, score_compound(list(missing.values())).tolist(), strict=True)
+        )
+        _sentiment_cache.put_many(new_scores)
+        scores.update(new_scores)
+
+    return np.array([scores[key] if key else 0.0 for key in keys], dtype=float)
+
+
+@timed("sentiment:analyze")
 def analyze_sentiment(news_df):
     """
     Analyzes the sentiment of news headlines using VaderSentiment.
 
+    Rows that already carry a score (e.g. from the news store, which scores
+    items at ingestion) are left as they are.
+
     Args:
         news_df (pd.DataFrame): DataFrame containing news with 'title' column.
 
     Returns:
-        pd.DataFrame: news_df with added 'sentiment_score' column, or original df if empty.
+        pd.DataFrame: news_df with added 'sentiment_score' column, or original
+        df if empty.
     """
     if news_df is None or news_df.empty or "title" not in news_df.columns:
         return news_df
 
-    analyzer = SentimentIntensityAnalyzer()
-
-    def get_sentiment(text):
-        if not isinstance(text, str):
-            return 0.0
-        return analyzer.polarity_scores(text)["compound"]
-
     # Operate on a copy to avoid SettingWithCopy warnings if slice passed
     result_df = news_df.copy()
-    result_df["sentiment_score"] = result_df["title"].apply(get_sentiment)
+    if "sentiment_score" not in result_df.columns:
+        result_df["sentiment_score"] = np.nan
+    missing = result_df["sentiment_score"].isna()
+    if missing.any():
+        result_df.loc[missing, "sentiment_score"] = score_titles(
+            result_df.loc[missing, "title"]
+        )
 
     return result_df
@@ -0,0 +1,347 @@
+"""
+Read-only, memory-mapped OHLCV archive for large universes.
+
+An archive is a directory of plain ``.npy`` files: for each bar interval, a
+date axis and one (tickers x dates) array per field, plus ``index.json``
+mapping each ticker to its row. ``PriceArchive`` opens the arrays with
+``mmap_mode="r"``, so nothing is read until a ticker/date range is sliced,
+only the pages of that range are read, and every process on the host shares
+them through the OS page cache. A session holds only the selection it asked
+for, however large the universe.
+
+Build one with a full download of the universe, e.g. nightly:
+    python -m src.archive tickers.txt --out archive/ --period max
+
+and point ``STOCK_ARCHIVE_DIR`` at it; ``src.data.get_price_store`` then
+serves archived history from it and only the bars after its last date from
+the price cache. A rebuild replaces the directory in one rename: open
+archives keep reading the old files and the next lookup opens the new one.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.batch import chunked
+from src.cache import (
+    EARLIEST_DATE,
+    INTERVAL_BARS_PER_YEAR,
+    PRICE_FIELDS,
+    period_start,
+)
+from src.store import PriceStore
+
+logger = logging.getLogger(__name__)
+
+# Archive settings, overridable through the environment (.env)
+ARCHIVE_DIR = os.environ.get("STOCK_ARCHIVE_DIR", "")
+# Tickers downloaded and read from the cache at a time while building
+ARCHIVE_BATCH_SIZE = int(os.environ.get("STOCK_ARCHIVE_BATCH_SIZE", 200))
+
+ARCHIVE_VERSION = 1
+INDEX_FILE = "index.json"
+
+
+def build_archive(
+    directory, tickers, cache, start=EARLIEST_DATE, batch_size=ARCHIVE_BATCH_SIZE
+):
+    """
+    Writes an archive of the cached bars of ``tickers``.
+
+    Each interval (daily bars and the cache's weekly/monthly tiers) is written
+    in two passes over ticker batches: the first collects the date axis and
+    fields, the second fills preallocated memory-mapped files, so only one
+    batch is in memory at a time. The archive is staged next to ``directory``
+    and swapped in with a rename.
+
+    Args:
+        directory (str | Path): Archive directory (replaced if it exists).
+        tickers (list): Ticker symbols; those with no cached bars are skipped.
+        cache (PriceCache): Price cache holding the bars of every ticker, so
+            one whose ``max_tickers`` bound fits the universe.
+        start (pd.Timestamp): First date to archive.
+        batch_size (int): Tickers read from the cache at a time.
+
+    Returns:
+        dict: The archive index.
+    """
+    directory = Path(directory)
+    staging = directory.with_name(f".{directory.name}.{os.getpid()}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    batches = chunked(list(tickers), batch_size)
+
+    # Pass 1: tickers with data, the daily date axis and the fields present
+    archived, fields, daily = [], set(), []
+    for batch in batches:
+        for ticker, frame in cache.load_many(batch, start).items():
+            if not frame.empty:
+                archived.append(ticker)
+                fields.update(frame.columns)
+                daily.append(frame.index.values)
+    if not archived:
+        raise ValueError("No cached bars to archive")
+    skipped = [ticker for ticker in dict.fromkeys(tickers) if ticker not in archived]
+    if skipped:
+        logger.warning(f"No cached bars to archive for: {', '.join(skipped)}")
+    fields = [field for field in PRICE_FIELDS if field in fields]
+    rows = {ticker: row for row, ticker in enumerate(archived)}
+
+    intervals = {}
+    for interval in INTERVAL_BARS_PER_YEAR:
+        if interval == "1d":
+            dates = pd.DatetimeIndex(np.unique(np.concatenate(daily)))
+        else:
+            dates = pd.DatetimeIndex(
+                np.unique(
+                    np.concatenate(
+                        [
+                            frame.index.values
+                            for batch in chunked(archived, batch_size)
+                            for frame in cache.load_many(
+                                batch, start, interval
+                            ).values()
+                        ]
+                    )
+                )
+            )
+        folder = staging / interval
+        folder.mkdir(parents=True)
+        np.save(folder / "dates.npy", dates.values)
+        arrays = {
+            field: np.lib.format.open_memmap(
+                folder / f"{PRICE_FIELDS[field]}.npy",
+                mode="w+",
+                dtype=np.float64,
+                shape=(len(archived), len(dates)),
+            )
+            for field in fields
+        }
+        for array in arrays.values():
+            array[:] = np.nan
+        # Pass 2: fill each ticker's row
+        for batch in chunked(archived, batch_size):
+            for ticker, frame in cache.load_many(batch, start, interval).items():
+                positions = dates.get_indexer(frame.index)
+                for field, array in arrays.items():
+                    if field in frame.columns:
+                        array[rows[ticker], positions] = frame[field].to_numpy()
+        for array in arrays.values():
+            array.flush()
+        intervals[interval] = {"dates": len(dates)}
+        del arrays
+
+    index = {
+        "version": ARCHIVE_VERSION,
+        "tickers": rows,
+        "fields": fields,
+        "intervals": intervals,
+        "start": str(pd.Timestamp(start).date()),
+        "end": str(pd.Timestamp(np.max([d[-1] for d in daily])).date()),
+        "built_at": time.time(),
+    }
+    (staging / INDEX_FILE).write_text(json.dumps(index))
+
+    previous = directory.with_name(f".{directory.name}.{os.getpid()}.old")
+    if directory.exists():
+        directory.rename(previous)
+    staging.rename(directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    logger.info(f"Archived {len(archived)} tickers to {directory}")
+    return index
+
+
+class PriceArchive:
+    """
+    Read-only view of an archive built by ``build_archive``.
+
+    Every array is memory-mapped read-only when the archive is opened.
+    Slicing copies only the requested rows and date range, which is all that
+    is read from disk.
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory (str | Path): Archive directory.
+
+        Raises:
+            OSError: If the index cannot be read.
+            ValueError: If the index is not a supported archive.
+        """
+        self.directory = Path(directory)
+        index_path = self.directory / INDEX_FILE
+        index = json.loads(index_path.read_text())
+        if index.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version in {index_path}")
+
+        self.version = index_path.stat().st_mtime_ns
+        self.tickers = list(index["tickers"])
+        self.fields = index["fields"]
+        self.intervals = list(index["intervals"])
+        # History before ``start`` was not archived
+        self.start = pd.Timestamp(index["start"])
+        self.end = pd.Timestamp(index["end"])
+        self._positions = index["tickers"]
+        # Mapping every file up front keeps this archive readable after a
+        # rebuild replaces the directory; no data is read until sliced
+        self._mapped = {}
+        for interval in self.intervals:
+            folder = self.directory / interval
+            self._mapped[interval] = (
+                pd.DatetimeIndex(np.load(folder / "dates.npy"), name="Date"),
+                {
+                    field: np.load(folder / f"{PRICE_FIELDS[field]}.npy", mmap_mode="r")
+                    for field in self.fields
+                },
+            )
+
+    def __contains__(self, ticker):
+        return ticker in self._positions
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def _open(self, interval):
+        """Date axis and memory-mapped field arrays of one interval."""
+        if interval not in self._mapped:
+            raise ValueError(f"Interval {interval} not in archive {self.directory}")
+        return self._mapped[interval]
+
+    def dates(self, interval="1d"):
+        """Date axis of one interval."""
+        return self._open(interval)[0]
+
+    def series(self, ticker, field="Close", interval="1d"):
+        """Zero-copy memory-mapped view of one ticker's field."""
+        return self._open(interval)[1][field][self._positions[ticker]]
+
+    def store(self, tickers, start=None, end=None, interval="1d"):
+        """
+        Reads a ticker/date range into a PriceStore.
+
+        Args:
+            tickers (list): Ticker symbols; those not archived are skipped.
+            start (pd.Timestamp, optional): First date. Defaults to the start.
+            end (pd.Timestamp, optional): Last date (inclusive). Defaults to
+                the archive's end.
+            interval (str): "1d", "1wk" or "1mo".
+
+        Returns:
+            PriceStore: Store over the dates where the selection has bars,
+            without the tickers that have none in the range.
+        """
+        dates, arrays = self._open(interval)
+        first = 0 if start is None else dates.searchsorted(start)
+        last = len(dates) if end is None else dates.searchsorted(end, side="right")
+        names = [t for t in tickers if t in self._positions]
+        rows = np.array([self._positions[t] for t in names], dtype=np.intp)
+
+        # Advanced row indexing with a column slice reads only these bytes
+        sliced = {f: array[rows, first:last] for f, array in arrays.items()}
+        valid = ~np.isnan(sliced["Close"])
+        keep = valid.any(axis=1)
+        columns = np.flatnonzero(valid[keep].any(axis=0))
+        if not keep.any():
+            return PriceStore([], pd.DatetimeIndex([]), {}, interval)
+        span = slice(columns[0], columns[-1] + 1)
+        return PriceStore(
+            [name for name, kept in zip(names, keep, strict=True) if kept],
+            dates[first:last][span],
+            {f: np.ascontiguousarray(a[keep, span]) for f, a in sliced.items()},
+            interval,
+        )
+
+
+_default_archive = None
+_default_archive_lock = threading.Lock()
+
+
+def get_archive(directory=None):
+    """
+    Returns the process-wide archive, reopening it after a rebuild.
+
+    Args:
+        directory (str | Path, optional): Archive directory. Defaults to
+            ``STOCK_ARCHIVE_DIR``.
+
+    Returns:
+        PriceArchive: Open archive, or None if none is configured or it
+        cannot be read.
+    """
+    global _default_archive
+    directory = directory or ARCHIVE_DIR
+    if not directory:
+        return None
+    try:
+        version = (Path(directory) / INDEX_FILE).stat().st_mtime_ns
+    except OSError:
+        return None
+
+    with _default_archive_lock:
+        current = _default_archive
+        if (
+            current is None
+            or current.directory != Path(directory)
+            or current.version != version
+        ):
+            try:
+                current = _default_archive = PriceArchive(directory)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Price archive unavailable: {e!s}")
+                return None
+        return current
+
+
+def main(argv=None):
+    from src.batch import download_batched
+    from src.cache import PriceCache
+    from src.report import read_tickers
+
+    parser = argparse.ArgumentParser(
+        description="Build a memory-mapped price archive for a ticker universe."
+    )
+    parser.add_argument("tickers", type=Path, help="File with ticker symbols")
+    parser.add_argument("--out", type=Path, default=Path(ARCHIVE_DIR or "archive"))
+    parser.add_argument("--period", default="max", help="History period, e.g. 10y")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    tickers = read_tickers(args.tickers)
+    if not tickers:
+        logger.error(f"No tickers found in {args.tickers}")
+        return 1
+
+    # Download the full period into a staging cache rather than the app's:
+    # the app's cache only holds the tail of tickers served from a previous
+    # archive, so building from it would truncate the history, and its LRU
+    # bound would evict earlier batches of a large universe
+    start = period_start(args.period)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=args.out.parent) as tmp:
+        cache = PriceCache(path=Path(tmp) / "prices.sqlite", max_tickers=len(tickers))
+        for batch in chunked(tickers, args.batch_size):
+            result = download_batched(batch, period=args.period)
+            for ticker, frame in result.frames.items():
+                cache.store(ticker, frame, covered_from=start)
+        try:
+            index = build_archive(args.out, tickers, cache, start, args.batch_size)
+        except ValueError as e:
+            logger.error(str(e))
+            return 1
+    # Tickers without data are logged by build_archive; fail so cron notices
+    return 0 if len(index["tickers"]) == len(set(tickers)) else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
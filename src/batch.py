@@ -0,0 +1,243 @@
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from src.instrumentation import annotate, frame_nbytes, timed
+from src.providers import SymbolError, get_provider
+
+logger = logging.getLogger(__name__)
+
+# Batch download settings, overridable through the environment (.env)
+DOWNLOAD_CHUNK_SIZE = int(os.environ.get("STOCK_DOWNLOAD_CHUNK_SIZE", 50))
+DOWNLOAD_WORKERS = int(os.environ.get("STOCK_DOWNLOAD_WORKERS", 4))
+DOWNLOAD_RETRIES = int(os.environ.get("STOCK_DOWNLOAD_RETRIES", 3))
+DOWNLOAD_BACKOFF = float(os.environ.get("STOCK_DOWNLOAD_BACKOFF", 1.0))
+# Failed requests after which the rest of a download gives up
+DOWNLOAD_MAX_FAILURES = int(os.environ.get("STOCK_DOWNLOAD_MAX_FAILURES", 10))
+
+# Per-ticker outcomes reported in BatchResult.status
+STATUS_OK = "ok"
+STATUS_NO_DATA = "no data"
+STATUS_FAILED = "failed"
+# Set by the cached loader in src.data: served from the price cache without a
+# download, or served from it because the tail refresh failed
+STATUS_CACHED = "cached"
+STATUS_STALE = "stale"
+# Served from the price archive with no newer bars (see src.archive)
+STATUS_ARCHIVED = "archived"
+
+
+@dataclass
+class BatchResult:
+    """
+    Merged outcome of a chunked download.
+
+    Attributes:
+        frames (dict): Ticker -> date-indexed OHLCV DataFrame for tickers
+            that returned data.
+        status (dict): Ticker -> STATUS_OK, STATUS_NO_DATA or STATUS_FAILED.
+        errors (dict): Ticker -> last error message for failed tickers.
+    """
+
+    frames: dict = field(default_factory=dict)
+    status: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+
+    @property
+    def failed(self):
+        return [t for t, s in self.status.items() if s == STATUS_FAILED]
+
+    def merge(self, other):
+        self.frames.update(other.frames)
+        self.status.update(other.status)
+        self.errors.update(other.errors)
+        return self
+
+
+def chunked(tickers, chunk_size):
+    """Splits tickers into consecutive chunks of at most ``chunk_size``."""
+    chunk_size = max(1, chunk_size)
+    return [tickers[i : i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+
+
+class RetryBudget:
+    """
+    Backoff and failure count shared by every chunk of one download.
+
+    A failed request delays the next request of every chunk, not only its
+    own, so parallel chunks back off from a rate limit together. Once
+    ``max_failures`` requests have failed, the remaining chunks give up
+    without asking the provider again.
+    """
+
+    def __init__(
+        self,
+        backoff=DOWNLOAD_BACKOFF,
+        max_failures=DOWNLOAD_MAX_FAILURES,
+        max_steps=DOWNLOAD_RETRIES,
+        sleep=time.sleep,
+    ):
+        self.backoff = backoff
+        self.max_failures = max_failures
+        # Doublings of the delay before it stops growing
+        self.max_steps = max_steps
+        self.sleep = sleep
+        self.failures = 0
+        self._streak = 0
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def exhausted(self):
+        return self.failures >= self.max_failures
+
+    def wait(self):
+        """
+        Waits out the shared backoff before a request.
+
+        Returns:
+            bool: False if the budget is spent and no request should be made.
+        """
+        with self._lock:
+            if self.exhausted:
+                return False
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            self.sleep(delay)
+        return True
+
+    def succeeded(self):
+        with self._lock:
+            self._streak = 0
+
+    def failed(self):
+        """Records a failed request; returns the delay before the next one."""
+        with self._lock:
+            self.failures += 1
+            self._streak += 1
+            steps = min(self._streak - 1, self.max_steps)
+            delay = self.backoff * 2**steps * random.uniform(0.5, 1.5)
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            return delay
+
+
+@timed("prices:download")
+def download_batched(
+    tickers,
+    period=None,
+    start=None,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    max_workers=DOWNLOAD_WORKERS,
+    retries=DOWNLOAD_RETRIES,
+    backoff=DOWNLOAD_BACKOFF,
+    provider=None,
+    sleep=time.sleep,
+    max_failures=DOWNLOAD_MAX_FAILURES,
+):
+    """
+    Downloads OHLCV for a large universe in parallel chunks.
+
+    A chunk that fails is retried up to ``retries`` times with jittered
+    exponential backoff shared by all chunks (see ``RetryBudget``), then
+    reported as failed. Only a ``SymbolError`` splits a chunk: its halves are
+    requested at once, down to the bad symbol, so one bad symbol only costs
+    its own ticker. Throttling and transport errors are never split, which
+    would multiply requests into the rate limit.
+
+    Args:
+        tickers (list): Ticker symbols.
+        period (str, optional): yfinance period string.
+        start (str, optional): First date (YYYY-MM-DD); overrides period.
+        chunk_size (int): Tickers per provider request.
+        max_workers (int): Chunks downloaded concurrently.
+        retries (int): Attempts per chunk.
+        backoff (float): Base delay in seconds between attempts.
+        provider (MarketDataProvider, optional): Defaults to the active one.
+        sleep (callable): Sleep function, replaceable in tests.
+        max_failures (int): Failed requests after which the remaining chunks
+            fail without a request.
+
+    Returns:
+        BatchResult: Merged frames and per-ticker status.
+    """
+    provider = provider or get_provider()
+    tickers = list(dict.fromkeys(tickers))
+    result = BatchResult()
+    if not tickers:
+        return result
+    budget = RetryBudget(backoff, max_failures, retries, sleep)
+
+    def fetch(chunk):
+        return _fetch_chunk(chunk, provider, period, start, retries, budget)
+
+    chunks = chunked(tickers, chunk_size)
+    workers = max(1, min(max_workers, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prices") as pool:
+        for chunk_result in pool.map(fetch, chunks):
+            result.merge(chunk_result)
+
+    if result.failed:
+        logger.warning(f"Price download failed for: {', '.join(result.failed)}")
+    annotate(
+        rows=sum(len(frame) for frame in result.frames.values()),
+        bytes=sum(frame_nbytes(frame) for frame in result.frames.values()),
+        tickers=len(tickers),
+        chunks=len(chunks),
+        failed=len(result.failed),
+        request_failures=budget.failures,
+    )
+    return result
+
+
+def _fetch_chunk(chunk, provider, period, start, retries, budget):
+    error = None
+    for attempt in range(max(1, retries)):
+        if not budget.wait():
+            error = error or RuntimeError("too many failed requests in this download")
+            break
+        try:
+            frames = provider.download(chunk, period=period, start=start)
+        except SymbolError as e:
+            # Retrying the same symbols would fail the same way
+            error = e
+            break
+        except Exception as e:
+            error = e
+            delay = budget.failed()
+            if attempt + 1 < retries:
+                logger.warning(
+                    f"Chunk of {len(chunk)} failed ({e!s}), retrying in {delay:.1f}s"
+                )
+            continue
+        budget.succeeded()
+        # Unknown or delisted symbols can come back as all-NaN columns
+        result = BatchResult(
+            frames={
+                t: f
+                for t, f in frames.items()
+                if t in chunk and "Close" in f and f["Close"].notna().any()
+            }
+        )
+        for ticker in chunk:
+            result.status[ticker] = (
+                STATUS_OK if ticker in result.frames else STATUS_NO_DATA
+            )
+        return result
+
+    if len(chunk) > 1 and isinstance(error, SymbolError):
+        # Isolate the bad symbol by bisecting the chunk
+        middle = len(chunk) // 2
+        return _fetch_chunk(
+            chunk[:middle], provider, period, start, retries, budget
+        ).merge(_fetch_chunk(chunk[middle:], provider, period, start, retries, budget))
+
+    names = chunk[0] if len(chunk) == 1 else f"{len(chunk)} tickers from {chunk[0]}"
+    logger.error(f"Giving up on {names}: {error!s}")
+    return BatchResult(
+        status=dict.fromkeys(chunk, STATUS_FAILED),
+        errors=dict.fromkeys(chunk, str(error)),
+    )
@@ -0,0 +1,744 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Store location and policy, overridable through the environment (.env)
+CACHE_DIR = Path(
+    os.environ.get(
+        "STOCK_CACHE_DIR", Path.home() / ".cache" / "stock-intelligence-flux"
+    )
+)
+PRICE_TTL_SECONDS = int(os.environ.get("STOCK_PRICE_TTL", 15 * 60))
+# Age after which a ticker's whole history is downloaded again, so split and
+# dividend adjustments the tail check missed are eventually picked up
+PRICE_FULL_REFRESH_SECONDS = int(
+    os.environ.get("STOCK_PRICE_FULL_REFRESH", 7 * 24 * 60 * 60)
+)
+NEWS_TTL_SECONDS = int(os.environ.get("STOCK_NEWS_TTL", 5 * 60))
+MAX_CACHED_TICKERS = int(os.environ.get("STOCK_CACHE_MAX_TICKERS", 500))
+NEWS_RETENTION_DAYS = int(os.environ.get("STOCK_NEWS_RETENTION_DAYS", 30))
+NEWS_ITEMS_PER_TICKER = int(os.environ.get("STOCK_NEWS_ITEMS_PER_TICKER", 50))
+# Bars per ticker above which a period is served from a coarser tier
+TIER_MAX_BARS = int(os.environ.get("STOCK_TIER_MAX_BARS", 600))
+
+# OHLCV fields as returned by yfinance, mapped to SQLite column names
+PRICE_FIELDS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Adj Close": "adj_close",
+    "Volume": "volume",
+}
+
+# Offsets for the yfinance period strings we support
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# Bar intervals served from the cache, finest first, with their bars per year
+INTERVAL_BARS_PER_YEAR = {"1d": 252, "1wk": 52, "1mo": 12}
+
+# Aggregation tiers stored next to the daily bars: interval -> pandas period
+# frequency. Each tier bar is labelled with the last trading date it covers
+TIER_FREQUENCIES = {"1wk": "W-FRI", "1mo": "M"}
+
+# Sentinel start date used for period="max"
+EARLIEST_DATE = pd.Timestamp("1900-01-01")
+
+# Relative change of an already stored close that means the provider has
+# re-adjusted the history (split or dividend) since it was stored
+ADJUSTMENT_TOLERANCE = 1e-4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    adj_close REAL,
+    volume REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tiers (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    adj_close REAL,
+    volume REAL,
+    PRIMARY KEY (ticker, interval, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    ticker TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL,
+    last_date TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    full_at REAL
+);
+"""
+
+_NEWS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    ticker TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    published_at REAL,
+    url TEXT,
+    sentiment REAL,
+    PRIMARY KEY (ticker, item_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS news_published ON news (ticker, published_at);
+CREATE TABLE IF NOT EXISTS news_meta (
+    ticker TEXT PRIMARY KEY,
+    watermark REAL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def period_start(period, now=None):
+    """
+    Converts a yfinance period string into the first calendar date it covers.
+
+    Args:
+        period (str): Period such as "2y", "6mo" or "max".
+        now (pd.Timestamp, optional): Reference time. Defaults to today.
+
+    Returns:
+        pd.Timestamp: Normalized start date for the period.
+    """
+    today = (now or pd.Timestamp.now()).normalize()
+    if period == "max":
+        return EARLIEST_DATE
+    if period == "ytd":
+        return today.replace(month=1, day=1)
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period: {period}")
+    return today - PERIOD_OFFSETS[period]
+
+
+def interval_for_period(period, max_bars=TIER_MAX_BARS, now=None):
+    """
+    Picks the finest bar interval that keeps a period within ``max_bars``.
+
+    Args:
+        period (str): Period such as "2y", "10y" or "max".
+        max_bars (int): Bars per ticker wanted at most.
+        now (pd.Timestamp, optional): Reference time. Defaults to today.
+
+    Returns:
+        str: "1d", "1wk" or "1mo" (the coarsest tier if none fits).
+    """
+    today = (now or pd.Timestamp.now()).normalize()
+    years = (today - period_start(period, now)).days / 365.25
+    return next(
+        (
+            interval
+            for interval, per_year in INTERVAL_BARS_PER_YEAR.items()
+            if years * per_year <= max_bars
+        ),
+        list(INTERVAL_BARS_PER_YEAR)[-1],
+    )
+
+
+def resample_ohlcv(frame, interval):
+    """
+    Aggregates daily OHLCV bars into weekly or monthly bars.
+
+    Bars are sorted by date, so each week/month is a contiguous run and every
+    field is reduced with one ``reduceat`` over the run boundaries.
+
+    Args:
+        frame (pd.DataFrame): Date-sorted daily OHLCV frame.
+        interval (str): "1d" (returned as is), "1wk" or "1mo".
+
+    Returns:
+        pd.DataFrame: One bar per week/month, indexed by the last trading date
+        it covers: first Open, highest High, lowest Low, last Close and
+        Adj Close, summed Volume (NaNs skipped).
+    """
+    if interval == "1d" or frame.empty:
+        return frame
+
+    index = pd.DatetimeIndex(frame.index)
+    codes = index.to_period(TIER_FREQUENCIES[interval]).asi8
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)] - 1
+    positions = np.arange(len(codes))
+
+    bars = {}
+    for field in frame.columns:
+        values = frame[field].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        if field in ("Open", "Close", "Adj Close"):
+            if field == "Open":
+                picks = np.where(valid, positions, len(codes))
+                picked = np.minimum.reduceat(picks, starts)
+            else:
+                picks = np.where(valid, positions, -1)
+                picked = np.maximum.reduceat(picks, starts)
+            found = (picked >= starts) & (picked <= ends)
+            bars[field] = np.where(found, values[np.clip(picked, 0, ends)], np.nan)
+        elif field == "High":
+            bars[field] = np.fmax.reduceat(values, starts)
+        elif field == "Low":
+            bars[field] = np.fmin.reduceat(values, starts)
+        elif field == "Volume":
+            total = np.add.reduceat(np.where(valid, values, 0.0), starts)
+            counts = np.add.reduceat(valid, starts)
+            bars[field] = np.where(counts > 0, total, np.nan)
+    return pd.DataFrame(bars, index=pd.DatetimeIndex(index[ends], name=index.name))
+
+
+def adjustment_changed(stored, fresh, tolerance=ADJUSTMENT_TOLERANCE):
+    """
+    Whether a refreshed frame re-prices bars that were already stored.
+
+    Providers return split- and dividend-adjusted prices, so after a corporate
+    action the whole history is rescaled. Comparing the closes of the dates
+    both frames hold (a tail refresh overlaps the last stored bar) detects it.
+
+    Args:
+        stored (pd.DataFrame): Bars in the cache.
+        fresh (pd.DataFrame): Newly downloaded bars.
+        tolerance (float): Relative change of a close counted as a rescale.
+
+    Returns:
+        bool: True if any shared close moved by more than ``tolerance``.
+    """
+    if stored is None or stored.empty or "Close" not in fresh.columns:
+        return False
+    dates = stored.index.intersection(fresh.index)
+    if dates.empty:
+        return False
+    before = stored.loc[dates, "Close"].to_numpy(dtype=float)
+    after = fresh.loc[dates, "Close"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change = np.abs(after / before - 1)
+    return bool(np.nanmax(change, initial=0.0) > tolerance)
+
+
+class PriceCache:
+    """
+    Persistent per-ticker OHLCV store keyed by (ticker, date).
+
+    Each ticker records the earliest date it covers, its last stored bar and
+    when it was last refreshed. Tickers refreshed within ``ttl`` seconds are
+    served straight from disk; older ones only need the tail since their last
+    bar. The least recently used tickers are evicted once more than
+    ``max_tickers`` are stored.
+
+    Weekly and monthly aggregation tiers (``TIER_FREQUENCIES``) are stored
+    next to the daily bars and kept in step with them on every write, so long
+    periods can be read at a coarse interval without resampling on each load.
+    """
+
+    def __init__(
+        self, path=None, ttl=PRICE_TTL_SECONDS, max_tickers=MAX_CACHED_TICKERS
+    ):
+        self.path = Path(path) if path else CACHE_DIR / "prices.sqlite"
+        self.ttl = ttl
+        self.max_tickers = max_tickers
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.executescript(_SCHEMA)
+            # Stores written before full refreshes were tracked get one soon
+            columns = [row[1] for row in con.execute("PRAGMA table_info(meta)")]
+            if "full_at" not in columns:
+                con.execute("ALTER TABLE meta ADD COLUMN full_at REAL")
+            # Stores written before the tiers existed get them built once
+            untiered = [
+                row[0]
+                for row in con.execute(
+                    "SELECT ticker FROM meta WHERE ticker NOT IN "
+                    "(SELECT DISTINCT ticker FROM tiers)"
+                )
+            ]
+            for ticker in untiered:
+                self._store_tiers(con, ticker)
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def plan(self, tickers, start, max_age=None, full_age=PRICE_FULL_REFRESH_SECONDS):
+        """
+        Splits tickers by the work needed to serve them from ``start``.
+
+        Args:
+            tickers (list): Ticker symbols.
+            start (pd.Timestamp): First date the caller needs.
+            max_age (float, optional): Seconds after which a ticker is stale.
+                Defaults to the cache TTL.
+            full_age (float): Seconds after which a stale ticker's whole
+                history is downloaded again instead of only its tail.
+
+        Returns:
+            tuple: (fresh, stale, missing) where ``fresh`` is a list of tickers
+            served as-is, ``stale`` maps ticker -> last stored date needing a
+            tail refresh, and ``missing`` lists tickers needing a full download.
+        """
+        fresh, stale, missing = [], {}, []
+        now = time.time()
+        max_age = self.ttl if max_age is None else max_age
+        start_key = start.strftime("%Y-%m-%d")
+
+        with self._connect() as con:
+            rows = con.execute(
+                "SELECT ticker, covered_from, last_date, fetched_at, "
+                "COALESCE(full_at, 0) FROM meta "
+                f"WHERE ticker IN ({','.join('?' * len(tickers))})",
+                tickers,
+            ).fetchall()
+        meta = {row[0]: row[1:] for row in rows}
+
+        for ticker in tickers:
+            if ticker not in meta or meta[ticker][0] > start_key:
+                missing.append(ticker)
+            elif now - meta[ticker][2] <= max_age:
+                fresh.append(ticker)
+            elif now - meta[ticker][3] > full_age:
+                missing.append(ticker)
+            else:
+                stale[ticker] = pd.Timestamp(meta[ticker][1])
+        return fresh, stale, missing
+
+    def store(self, ticker, frame, covered_from=None):
+        """
+        Upserts bars for a ticker and marks it as freshly fetched.
+
+        Args:
+            ticker (str): Ticker symbol.
+            frame (pd.DataFrame): Date-indexed OHLCV frame for the ticker.
+            covered_from (pd.Timestamp, optional): Start of a full download.
+                When given, existing bars are replaced; otherwise the frame is
+                merged into them as a tail update.
+        """
+        frame = frame[[c for c in PRICE_FIELDS if c in frame.columns]]
+        frame = frame.dropna(how="all")
+        if frame.empty:
+            return
+
+        dates = pd.DatetimeIndex(frame.index).strftime("%Y-%m-%d")
+        columns = [PRICE_FIELDS[c] for c in frame.columns]
+        records = [
+            (ticker, date, *(None if pd.isna(v) else float(v) for v in values))
+            for date, values in zip(dates, frame.itertuples(index=False), strict=True)
+        ]
+        now = time.time()
+
+        with self._lock, self._connect() as con:
+            if covered_from is not None:
+                con.execute("DELETE FROM prices WHERE ticker = ?", (ticker,))
+                covered = covered_from.strftime("%Y-%m-%d")
+            else:
+                row = con.execute(
+                    "SELECT covered_from FROM meta WHERE ticker = ?", (ticker,)
+                ).fetchone()
+                covered = row[0] if row else dates[0]
+
+            con.executemany(
+                f"INSERT OR REPLACE INTO prices (ticker, date, {', '.join(columns)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(columns))})",
+                records,
+            )
+            self._store_tiers(
+                con, ticker, None if covered_from is not None else frame.index[0]
+            )
+            last_date = con.execute(
+                "SELECT MAX(date) FROM prices WHERE ticker = ?", (ticker,)
+            ).fetchone()[0]
+            # A tail update keeps the time of the last full download
+            con.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?, ?, "
+                "COALESCE(?, (SELECT full_at FROM meta WHERE ticker = ?)))",
+                (
+                    ticker,
+                    covered,
+                    last_date,
+                    now,
+                    now,
+                    now if covered_from is not None else None,
+                    ticker,
+                ),
+            )
+        self._evict()
+
+    def _store_tiers(self, con, ticker, since=None):
+        """
+        Rebuilds a ticker's aggregation tiers from its daily bars.
+
+        Args:
+            con (sqlite3.Connection): Open connection (inside the write).
+            ticker (str): Ticker symbol.
+            since (pd.Timestamp, optional): First new daily bar; only the weeks
+                and months from the one containing it are rebuilt. Defaults to
+                the whole history.
+        """
+        starts = {
+            interval: None if since is None else since.to_period(freq).start_time
+            for interval, freq in TIER_FREQUENCIES.items()
+        }
+        first = None if since is None else min(starts.values())
+        columns = list(PRICE_FIELDS.values())
+        rows = con.execute(
+            f"SELECT date, {', '.join(columns)} FROM prices "
+            "WHERE ticker = ? AND date >= ? ORDER BY date",
+            (ticker, (EARLIEST_DATE if first is None else first).strftime("%Y-%m-%d")),
+        ).fetchall()
+        daily = pd.DataFrame(
+            np.array([row[1:] for row in rows], dtype=float).reshape(-1, len(columns)),
+            index=pd.DatetimeIndex([row[0] for row in rows]),
+            columns=list(PRICE_FIELDS),
+        )
+
+        for interval, start in starts.items():
+            frame = daily if start is None else daily.loc[daily.index >= start]
+            bars = resample_ohlcv(frame, interval)
+            since_key = (EARLIEST_DATE if start is None else start).strftime("%Y-%m-%d")
+            con.execute(
+                "DELETE FROM tiers WHERE ticker = ? AND interval = ? AND date >= ?",
+                (ticker, interval, since_key),
+            )
+            con.executemany(
+                f"INSERT INTO tiers (ticker, interval, date, {', '.join(columns)}) "
+                f"VALUES (?, ?, ?, {', '.join('?' * len(columns))})",
+                [
+                    (ticker, interval, date, *(None if v != v else v for v in row))
+                    for date, row in zip(
+                        bars.index.strftime("%Y-%m-%d"),
+                        bars.to_numpy().tolist(),
+                        strict=True,
+                    )
+                ],
+            )
+
+    @staticmethod
+    def _read(con, table, ticker, start=None, interval=None):
+        """Reads a ticker's bars from ``table`` into a date-indexed frame."""
+        query = f"SELECT * FROM {table} WHERE ticker = ?"
+        params = [ticker]
+        if interval is not None:
+            query += " AND interval = ?"
+            params.append(interval)
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(start.strftime("%Y-%m-%d"))
+        frame = pd.read_sql_query(f"{query} ORDER BY date", con, params=params)
+
+        frame = frame.rename(columns={v: k for k, v in PRICE_FIELDS.items()})
+        frame.index = pd.DatetimeIndex(pd.to_datetime(frame.pop("date")), name="Date")
+        frame = frame.drop(columns=["ticker", "interval"], errors="ignore")
+        return frame.dropna(axis=1, how="all")
+
+    def load(self, ticker, start, interval="1d"):
+        """
+        Reads stored bars for a ticker from ``start`` onwards.
+
+        Args:
+            ticker (str): Ticker symbol.
+            start (pd.Timestamp): First date to return.
+            interval (str): "1d" for daily bars, or a tier in
+                ``TIER_FREQUENCIES`` ("1wk", "1mo").
+
+        Returns:
+            pd.DataFrame: Date-indexed OHLCV frame (empty if nothing stored).
+        """
+        return self.load_many([ticker], start, interval)[ticker]
+
+    def load_many(self, tickers, start, interval="1d"):
+        """
+        Reads stored bars for several tickers in one transaction.
+
+        Args:
+            tickers (list): Ticker symbols.
+            start (pd.Timestamp): First date to return.
+            interval (str): See ``load``.
+
+        Returns:
+            dict: Ticker -> date-indexed OHLCV frame (empty if nothing stored).
+        """
+        if interval != "1d" and interval not in TIER_FREQUENCIES:
+            raise ValueError(f"Unsupported interval: {interval}")
+        table = "prices" if interval == "1d" else "tiers"
+
+        with self._connect() as con:
+            frames = {
+                ticker: self._read(
+                    con, table, ticker, start, None if interval == "1d" else interval
+                )
+                for ticker in tickers
+            }
+            now = time.time()
+            con.executemany(
+                "UPDATE meta SET accessed_at = ? WHERE ticker = ?",
+                [(now, ticker) for ticker in tickers],
+            )
+        return frames
+
+    def touch(self, tickers):
+        """Marks tickers as just refreshed without new bars (e.g. market closed)."""
+        with self._lock, self._connect() as con:
+            con.executemany(
+                "UPDATE meta SET fetched_at = ? WHERE ticker = ?",
+                [(time.time(), t) for t in tickers],
+            )
+
+    def clear(self):
+        """Removes every stored ticker."""
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM prices")
+            con.execute("DELETE FROM tiers")
+            con.execute("DELETE FROM meta")
+
+    def _evict(self):
+        """Drops least recently accessed tickers beyond ``max_tickers``."""
+        with self._lock, self._connect() as con:
+            victims = [
+                row[0]
+                for row in con.execute(
+                    "SELECT ticker FROM meta ORDER BY accessed_at DESC "
+                    "LIMIT -1 OFFSET ?",
+                    (self.max_tickers,),
+                )
+            ]
+            if not victims:
+                return
+            con.executemany(
+                "DELETE FROM prices WHERE ticker = ?", [(t,) for t in victims]
+            )
+            con.executemany(
+                "DELETE FROM tiers WHERE ticker = ?", [(t,) for t in victims]
+            )
+            con.executemany(
+                "DELETE FROM meta WHERE ticker = ?", [(t,) for t in victims]
+            )
+        logger.info(f"Evicted {len(victims)} tickers from price cache")
+
+
+class NewsStore:
+    """
+    Persistent per-ticker news store with a seen-item index and watermark.
+
+    Items are keyed by (ticker, item id) so re-listed headlines are recognised
+    without re-parsing, and each ticker records its newest ingested publish
+    time (the watermark) and when it was last fetched. Sentiment is stored with
+    each item, so a refresh only parses and scores headlines it has not seen.
+    Items older than ``retention_days`` are pruned.
+    """
+
+    def __init__(
+        self, path=None, ttl=NEWS_TTL_SECONDS, retention_days=NEWS_RETENTION_DAYS
+    ):
+        self.path = Path(path) if path else CACHE_DIR / "news.sqlite"
+        self.ttl = ttl
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.executescript(_NEWS_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def stale(self, tickers, max_age=None):
+        """
+        Returns the tickers whose news was not fetched within ``max_age``.
+
+        Args:
+            tickers (list): Ticker symbols.
+            max_age (float, optional): Maximum age in seconds. Defaults to TTL.
+
+        Returns:
+            list: Tickers needing a refetch, in input order.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        now = time.time()
+        with self._connect() as con:
+            fetched = dict(
+                con.execute(
+                    "SELECT ticker, fetched_at FROM news_meta "
+                    f"WHERE ticker IN ({','.join('?' * len(tickers))})",
+                    tickers,
+                ).fetchall()
+            )
+        return [t for t in tickers if t not in fetched or now - fetched[t] > max_age]
+
+    def watermark(self, ticker):
+        """Newest ingested publish time for a ticker (epoch seconds), or None."""
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT watermark FROM news_meta WHERE ticker = ?", (ticker,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def seen(self, ticker, item_ids):
+        """
+        Returns the subset of ``item_ids`` already stored for a ticker.
+
+        Args:
+            ticker (str): Ticker symbol.
+            item_ids (list): Candidate item identifiers.
+
+        Returns:
+            set: Identifiers that are already stored.
+        """
+        if not item_ids:
+            return set()
+        with self._connect() as con:
+            rows = con.execute(
+                "SELECT item_id FROM news WHERE ticker = ? "
+                f"AND item_id IN ({','.join('?' * len(item_ids))})",
+                [ticker, *item_ids],
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def ingest(self, ticker, items):
+        """
+        Stores new items for a ticker and marks it as freshly fetched.
+
+        Args:
+            ticker (str): Ticker symbol.
+            items (list): Dicts with item_id, title, published_at (epoch
+                seconds or None), url and sentiment. May be empty.
+        """
+        now = time.time()
+        records = [
+            (
+                ticker,
+                item["item_id"],
+                item["title"],
+                item["published_at"],
+                item["url"],
+                item["sentiment"],
+            )
+            for item in items
+        ]
+        times = [r[3] for r in records if r[3] is not None]
+        cutoff = now - self.retention_days * 86400
+
+        with self._lock, self._connect() as con:
+            con.executemany(
+                "INSERT OR IGNORE INTO news VALUES (?, ?, ?, ?, ?, ?)", records
+            )
+            row = con.execute(
+                "SELECT watermark FROM news_meta WHERE ticker = ?", (ticker,)
+            ).fetchone()
+            if row and row[0] is not None:
+                times.append(row[0])
+            watermark = max(times, default=None)
+            con.execute(
+                "INSERT OR REPLACE INTO news_meta VALUES (?, ?, ?)",
+                (ticker, watermark, now),
+            )
+            con.execute(
+                "DELETE FROM news WHERE ticker = ? AND published_at < ?",
+                (ticker, cutoff),
+            )
+
+    def load(self, tickers, limit=NEWS_ITEMS_PER_TICKER):
+        """
+        Reads the newest stored items for each ticker.
+
+        Args:
+            tickers (list): Ticker symbols; output keeps this order.
+            limit (int): Maximum items per ticker.
+
+        Returns:
+            pd.DataFrame: Columns symbol, title, publishedAt (UTC), url and
+            sentiment_score; empty if nothing is stored.
+        """
+        with self._connect() as con:
+            frames = [
+                pd.read_sql_query(
+                    "SELECT ticker AS symbol, title, published_at AS publishedAt, "
+                    "url, sentiment AS sentiment_score FROM news WHERE ticker = ? "
+                    "ORDER BY published_at DESC LIMIT ?",
+                    con,
+                    params=(ticker, limit),
+                )
+                for ticker in tickers
+            ]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        news_df = pd.concat(frames, ignore_index=True)
+        news_df["publishedAt"] = pd.to_datetime(
+            news_df["publishedAt"], unit="s", utc=True
+        ).astype("datetime64[ns, UTC]")
+        return news_df
+
+    def clear(self):
+        """Removes every stored item and watermark."""
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM news")
+            con.execute("DELETE FROM news_meta")
+
+
+_default_cache = None
+_default_news_store = None
+_default_cache_lock = threading.Lock()
+
+
+def get_price_cache():
+    """
+    Returns the process-wide price cache, creating it on first use.
+
+    Returns:
+        PriceCache: Shared cache instance.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PriceCache()
+        return _default_cache
+
+
+def get_news_store():
+    """
+    Returns the process-wide news store, creating it on first use.
+
+    Returns:
+        NewsStore: Shared store instance.
+    """
+    global _default_news_store
+    with _default_cache_lock:
+        if _default_news_store is None:
+            _default_news_store = NewsStore()
+        return _default_news_store
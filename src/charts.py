@@ -1,134 +1,664 @@
-import plotly.graph_objs as go
+import base64
+import functools
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Plotly is imported inside the figure builders so importing this module (and
+# the app) does not pay for it until a chart is drawn
+from src.analysis import compute_market_snapshot
+from src.instrumentation import annotate, timed
+from src.sentiment import daily_sentiment
 
 # Premium Color Palette
 COLORS = ["#fda4af", "#7dd3fc", "#f0abfc", "#fb7185", "#38bdf8"]
 
+# Level of detail: roughly one point per horizontal pixel of a wide chart
+MAX_POINTS_PER_TRACE = 1500
+DOWNSAMPLE_METHOD = "lttb"
+
+# Daily bars per ticker above which returns are aggregated (see RETURN_TIERS)
+WEEKLY_BARS_THRESHOLD = 260
+
+# Return aggregation tiers, finest first: (resample rule, label, days per bar)
+RETURN_TIERS = (
+    (None, "Daily", 1),
+    ("W-FRI", "Weekly", 5),
+    ("ME", "Monthly", 21),
+    ("QE", "Quarterly", 63),
+)
+# First tier a price interval can be shown at (weekly bars are not split)
+INTERVAL_RETURN_TIERS = {"1d": 0, "1wk": 1, "1mo": 2}
+
+# Chart rendering settings, overridable through the environment (.env)
+# Line charts with more points than this are drawn with WebGL (Scattergl)
+WEBGL_POINTS_THRESHOLD = int(os.environ.get("STOCK_WEBGL_POINTS", 20000))
+# Points / bars per figure; large selections get fewer per ticker
+FIGURE_MAX_POINTS = int(os.environ.get("STOCK_FIGURE_MAX_POINTS", 100000))
+FIGURE_MAX_BARS = int(os.environ.get("STOCK_FIGURE_MAX_BARS", 4000))
+MIN_POINTS_PER_TRACE = 100
+MIN_BARS_PER_TRACE = 8
+
+# Trace types kept in the shared template; the others only bloat every figure
+TEMPLATE_TRACE_TYPES = ("bar", "heatmap", "scatter", "scattergl")
+
+CHART_STYLE = dict(
+    paper_bgcolor="rgba(0,0,0,0)",
+    plot_bgcolor="rgba(0,0,0,0)",
+    font=dict(family="Inter, sans-serif", size=14, color="#f8fafc"),
+    margin=dict(l=20, r=20, t=60, b=20),
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+)
+
+
+@functools.cache
+def chart_template():
+    """
+    Dark theme shared by every figure, built once per process.
+
+    Starts from Plotly's "plotly_dark", keeps only the trace types the
+    dashboard draws and adds the dashboard style (transparent background,
+    fonts, margins, legend). Passing it at construction replaces the default
+    template instead of building and then overriding it.
+
+    Returns:
+        plotly.graph_objs.layout.Template: Shared template (do not mutate).
+    """
+    import plotly.graph_objs as go
+    import plotly.io as pio
+
+    dark = pio.templates["plotly_dark"]
+    template = go.layout.Template(
+        layout=dark.layout,
+        data={kind: dark.data[kind] for kind in TEMPLATE_TRACE_TYPES},
+    )
+    template.layout.update(CHART_STYLE)
+    return template
+
+
+def make_figure(traces, **layout):
+    """
+    Builds a figure on the shared template.
+
+    Args:
+        traces (list): Trace dicts with a "type" key (cheaper to validate
+            than trace objects).
+        **layout: Figure-specific layout, e.g. title, axes, hovermode.
+
+    Returns:
+        plotly.graph_objs.Figure: New figure.
+    """
+    import plotly.graph_objs as go
+
+    return go.Figure(data=traces, layout=dict(template=chart_template(), **layout))
+
+
+def epoch_ms(dates):
+    """
+    Dates as epoch milliseconds for a "date" axis.
+
+    Plotly serializes number arrays as binary blocks but dates as one ISO
+    string per point, which dominates serializing large figures and parsing
+    them back from JSON.
+    """
+    return pd.DatetimeIndex(dates).as_unit("ms").asi8.astype(float)
+
+
+def line_trace_type(n_points, threshold=None):
+    """
+    "scattergl" (WebGL) for figures with more than ``threshold`` points
+    (default ``WEBGL_POINTS_THRESHOLD``), "scatter" (SVG) otherwise.
+    """
+    threshold = WEBGL_POINTS_THRESHOLD if threshold is None else threshold
+    return "scattergl" if n_points > threshold else "scatter"
+
+
+def figure_budget(n_traces, per_trace, budget, minimum):
+    """
+    Items each trace may draw so that a figure stays within ``budget``.
+
+    Args:
+        n_traces (int): Traces in the figure.
+        per_trace (int): Preferred items per trace (None for no limit).
+        budget (int): Items for the whole figure.
+        minimum (int): Items each trace keeps however many there are.
+
+    Returns:
+        int: Items per trace, or None for no limit.
+    """
+    if per_trace is None or n_traces * per_trace <= budget:
+        return per_trace
+    return max(minimum, budget // max(n_traces, 1))
+
+
+def lttb_indices(values, max_points):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and the
+    average of the next bucket. Points are assumed evenly spaced in x.
+
+    Args:
+        values (np.ndarray): 1-D series without NaNs.
+        max_points (int): Number of points to keep (at least 3).
 
-def create_line_chart_figure(selected_tickers, stocks_df):
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    n = len(values)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    # Bucket bounds and next-bucket averages don't depend on the points kept,
+    # so compute them up front and keep the sequential pass in plain floats
+    bounds = (np.arange(max_points - 1) * ((n - 2) / (max_points - 2))).astype(int) + 1
+    bounds[-1] = n - 1
+    sums = np.add.reduceat(values, bounds[:-1])
+    avg_y = np.append(sums / np.diff(bounds), values[-1])
+    avg_x = np.append((bounds[:-1] + bounds[1:] - 1) / 2, n - 1)
+    ys = values.tolist()
+
+    kept = [0]
+    a = 0
+    for i in range(max_points - 2):
+        ax, ay = a, ys[a]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        best, best_area = bounds[i], -1.0
+        for j in range(bounds[i], bounds[i + 1]):
+            area = abs((ax - cx) * (ys[j] - ay) - (ax - j) * (cy - ay))
+            if area > best_area:
+                best, best_area = j, area
+        a = best
+        kept.append(a)
+    kept.append(n - 1)
+    return np.array(kept)
+
+
+def minmax_indices(values, max_points):
+    """
+    Min/max bucket downsampling: keeps each bucket's lowest and highest point.
+
+    Args:
+        values (np.ndarray): 1-D series without NaNs.
+        max_points (int): Upper bound on points kept.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+
+    buckets = max(1, max_points // 2)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = values
+    grid = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    valid = ~np.isnan(grid).all(axis=1)
+    lows = offsets[valid] + np.nanargmin(grid[valid], axis=1)
+    highs = offsets[valid] + np.nanargmax(grid[valid], axis=1)
+    return np.unique(np.concatenate([lows, highs, [0, n - 1]]))
+
+
+def downsample(dates, values, max_points=MAX_POINTS_PER_TRACE, method=None):
+    """
+    Reduces a series to at most ``max_points`` visually representative points.
+
+    Args:
+        dates (pd.DatetimeIndex): x values.
+        values (np.ndarray): y values; NaNs are dropped first.
+        max_points (int): Target number of points (e.g. chart pixel width).
+        method (str, optional): "lttb" or "minmax". Defaults to
+            ``DOWNSAMPLE_METHOD``.
+
+    Returns:
+        tuple: (dates, values) of the kept points.
+    """
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    dates, values = dates[valid], values[valid]
+    if max_points is None or len(values) <= max_points:
+        return dates, values
+
+    method = method or DOWNSAMPLE_METHOD
+    if method == "lttb":
+        keep = lttb_indices(values, max_points)
+    elif method == "minmax":
+        keep = minmax_indices(values, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return dates[keep], values[keep]
+
+
+def aggregate_returns(dates, returns, max_bars=WEEKLY_BARS_THRESHOLD, interval="1d"):
+    """
+    Compounds returns into the finest of ``RETURN_TIERS`` that fits.
+
+    Args:
+        dates (pd.DatetimeIndex): Bar dates.
+        returns (np.ndarray): (dates x tickers) simple returns.
+        max_bars (int): Bars per ticker shown at most (quarterly bars are
+            used when no tier fits).
+        interval (str): Bar interval of ``returns``, "1d", "1wk" or "1mo";
+            tiers finer than it are skipped.
+
+    Returns:
+        tuple: (dates, returns, label) where label is "Daily", "Weekly",
+        "Monthly" or "Quarterly".
+    """
+    tiers = RETURN_TIERS[INTERVAL_RETURN_TIERS[interval] :]
+    n = len(dates)
+    if n <= max_bars:
+        return dates, returns, tiers[0][1]
+
+    days = n * tiers[0][2]
+    freq, label = next(
+        ((freq, label) for freq, label, per in tiers if days / per <= max_bars),
+        tiers[-1][:2],
+    )
+    log_returns = pd.DataFrame(np.log1p(returns), index=dates)
+    grouped = log_returns.resample(freq).sum(min_count=1)
+    return grouped.index, np.expm1(grouped.to_numpy()), label
+
+
+@timed("chart:line")
+def create_line_chart_figure(
+    selected_tickers, stocks_df, snapshot=None, max_points=MAX_POINTS_PER_TRACE
+):
     """
     Creates a plotly figure for historical close prices.
+
+    Reads prices from ``snapshot`` (see ``compute_market_snapshot``) when given.
+    Each trace is downsampled to ``max_points`` (None keeps every point), or
+    fewer when the selection would exceed ``FIGURE_MAX_POINTS``; such large
+    figures use min/max buckets, which are vectorized. Figures with more than
+    ``WEBGL_POINTS_THRESHOLD`` points are drawn with WebGL.
     """
     if stocks_df is None or stocks_df.empty:
         return None
 
-    fig = go.Figure()
+    snapshot = snapshot or compute_market_snapshot(stocks_df, selected_tickers)
+    if snapshot is None:
+        return make_figure([])
 
-    for i, ticker in enumerate(selected_tickers):
-        try:
-            if ticker in stocks_df.columns:
-                close_data = stocks_df[ticker]["Close"]
-            else:
-                continue
-
-            fig.add_trace(
-                go.Scatter(
-                    x=close_data.index,
-                    y=close_data,
-                    mode="lines",
-                    name=ticker,
-                    line=dict(color=COLORS[i % len(COLORS)], width=2.5),
-                )
+    columns = [
+        (i, ticker, snapshot.index_of(ticker))
+        for i, ticker in enumerate(selected_tickers)
+        if snapshot.index_of(ticker) is not None
+    ]
+    per_trace = figure_budget(
+        len(columns), max_points, FIGURE_MAX_POINTS, MIN_POINTS_PER_TRACE
+    )
+    method = None if per_trace == max_points else "minmax"
+    dates = epoch_ms(snapshot.dates)
+
+    traces = []
+    for i, ticker, col in columns:
+        x, y = downsample(dates, snapshot.close[:, col], per_trace, method)
+        traces.append(
+            dict(
+                x=x,
+                y=y,
+                mode="lines",
+                name=ticker,
+                line=dict(color=COLORS[i % len(COLORS)], width=2.5),
             )
-        except (KeyError, ValueError):
-            continue
+        )
 
-    fig.update_layout(
+    n_points = sum(len(trace["y"]) for trace in traces)
+    trace_type = line_trace_type(n_points)
+    for trace in traces:
+        trace["type"] = trace_type
+    annotate(points=n_points, webgl=trace_type == "scattergl")
+
+    return make_figure(
+        traces,
         title="Historical Market Performance",
         xaxis_title="Timeline",
+        xaxis_type="date",
         yaxis_title="Close Price (USD)",
-        template="plotly_dark",
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font=dict(family="Inter, sans-serif", size=14, color="#f8fafc"),
         hovermode="x unified",
-        margin=dict(l=20, r=20, t=60, b=20),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
     )
-    return fig
 
 
-def create_relative_returns_figure(selected_tickers, stocks_df):
+@timed("chart:returns")
+def create_relative_returns_figure(
+    selected_tickers, stocks_df, snapshot=None, max_bars=WEEKLY_BARS_THRESHOLD
+):
     """
     Creates a plotly figure for relative returns.
+
+    Reads returns from ``snapshot`` (see ``compute_market_snapshot``) when given.
+    Histories longer than ``max_bars`` days (fewer when the selection would
+    exceed ``FIGURE_MAX_BARS``) are shown as compounded weekly, monthly or
+    quarterly returns. Plotly has no WebGL bar trace, so bars are only
+    reduced by aggregation.
     """
     if stocks_df is None or stocks_df.empty:
         return None
 
+    snapshot = snapshot or compute_market_snapshot(stocks_df, selected_tickers)
     traces = []
+    label = "Relative"
+    if snapshot is not None:
+        max_bars = figure_budget(
+            len(snapshot.tickers), max_bars, FIGURE_MAX_BARS, MIN_BARS_PER_TRACE
+        )
+        dates, returns, label = aggregate_returns(
+            snapshot.dates, snapshot.returns, max_bars, snapshot.interval
+        )
+        dates = epoch_ms(dates)
 
-    for i, ticker in enumerate(selected_tickers):
-        if ticker not in stocks_df.columns:
-            continue
-
-        stock_df = stocks_df[ticker].copy()
-        if stock_df.empty:
+    for i, ticker in enumerate(selected_tickers if snapshot else []):
+        col = snapshot.index_of(ticker)
+        if col is None:
             continue
 
-        stock_df.loc[:, "returns"] = stock_df["Close"].pct_change() * 100
         traces.append(
-            go.Bar(
-                x=stock_df.index,
-                y=stock_df["returns"],
+            dict(
+                type="bar",
+                x=dates,
+                y=returns[:, col] * 100,
                 name=ticker,
                 marker=dict(color=COLORS[i % len(COLORS)]),
             )
         )
 
-    layout = go.Layout(
-        title="Dynamic Growth Engine (Relative Returns %)",
-        xaxis=dict(title="Timeline"),
-        yaxis=dict(title="Return Velocity (%)"),
+    return make_figure(
+        traces,
+        title=f"Dynamic Growth Engine ({label} Returns %)",
+        xaxis_title="Timeline",
+        xaxis_type="date",
+        yaxis_title="Return Velocity (%)",
         barmode="group",
-        template="plotly_dark",
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font=dict(family="Inter, sans-serif", size=14, color="#f8fafc"),
         hovermode="x unified",
-        margin=dict(l=20, r=20, t=60, b=20),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
     )
 
-    return go.Figure(data=traces, layout=layout)
 
+@timed("chart:sentiment")
+def create_sentiment_chart_figure(news_df, panel=None):
+    """
+    Creates a bar chart of time-weighted sentiment by stock.
+
+    Each bar is the symbol's decayed mean score at its latest news day (see
+    ``src.sentiment.daily_sentiment``), so recent headlines weigh more than
+    older ones.
 
-def create_sentiment_chart_figure(news_df):
+    Args:
+        news_df (pd.DataFrame): Output of ``analyze_sentiment``.
+        panel (SentimentPanel, optional): Precomputed ``daily_sentiment``.
     """
-    Creates a bar chart of average sentiment scores by stock.
+    panel = panel or daily_sentiment(news_df)
+    if panel is None:
+        return None
+
+    scores = panel.latest()
+    trace = dict(
+        type="bar",
+        x=panel.tickers,
+        y=scores,
+        marker=dict(
+            color=scores,
+            colorscale="RdYlGn",
+            showscale=True,
+            colorbar=dict(title="Sentiment Intensity"),
+        ),
+        text=np.round(scores, 2),
+        textposition="auto",
+    )
+    return make_figure(
+        [trace],
+        title="Market Resonance Indicator (Sentiment Analysis)",
+        xaxis_title="Ticker Symbol",
+        yaxis_title="Time-Weighted Resonance Score",
+    )
+
+
+@timed("chart:sentiment:price")
+def create_sentiment_price_figure(selected_tickers, aligned, lookback=20):
     """
-    if news_df is None or news_df.empty or "sentiment_score" not in news_df.columns:
+    Creates a chart of cumulative return against decayed sentiment.
+
+    Returns (left axis) and sentiment (right axis, -1 to 1) share a color
+    per ticker. The chart starts ``lookback`` trading days before the first
+    headline.
+
+    Args:
+        selected_tickers (list): Ticker symbols, in color order.
+        aligned (pd.DataFrame): Output of ``src.sentiment.align_returns``.
+        lookback (int): Trading days shown before the first headline.
+    """
+    if aligned is None or aligned.empty or not aligned["sentiment"].notna().any():
         return None
 
-    if "publishedAt" in news_df.columns:
-        # Group by Symbol for a comparative summary
-        df_grouped = news_df.groupby("symbol")["sentiment_score"].mean().reset_index()
-
-        fig = go.Figure()
-
-        fig.add_trace(
-            go.Bar(
-                x=df_grouped["symbol"],
-                y=df_grouped["sentiment_score"],
-                marker=dict(
-                    color=df_grouped["sentiment_score"],
-                    colorscale="RdYlGn",
-                    showscale=True,
-                    colorbar=dict(title="Sentiment Intensity"),
-                ),
-                text=df_grouped["sentiment_score"].round(2),
-                textposition="auto",
+    dates = aligned["Date"].drop_duplicates()
+    first = dates.searchsorted(aligned.loc[aligned["sentiment"].notna(), "Date"].min())
+    aligned = aligned[aligned["Date"] >= dates.iloc[max(first - lookback, 0)]]
+
+    traces = []
+    for i, ticker in enumerate(selected_tickers):
+        rows = aligned[aligned["symbol"] == ticker]
+        if rows.empty:
+            continue
+        color = COLORS[i % len(COLORS)]
+        close = rows["Close"].to_numpy()
+        x = epoch_ms(rows["Date"])
+        traces.append(
+            dict(
+                type="scatter",
+                x=x,
+                y=(close / close[0] - 1) * 100,
+                mode="lines",
+                name=f"{ticker} return",
+                line=dict(color=color, width=2.5),
             )
         )
-
-        fig.update_layout(
-            title="Market Resonance Indicator (Sentiment Analysis)",
-            xaxis_title="Ticker Symbol",
-            yaxis_title="Mean Resonance Score",
-            template="plotly_dark",
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            font=dict(family="Inter, sans-serif", size=14, color="#f8fafc"),
-            margin=dict(l=20, r=20, t=60, b=20),
+        traces.append(
+            dict(
+                type="scatter",
+                x=x,
+                y=rows["sentiment"].to_numpy(),
+                mode="lines",
+                name=f"{ticker} sentiment",
+                yaxis="y2",
+                line=dict(color=color, width=1.5, dash="dot", shape="hv"),
+            )
         )
-        return fig
-    else:
+
+    return make_figure(
+        traces,
+        title="Sentiment vs Price",
+        xaxis_title="Timeline",
+        xaxis_type="date",
+        yaxis_title="Cumulative Return (%)",
+        yaxis2=dict(
+            title="Time-Weighted Sentiment",
+            overlaying="y",
+            side="right",
+            range=[-1, 1],
+            showgrid=False,
+        ),
+        hovermode="x unified",
+    )
+
+
+@timed("chart:correlation")
+def create_correlation_heatmap_figure(tickers, correlation, interval="1d"):
+    """
+    Creates a heatmap of the returns correlation matrix.
+
+    Args:
+        tickers (list): Ticker symbols, in matrix order.
+        correlation (np.ndarray): (N x N) correlation, NaN where undefined.
+        interval (str): Bar interval of the returns, "1d", "1wk" or "1mo".
+    """
+    if correlation is None or len(tickers) < 2:
         return None
+
+    trace = dict(
+        type="heatmap",
+        z=correlation,
+        x=tickers,
+        y=tickers,
+        zmin=-1,
+        zmax=1,
+        colorscale="RdBu",
+        reversescale=True,
+        texttemplate="%{z:.2f}",
+        colorbar=dict(title="Correlation"),
+        hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>",
+    )
+    label = RETURN_TIERS[INTERVAL_RETURN_TIERS[interval]][1]
+    return make_figure(
+        [trace],
+        title=f"Co-Movement Matrix ({label} Returns Correlation)",
+        yaxis=dict(autorange="reversed"),
+    )
+
+
+@timed("chart:intraday")
+def create_intraday_figure(stream):
+    """
+    Creates a line chart of a ``QuoteStream``'s intraday closes.
+
+    Built once per stream; ``update_intraday_figure`` then refreshes the
+    trace data in place as bars arrive, keeping the layout and the user's
+    zoom (``uirevision``). Trace types cannot change in place, so WebGL is
+    chosen up front for streams whose full buffer would cross the threshold.
+    """
+    trace_type = line_trace_type(stream.buffer.max_bars * len(stream.tickers))
+    traces = [
+        dict(
+            type=trace_type,
+            mode="lines",
+            name=ticker,
+            line=dict(color=COLORS[i % len(COLORS)], width=2),
+        )
+        for i, ticker in enumerate(stream.tickers)
+    ]
+    fig = make_figure(
+        traces,
+        title=f"Live Session ({stream.interval} bars)",
+        xaxis_title="Time (UTC)",
+        xaxis_type="date",
+        yaxis_title="Price (USD)",
+        hovermode="x unified",
+        uirevision="intraday",
+    )
+    update_intraday_figure(fig, stream)
+    return fig
+
+
+@timed("chart:intraday:update")
+def update_intraday_figure(fig, stream):
+    """
+    Points the intraday figure's traces at the stream's current bars.
+
+    Args:
+        fig (plotly.graph_objs.Figure): Figure from ``create_intraday_figure``.
+        stream (QuoteStream): Stream the figure was built for.
+
+    Returns:
+        plotly.graph_objs.Figure: The same figure.
+    """
+    buffer = stream.buffer
+    x = buffer.times.view("int64") / 1e6
+    with fig.batch_update():
+        for trace, ticker in zip(fig.data, stream.tickers, strict=True):
+            trace.update(x=x, y=buffer.series(ticker))
+    annotate(points=buffer.size * len(stream.tickers))
+    return fig
+
+
+def figure_to_json(fig):
+    """
+    Serializes a figure once for caching (uses orjson when installed).
+
+    Args:
+        fig (plotly.graph_objs.Figure): Figure to serialize.
+
+    Returns:
+        str: Plotly JSON.
+    """
+    return fig.to_json()
+
+
+def _decode_typed_array(obj):
+    """JSON object hook turning Plotly's base64 typed arrays into NumPy arrays."""
+    if "bdata" not in obj or "dtype" not in obj:
+        return obj
+    array = np.frombuffer(base64.b64decode(obj["bdata"]), dtype=obj["dtype"])
+    if "shape" in obj:
+        array = array.reshape([int(n) for n in str(obj["shape"]).split(",")])
+    return array
+
+
+def figure_from_json(spec):
+    """
+    Rebuilds a figure serialized with ``figure_to_json``.
+
+    Number arrays come back as NumPy arrays, which Plotly validates without
+    walking them element by element.
+
+    Args:
+        spec (str): Plotly JSON.
+
+    Returns:
+        plotly.graph_objs.Figure: Figure ready to render or update.
+    """
+    import plotly.graph_objs as go
+
+    return go.Figure(json.loads(spec, object_hook=_decode_typed_array))
+
+
+def figure_cache_key(name, *parts):
+    """
+    Shared cache key for a figure built from ``parts`` (tickers, period, data
+    version...). Rendering settings are part of the key, so replicas with
+    different thresholds do not share figures.
+    """
+    settings = (WEBGL_POINTS_THRESHOLD, FIGURE_MAX_POINTS, FIGURE_MAX_BARS)
+    digest = hashlib.sha1(repr((parts, settings)).encode()).hexdigest()
+    return f"figure:{name}:{digest}"
+
+
+def get_or_build_figure(name, key_parts, build, ttl):
+    """
+    Returns a figure through the shared cache, building it at most once.
+
+    Sessions and replicas asking for the same figure share one build: the
+    first builds and publishes it as JSON, the others wait for it and
+    rebuild the figure from the JSON instead of recomputing it.
+
+    Args:
+        name (str): Figure name, e.g. "line".
+        key_parts (tuple): Inputs identifying the figure's data.
+        build (callable): Zero-argument builder returning a figure or None.
+        ttl (float): Seconds the serialized figure is kept.
+
+    Returns:
+        plotly.graph_objs.Figure: Figure, or None if ``build`` returned None.
+    """
+    from src.shared import get_shared_cache
+
+    shared = get_shared_cache()
+    if shared is None:
+        return build()
+
+    key = figure_cache_key(name, *key_parts)
+    built = {}
+
+    def fetch(keys):
+        fig = built[key] = build()
+        return {} if fig is None else {key: figure_to_json(fig)}
+
+    specs = shared.get_or_fetch_many([key], fetch, ttl)
+    if key in built:
+        # Built here: no need to parse the JSON back
+        return built[key]
+    return figure_from_json(specs[key]) if key in specs else None
@@ -1,20 +1,340 @@
 import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
+
+from src.analysis import score_titles
+from src.archive import get_archive
+from src.batch import (
+    STATUS_ARCHIVED,
+    STATUS_CACHED,
+    STATUS_FAILED,
+    STATUS_OK,
+    STATUS_STALE,
+    BatchResult,
+    download_batched,
+)
+from src.cache import (
+    NEWS_TTL_SECONDS,
+    PRICE_TTL_SECONDS,
+    TIER_FREQUENCIES,
+    adjustment_changed,
+    get_news_store,
+    get_price_cache,
+    period_start,
+    resample_ohlcv,
+)
+from src.instrumentation import (
+    CACHE_HIT,
+    CACHE_MISS,
+    annotate,
+    in_current_span,
+    timed,
+)
+from src.providers import INTRADAY_INTERVALS, get_provider
+from src.shared import get_shared_cache
+from src.store import PriceStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# News fetch concurrency, overridable through the environment (.env)
+NEWS_MAX_WORKERS = int(os.environ.get("STOCK_NEWS_WORKERS", 8))
+NEWS_TIMEOUT = float(os.environ.get("STOCK_NEWS_TIMEOUT", 10))
+
+# yfinance pubDate layout, e.g. '2025-12-04T16:48:09Z'
+PUBDATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+EPOCH = pd.Timestamp(0, tz="UTC")
+
+
+def _shared_cache():
+    """Returns the shared cache tier, or None if disabled or unavailable."""
+    try:
+        return get_shared_cache()
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Shared cache unavailable, fetching directly: {e!s}")
+        return None
+
+
+def _download_shared(tickers, first, max_age=None, **download_kwargs):
+    """
+    Downloads bars from ``first`` onwards through the shared cache tier.
+
+    Each ticker is keyed by its first requested date, so concurrent sessions
+    and replicas needing the same bars share one upstream request instead of
+    each downloading them. Failed tickers are not cached.
+
+    Args:
+        tickers (list): Ticker symbols.
+        first (pd.Timestamp): First date requested (the key for the bars).
+        max_age (float, optional): Ignore shared entries older than this many
+            seconds.
+        **download_kwargs: ``period`` or ``start`` for ``download_batched``.
+
+    Returns:
+        BatchResult: Frames and per-ticker status, as ``download_batched``.
+    """
+    shared = _shared_cache()
+    if shared is None:
+        return download_batched(tickers, **download_kwargs)
+
+    keys = {f"prices:{first:%Y-%m-%d}:{ticker}": ticker for ticker in tickers}
+    result = BatchResult()
+
+    def fetch(owned):
+        batch = download_batched([keys[key] for key in owned], **download_kwargs)
+        result.errors.update(batch.errors)
+        return {
+            key: (batch.frames.get(keys[key]), batch.status[keys[key]])
+            for key in owned
+            if batch.status.get(keys[key]) != STATUS_FAILED
+        }
+
+    values = shared.get_or_fetch_many(list(keys), fetch, PRICE_TTL_SECONDS, max_age)
+    for key, ticker in keys.items():
+        frame, status = values.get(key, (None, STATUS_FAILED))
+        if frame is not None:
+            result.frames[ticker] = frame
+        result.status[ticker] = status
+    return result
+
+
+def _fetch_news_shared(ticker, max_age=None):
+    """
+    Fetches raw news for a ticker through the shared cache tier.
+
+    Returns:
+        list: Raw provider news items (None or empty if there are none).
+    """
+    shared = _shared_cache()
+    if shared is None:
+        return get_provider().news(ticker)
+
+    key = f"news:{ticker}"
+    values = shared.get_or_fetch_many(
+        [key], lambda _: {key: get_provider().news(ticker)}, NEWS_TTL_SECONDS, max_age
+    )
+    return values.get(key)
+
+
+@timed("prices:cache")
+def _load_cached(tickers, period, cache, max_age=None, interval="1d", since=None):
+    """
+    Serves tickers from the price cache, downloading only what is missing.
+
+    Tickers without stored history for the period, or whose last full
+    download is older than ``PRICE_FULL_REFRESH_SECONDS``, get a full
+    download; other stale tickers only fetch bars from their last stored date
+    onwards. That tail overlaps the last stored bar, and a ticker whose
+    overlapping close changed (a split or dividend re-adjusted the provider's
+    history) is downloaded in full again. Downloads go
+    through the shared cache tier, so sessions loading the same tickers at the
+    same time trigger one upstream request per ticker.
+
+    Args:
+        tickers (list): Ticker symbols.
+        period (str): yfinance period string.
+        cache (PriceCache): Cache to read from and refresh.
+        max_age (float, optional): Staleness threshold in seconds. Defaults to
+            the cache TTL.
+        interval (str): Bar interval to read: "1d", or the weekly ("1wk") or
+            monthly ("1mo") tier stored next to the daily bars.
+        since (pd.Timestamp, optional): First date needed, overriding the
+            period start (e.g. the day after archived history ends).
+
+    Returns:
+        tuple: (frames, status) where ``frames`` maps ticker -> date-indexed
+        OHLCV DataFrame (empty if nothing stored) and ``status`` maps ticker
+        -> download outcome (see ``src.batch``).
+    """
+    start = period_start(period) if since is None else since
+    fresh, stale, missing = cache.plan(tickers, start, max_age)
+    logger.info(
+        f"Price cache: {len(fresh)} fresh, {len(stale)} stale, {len(missing)} missing"
+    )
+    annotate(
+        cache=CACHE_MISS if stale or missing else CACHE_HIT,
+        fresh=len(fresh),
+        stale=len(stale),
+        missing=len(missing),
+    )
+    status = dict.fromkeys(fresh, STATUS_CACHED)
+
+    window = {"period": period} if since is None else {"start": f"{since:%Y-%m-%d}"}
+    if missing:
+        logger.info(f"Downloading full history for: {' '.join(missing)}")
+        result = _download_shared(missing, start, max_age, **window)
+        for ticker, frame in result.frames.items():
+            cache.store(ticker, frame, covered_from=start)
+        status.update(result.status)
+
+    if stale:
+        tail_start = min(stale.values())
+        logger.info(
+            f"Refreshing bars since {tail_start:%Y-%m-%d} for: {' '.join(stale)}"
+        )
+        result = _download_shared(
+            list(stale), tail_start, max_age, start=tail_start.strftime("%Y-%m-%d")
+        )
+        # The tail starts at each ticker's last stored bar; if the provider now
+        # prices that bar differently, the history was re-adjusted
+        stored = cache.load_many(list(result.frames), tail_start)
+        rescaled = [
+            ticker
+            for ticker, frame in result.frames.items()
+            if adjustment_changed(stored[ticker], frame)
+        ]
+        for ticker, frame in result.frames.items():
+            if ticker not in rescaled:
+                cache.store(ticker, frame)
+        # Tickers with no new bars are up to date; failed ones are served from
+        # the cache as they are and retried next time
+        cache.touch(
+            [
+                t
+                for t, s in result.status.items()
+                if s != STATUS_FAILED and t not in rescaled
+            ]
+        )
+        for ticker, outcome in result.status.items():
+            status[ticker] = STATUS_STALE if outcome == STATUS_FAILED else STATUS_OK
+
+        if rescaled:
+            logger.info(
+                f"Adjusted prices changed, downloading full history for: "
+                f"{' '.join(rescaled)}"
+            )
+            # Shared entries may still hold bars at the old scale
+            result = _download_shared(rescaled, start, 0, **window)
+            for ticker, frame in result.frames.items():
+                cache.store(ticker, frame, covered_from=start)
+            for ticker, outcome in result.status.items():
+                status[ticker] = STATUS_STALE if outcome == STATUS_FAILED else STATUS_OK
+
+    frames = cache.load_many(tickers, start, interval)
+    annotate(rows=sum(len(frame) for frame in frames.values()))
+    return frames, status
+
 
-def get_stock_data(ticker_string, period="2y"):
+def _fetch_frames(tickers, period, use_cache, max_age, interval="1d", since=None):
+    """
+    Loads per-ticker frames through the price cache, or directly if disabled.
+
+    Returns:
+        tuple: (frames, status) as returned by ``_load_cached``.
+    """
+    cache = None
+    if use_cache:
+        try:
+            cache = get_price_cache()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Price cache unavailable, downloading directly: {e!s}")
+
+    if cache is not None:
+        logger.info(f"Loading data for: {' '.join(tickers)}")
+        return _load_cached(tickers, period, cache, max_age, interval, since)
+
+    logger.info(f"Downloading data for: {' '.join(tickers)}")
+    window = {"period": period} if since is None else {"start": f"{since:%Y-%m-%d}"}
+    result = download_batched(tickers, **window)
+    frames = {t: resample_ohlcv(f, interval) for t, f in result.frames.items()}
+    return frames, result.status
+
+
+@timed("prices:archive")
+def _load_archived(archive, tickers, period, use_cache, max_age, interval):
+    """
+    Serves archived tickers: history from the archive, newer bars from the
+    price cache (see ``_fetch_frames``).
+
+    For weekly/monthly bars the archive is read up to the period before its
+    last one, which may be incomplete, and the cache serves the rest. Periods
+    reaching back before the archive's start are not served from it.
+
+    Args:
+        archive (PriceArchive): Open archive.
+        tickers (list): Ticker symbols.
+        period (str): yfinance period string.
+        use_cache (bool): Whether to use the on-disk price cache for the tail.
+        max_age (float, optional): Staleness threshold for the tail.
+        interval (str): Bar interval, "1d", "1wk" or "1mo".
+
+    Returns:
+        tuple: (store, rest) where ``store`` is a PriceStore of the archived
+        tickers (None if the archive has none of them in the period) and
+        ``rest`` lists the tickers left to load elsewhere.
+    """
+    start = period_start(period)
+    if interval == "1d":
+        cut = archive.end + pd.Timedelta(days=1)
+    else:
+        cut = archive.end.to_period(TIER_FREQUENCIES[interval]).start_time
+    archived = [t for t in tickers if t in archive]
+    if (
+        not archived
+        or not archive.start <= start < cut
+        or interval not in archive.intervals
+    ):
+        return None, tickers
+
+    store = archive.store(archived, start, cut - pd.Timedelta(days=1), interval)
+    store.status = dict.fromkeys(store.tickers, STATUS_ARCHIVED)
+    if cut <= pd.Timestamp.now().normalize():
+        frames, status = _fetch_frames(
+            archived, period, use_cache, max_age, interval, since=cut
+        )
+        tail = PriceStore.from_frames(frames, interval=interval)
+        tail.status = {t: s for t, s in status.items() if t in tail}
+        store = store.merge(tail)
+    annotate(
+        archived=len(archived),
+        rows=int(store.valid.sum()) if store.valid is not None else 0,
+    )
+    return store, [t for t in tickers if t not in archive]
+
+
+def _combine(frames):
+    """
+    Joins per-ticker frames into yfinance's ``group_by="ticker"`` layout.
+
+    Args:
+        frames (dict): Ticker -> date-indexed OHLCV DataFrame.
+
+    Returns:
+        pd.DataFrame: MultiIndex (ticker, field) frame, or None if all empty.
+    """
+    frames = {ticker: frame for ticker, frame in frames.items() if not frame.empty}
+    if not frames:
+        return None
+    stocks_df = pd.concat(frames, axis=1)
+    stocks_df.columns.names = ["Ticker", "Price"]
+    return stocks_df
+
+
+@timed("prices:frame")
+def get_stock_data(
+    ticker_string, period="2y", use_cache=True, max_age=None, interval="1d"
+):
     """
     Downloads stock data for the given tickers.
 
+    History is read from the on-disk price cache first; only missing tickers
+    and the tail since the last stored bar are fetched from the active
+    market-data provider (Yahoo Finance by default, see ``src.providers``).
+
     Args:
         ticker_string (str): Space-separated list of tickers.
         period (str): Period to download data for. Default is "2y".
+        use_cache (bool): Whether to use the on-disk price cache.
+        max_age (float, optional): Refresh cached tickers older than this many
+            seconds. Defaults to the cache TTL.
+        interval (str): Bar interval, "1d", "1wk" or "1mo". Default is "1d";
+            see ``src.cache.interval_for_period`` for one that suits a period.
 
     Returns:
         pd.DataFrame: DataFrame containing stock data, or None if error.
@@ -24,23 +344,25 @@ def get_stock_data(ticker_string, period="2y"):
         return None
 
     try:
-        logger.info(f"Downloading data for: {ticker_string}")
-        stocks_df = yf.download(
-            ticker_string, period=period, group_by="ticker", progress=False
+        frames, _ = _fetch_frames(
+            ticker_string.split(), period, use_cache, max_age, interval
         )
+        stocks_df = _combine(frames)
 
+        provider = get_provider().name
         if stocks_df is None:
-            logger.error(f"yfinance returned None for tickers: {ticker_string}")
+            logger.error(f"{provider} provider returned no data for: {ticker_string}")
             return None
 
         if stocks_df.empty:
             logger.warning(
-                f"yfinance returned empty DataFrame for tickers: {ticker_string}"
+                f"{provider} provider returned empty bars for: {ticker_string}"
             )
             return None
 
-        # Clean the data
-        stocks_df.dropna(inplace=True)
+        # Clean the data: drop dates with no bars at all, but keep one ticker's
+        # gaps (NaN) from erasing the other tickers' data on those dates
+        stocks_df.dropna(how="all", inplace=True)
 
         if stocks_df.empty:
             logger.warning(
@@ -56,94 +378,330 @@ def get_stock_data(ticker_string, period="2y"):
         return None
 
 
-def get_stock_news(selected_tickers):
+@timed("prices:store")
+def get_price_store(
+    ticker_string, period="2y", use_cache=True, max_age=None, interval="1d"
+):
     """
-    Fetches news for the selected tickers using yfinance.
+    Loads stock data into a columnar PriceStore.
+
+    Same sourcing as ``get_stock_data`` but skips the MultiIndex DataFrame:
+    per-ticker frames go straight into contiguous NumPy arrays on a shared
+    date index, with each ticker's gaps kept as NaN. When a price archive is
+    configured (``STOCK_ARCHIVE_DIR``, see ``src.archive``), archived tickers
+    are sliced from it and only their bars after the archive come from the
+    cache.
+
+    Args:
+        ticker_string (str): Space-separated list of tickers.
+        period (str): Period to download data for. Default is "2y".
+        use_cache (bool): Whether to use the on-disk price cache.
+        max_age (float, optional): Refresh cached tickers older than this many
+            seconds. Defaults to the cache TTL.
+        interval (str): Bar interval, "1d", "1wk" or "1mo". Default is "1d".
+
+    Returns:
+        PriceStore: Store with the tickers that returned data, with per-ticker
+        download outcomes in ``store.status``; None if error.
+    """
+    if not ticker_string or not ticker_string.strip():
+        logger.error("No tickers provided to get_price_store")
+        return None
+
+    try:
+        tickers = ticker_string.split()
+        archived = None
+        archive = get_archive()
+        if archive is not None:
+            archived, tickers = _load_archived(
+                archive, tickers, period, use_cache, max_age, interval
+            )
+
+        frames, status = (
+            _fetch_frames(tickers, period, use_cache, max_age, interval)
+            if tickers
+            else ({}, {})
+        )
+        store = PriceStore.from_frames(frames, interval=interval)
+        store.status = status
+        if archived is not None:
+            store = archived.merge(store)
+
+        if store.empty:
+            logger.warning(f"No price data available for: {ticker_string}")
+            return None
+
+        logger.info(f"Loaded {len(store)} tickers x {len(store.dates)} dates")
+        return store
+
+    except Exception as e:
+        logger.error(f"Error loading price store for {ticker_string}: {e!s}")
+        return None
+
+
+@timed("prices:intraday")
+def get_intraday_bars(tickers, interval="1m", since=None):
+    """
+    Fetches intraday bars from the active market-data provider.
+
+    Intraday bars bypass the price caches: they are polled by ``src.stream``,
+    which only asks for bars at or after the last one it holds.
+
+    Args:
+        tickers (list): Ticker symbols.
+        interval (str): Bar length, one of ``INTRADAY_INTERVALS``.
+        since (pd.Timestamp, optional): Only bars at or after this time.
+
+    Returns:
+        dict: Ticker -> time-indexed OHLCV DataFrame; empty if the provider
+        failed or has no new bars.
+    """
+    if interval not in INTRADAY_INTERVALS:
+        raise ValueError(f"Unsupported intraday interval: {interval}")
+
+    try:
+        frames = get_provider().intraday(list(tickers), interval=interval, since=since)
+    except Exception as e:
+        logger.error(f"Error fetching {interval} bars for {' '.join(tickers)}: {e!s}")
+        return {}
+    annotate(rows=sum(len(frame) for frame in frames.values()))
+    return frames
+
+
+def _news_url(data):
+    """Resolves an item's link from the flat or nested yfinance layouts."""
+    url = data.get("link")
+    if not url:
+        click_through = data.get("clickThroughUrl")
+        if click_through and isinstance(click_through, dict):
+            url = click_through.get("url")
+    if not url:
+        canonical = data.get("canonicalUrl")
+        if canonical and isinstance(canonical, dict):
+            url = canonical.get("url")
+    return url
+
+
+def _published_epochs(values):
+    """
+    Converts raw publish times to epoch seconds (UTC) in one vectorized pass.
+
+    ``providerPublishTime`` epoch numbers are taken as-is and ``pubDate`` ISO
+    strings are parsed with the fixed yfinance layout, falling back to general
+    ISO 8601 only for strings that do not match it. Nothing goes through
+    per-element mixed-type inference.
+
+    Args:
+        values (list): Raw publish times (numbers, ISO strings or None).
+
+    Returns:
+        np.ndarray: Float epoch seconds, NaN where missing or unparseable.
+    """
+    epochs = np.full(len(values), np.nan)
+    iso_positions, iso_values = [], []
+    for i, value in enumerate(values):
+        if isinstance(value, str):
+            iso_positions.append(i)
+            iso_values.append(value)
+        elif isinstance(value, int | float) and not isinstance(value, bool):
+            epochs[i] = value
+
+    if iso_values:
+        iso = pd.Series(iso_values)
+        parsed = pd.to_datetime(iso, format=PUBDATE_FORMAT, utc=True, errors="coerce")
+        unmatched = parsed.isna()
+        if unmatched.any():
+            parsed[unmatched] = pd.to_datetime(
+                iso[unmatched], format="ISO8601", utc=True, errors="coerce"
+            )
+        epochs[iso_positions] = (parsed - EPOCH) / pd.Timedelta(seconds=1)
+    return epochs
+
+
+def _new_news_items(ticker, ticker_news, store):
+    """
+    Parses and scores only the raw items not yet in the news store.
+
+    Providers list news newest first, so items published before the ticker's
+    watermark have already been ingested (or pruned) and are skipped outright.
+    The rest are checked against the seen-item index by id (falling back to
+    URL, then title) before being parsed.
+
+    Args:
+        ticker (str): Ticker the items belong to.
+        ticker_news (list): Raw yfinance-style news dicts.
+        store (NewsStore): Store holding the seen-item index and watermark.
+
+    Returns:
+        list: Cleaned dicts with item_id, title, published_at, url and
+        sentiment for unseen items that have a title.
+    """
+    # Handle nested content structure if present (new yfinance behavior)
+    contents = [item.get("content", item) for item in ticker_news]
+    published = _published_epochs(
+        [data.get("pubDate") or data.get("providerPublishTime") for data in contents]
+    )
+    watermark = store.watermark(ticker)
+    if watermark is not None:
+        # NaN (unknown time) compares False, so those items are kept
+        skip = published < watermark
+    else:
+        skip = np.zeros(len(contents), dtype=bool)
+
+    candidates = {}
+    for item, data, when, skipped in zip(
+        ticker_news, contents, published, skip, strict=True
+    ):
+        if skipped:
+            continue
+        item_id = (
+            item.get("id")
+            or item.get("uuid")
+            or data.get("id")
+            or _news_url(data)
+            or data.get("title")
+        )
+        if item_id:
+            candidates.setdefault(str(item_id), (data, when))
+
+    seen = store.seen(ticker, list(candidates))
+    news_data = [
+        {
+            "item_id": item_id,
+            "title": data.get("title"),
+            "published_at": None if np.isnan(when) else float(when),
+            "url": _news_url(data),
+        }
+        for item_id, (data, when) in candidates.items()
+        if item_id not in seen and data.get("title")
+    ]
+    scores = score_titles([item["title"] for item in news_data])
+    for item, score in zip(news_data, scores, strict=True):
+        item["sentiment"] = float(score)
+    return news_data
+
+
+@timed("news:ingest")
+def _ingest_ticker_news(ticker, store, max_age=None):
+    """
+    Fetches news for one ticker and stores the unseen items.
+
+    The fetch goes through the shared cache tier, so concurrent sessions
+    refreshing the same ticker share one upstream request.
+
+    Returns:
+        int: Number of newly ingested items.
+    """
+    logger.info(f"Fetching news for {ticker}")
+    ticker_news = _fetch_news_shared(ticker, max_age)
+
+    if not ticker_news:
+        logger.info(f"No news available for {ticker}")
+    new_items = _new_news_items(ticker, ticker_news or [], store)
+    store.ingest(ticker, new_items)
+    annotate(rows=len(new_items), ticker=ticker, received=len(ticker_news or []))
+    return len(new_items)
+
+
+@timed("news:load")
+def get_stock_news(
+    selected_tickers, max_workers=NEWS_MAX_WORKERS, timeout=NEWS_TIMEOUT, max_age=None
+):
+    """
+    Fetches news for the selected tickers from the active market-data provider.
+
+    News is ingested incrementally into the persistent news store: tickers
+    fetched within ``max_age`` seconds (by an earlier request or the prefetch
+    scheduler) are not refetched, and for the rest only headlines not seen
+    before are parsed and sentiment-scored. Fetches run concurrently on up to
+    ``max_workers`` threads, so wall time tracks the slowest request rather
+    than the sum. A failing or timed-out ticker is reported without affecting
+    the others, and its previously stored news is still returned.
 
     Args:
         selected_tickers (list): List of ticker symbols.
+        max_workers (int): Maximum number of requests in flight.
+        timeout (float): Seconds allowed per ticker request, counted from
+            when the request starts.
+        max_age (float, optional): Maximum age of stored news in seconds.
+            Defaults to the news store TTL; 0 forces a refetch.
 
     Returns:
-        pd.DataFrame: DataFrame containing news items, or empty DataFrame.
+        pd.DataFrame: News items in ``selected_tickers`` order, newest first per
+        ticker, with a ``sentiment_score`` column; empty DataFrame if none.
     """
     if not selected_tickers:
         logger.warning("No tickers provided to get_stock_news")
         return pd.DataFrame()
 
-    news_data = []  # List to hold cleaned dicts
+    store = get_news_store()
+    pending = store.stale(list(selected_tickers), max_age)
     failed_tickers = []
-
-    for ticker in selected_tickers:
-        try:
-            logger.info(f"Fetching news for {ticker}")
-            ticker_obj = yf.Ticker(ticker)
-
-            if not hasattr(ticker_obj, "news"):
-                logger.warning(f"Ticker {ticker} does not have news attribute")
-                failed_tickers.append(ticker)
-                continue
-
-            ticker_news = ticker_obj.news
-
-            if not ticker_news:
-                logger.info(f"No news available for {ticker}")
-                continue
-
-            for item in ticker_news:
-                # Handle nested content structure if present (new yfinance behavior)
-                data = item.get("content", item)
-
-                # Extract fields
-                title = data.get("title")
-
-                # Date handling
-                published = data.get("pubDate") or data.get("providerPublishTime")
-
-                # URL handling
-                url = data.get("link")
-                if not url:
-                    click_through = data.get("clickThroughUrl")
-                    if click_through and isinstance(click_through, dict):
-                        url = click_through.get("url")
-                if not url:
-                    canonical = data.get("canonicalUrl")
-                    if canonical and isinstance(canonical, dict):
-                        url = canonical.get("url")
-
-                if title:
-                    news_data.append(
-                        {
-                            "symbol": ticker,
-                            "title": title,
-                            "publishedAt": published,
-                            "url": url,
-                        }
-                    )
-
-        except Exception as e:
-            logger.error(f"Error fetching news for {ticker}: {e!s}")
-            failed_tickers.append(ticker)
-            continue
+    ingested = 0
+
+    if pending:
+        workers = max(1, min(max_workers, len(pending)))
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="news")
+        ingest = in_current_span(_ingest_ticker_news)
+        started = {}
+
+        def fetch(ticker):
+            # A ticker's timeout runs from when a worker picks it up, not
+            # from when it was queued behind other requests
+            started[ticker] = time.monotonic()
+            return ingest(ticker, store, max_age)
+
+        futures = {pool.submit(fetch, ticker): ticker for ticker in pending}
+        waiting, hung = set(futures), set()
+        while waiting:
+            deadlines = [
+                started[futures[f]] + timeout for f in waiting if futures[f] in started
+            ]
+            wake = min(deadlines, default=time.monotonic() + timeout)
+            done, _ = wait(
+                waiting,
+                timeout=max(0.0, wake - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                waiting.discard(future)
+                try:
+                    ingested += future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching news for {futures[future]}: {e!s}")
+                    failed_tickers.append(futures[future])
+
+            now = time.monotonic()
+            for future in list(waiting):
+                ticker = futures[future]
+                if ticker in started and now - started[ticker] >= timeout:
+                    logger.error(f"Timed out fetching news for {ticker}")
+                    failed_tickers.append(ticker)
+                    waiting.discard(future)
+                    hung.add(future)
+            # Queued tickers never start while every worker is stuck on a
+            # request that already timed out
+            if sum(not f.done() for f in hung) >= workers:
+                for future in waiting:
+                    logger.error(f"No free worker to fetch news for {futures[future]}")
+                    failed_tickers.append(futures[future])
+                break
+
+        # Don't block on hung requests; their threads finish in the background
+        pool.shutdown(wait=False, cancel_futures=True)
 
     if failed_tickers:
         logger.warning(f"Failed to fetch news for: {', '.join(failed_tickers)}")
-
-    if news_data:
-        news_df = pd.DataFrame(news_data)
-
-        # Clean timestamps
-        if "publishedAt" in news_df.columns:
-            # pubDate is often ISO string '2025-12-04T16:48:09Z'
-            # providerPublishTime is often int timestamp
-            # pd.to_datetime handles mixed reasonably well usually
-            news_df["publishedAt"] = pd.to_datetime(
-                news_df["publishedAt"], errors="coerce"
-            )
-
-        news_df.drop_duplicates(inplace=True)
-        logger.info(f"Successfully fetched {len(news_df)} news items")
-    else:
+    annotate(
+        cache=CACHE_MISS if pending else CACHE_HIT,
+        fetched=len(pending),
+        new_items=ingested,
+        failed=len(failed_tickers),
+    )
+
+    news_df = store.load(list(selected_tickers))
+    if news_df.empty:
         logger.info("No news data retrieved for any ticker")
-        news_df = pd.DataFrame()
-
+    else:
+        logger.info(f"Serving {len(news_df)} news items ({ingested} new)")
     return news_df
@@ -0,0 +1,359 @@
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+logger = logging.getLogger(__name__)
+# Finished spans as one JSON object per line, enabled with STOCK_METRICS_LOG=1
+metrics_logger = logging.getLogger("stock.metrics")
+
+# Instrumentation settings, overridable through the environment (.env)
+INSTRUMENTATION_ENABLED = os.environ.get("STOCK_INSTRUMENTATION", "1") == "1"
+METRICS_LOG_ENABLED = os.environ.get("STOCK_METRICS_LOG", "0") == "1"
+MAX_SPANS = int(os.environ.get("STOCK_METRICS_MAX_SPANS", 2000))
+
+# Span.cache values
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+
+_span_ids = itertools.count(1)
+
+
+@dataclass
+class Span:
+    """
+    One timed pipeline stage.
+
+    Attributes:
+        stage (str): Stage name such as "prices:load" or "chart:line".
+        span_id (int): Process-unique id.
+        parent_id (int): Id of the enclosing span on the same thread, or None.
+        started_at (float): Wall-clock start time (epoch seconds).
+        duration (float): Elapsed seconds, set when the span ends.
+        rows (int): Rows, items or tickers produced, if known.
+        bytes (int): Payload size in bytes, if known.
+        cache (str): CACHE_HIT, CACHE_MISS or None if the stage has no cache.
+        error (str): Exception message if the stage raised.
+        attrs (dict): Extra stage-specific fields.
+    """
+
+    stage: str
+    span_id: int = field(default_factory=lambda: next(_span_ids))
+    parent_id: int = None
+    started_at: float = 0.0
+    duration: float = 0.0
+    rows: int = None
+    bytes: int = None
+    cache: str = None
+    error: str = None
+    attrs: dict = field(default_factory=dict)
+    thread: str = field(default_factory=lambda: threading.current_thread().name)
+
+
+class SpanRecorder:
+    """
+    Thread-safe store of finished spans and per-stage totals.
+
+    Keeps the most recent ``max_spans`` spans for drill-down plus running
+    totals per stage (count, time, rows, bytes, cache hits/misses) that never
+    roll over, so exports stay monotonic as Prometheus counters expect.
+    """
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self._spans = deque(maxlen=max_spans)
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, span):
+        with self._lock:
+            self._spans.append(span)
+            totals = self._totals.setdefault(
+                span.stage,
+                {
+                    "count": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "rows": 0,
+                    "bytes": 0,
+                    "hits": 0,
+                    "misses": 0,
+                    "errors": 0,
+                },
+            )
+            totals["count"] += 1
+            totals["seconds"] += span.duration
+            totals["max_seconds"] = max(totals["max_seconds"], span.duration)
+            totals["rows"] += span.rows or 0
+            totals["bytes"] += span.bytes or 0
+            totals["hits"] += span.cache == CACHE_HIT
+            totals["misses"] += span.cache == CACHE_MISS
+            totals["errors"] += span.error is not None
+
+    def spans(self, stage=None):
+        """Recent spans, oldest first, optionally for one stage."""
+        with self._lock:
+            spans = list(self._spans)
+        return [s for s in spans if stage is None or s.stage == stage]
+
+    def trace(self, root_id):
+        """
+        Spans nested under ``root_id`` (including the root), in start order.
+
+        Args:
+            root_id (int): Span id of the root, e.g. one app run.
+
+        Returns:
+            list: (depth, Span) tuples.
+        """
+        spans = self.spans()
+        children = {}
+        for span in spans:
+            children.setdefault(span.parent_id, []).append(span)
+        by_id = {span.span_id: span for span in spans}
+        if root_id not in by_id:
+            return []
+
+        result = []
+        stack = [(0, by_id[root_id])]
+        while stack:
+            depth, span = stack.pop()
+            result.append((depth, span))
+            nested = sorted(children.get(span.span_id, []), key=lambda s: s.started_at)
+            stack.extend((depth + 1, child) for child in reversed(nested))
+        return result
+
+    def summary(self):
+        """
+        Per-stage totals.
+
+        Returns:
+            list: Dicts with stage, count, total/mean/max milliseconds, rows,
+            bytes, hits, misses and errors, slowest stage first.
+        """
+        with self._lock:
+            totals = {stage: dict(t) for stage, t in self._totals.items()}
+        rows = [
+            {
+                "stage": stage,
+                "count": t["count"],
+                "total_ms": t["seconds"] * 1000,
+                "mean_ms": t["seconds"] * 1000 / t["count"],
+                "max_ms": t["max_seconds"] * 1000,
+                "rows": t["rows"],
+                "bytes": t["bytes"],
+                "hits": t["hits"],
+                "misses": t["misses"],
+                "errors": t["errors"],
+            }
+            for stage, t in totals.items()
+        ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def to_json(self):
+        """Recent spans as a JSON array."""
+        return json.dumps([asdict(span) for span in self.spans()], default=str)
+
+    def to_prometheus(self, prefix="stock_stage"):
+        """
+        Per-stage totals in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text, e.g. for a node-exporter textfile collector.
+        """
+        with self._lock:
+            totals = {stage: dict(t) for stage, t in self._totals.items()}
+        metrics = [
+            ("duration_seconds", "summary", "Time spent in each pipeline stage."),
+            ("rows_total", "counter", "Rows or items produced by each stage."),
+            ("bytes_total", "counter", "Payload bytes produced by each stage."),
+            ("cache_total", "counter", "Cache lookups per stage by result."),
+            ("errors_total", "counter", "Stage executions that raised."),
+        ]
+        lines = []
+        for name, kind, help_text in metrics:
+            metric = f"{prefix}_{name}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for stage, t in sorted(totals.items()):
+                label = f'stage="{stage}"'
+                if name == "duration_seconds":
+                    lines.append(f"{metric}_sum{{{label}}} {t['seconds']:.6f}")
+                    lines.append(f"{metric}_count{{{label}}} {t['count']}")
+                elif name == "cache_total":
+                    lines.append(f'{metric}{{{label},result="hit"}} {t["hits"]}')
+                    lines.append(f'{metric}{{{label},result="miss"}} {t["misses"]}')
+                else:
+                    key = name.removesuffix("_total")
+                    lines.append(f"{metric}{{{label}}} {t[key]}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._totals.clear()
+
+
+_recorder = SpanRecorder()
+_local = threading.local()
+
+
+def get_recorder():
+    """
+    Returns the process-wide span recorder.
+
+    Returns:
+        SpanRecorder: Shared recorder instance.
+    """
+    return _recorder
+
+
+def current_span():
+    """Innermost open span on this thread, or None."""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def span(stage, **attrs):
+    """
+    Times the enclosed block as one pipeline stage.
+
+    The yielded Span can be annotated inside the block (``rows``, ``bytes``,
+    ``cache``, ``attrs``). Spans opened inside it on the same thread are
+    recorded as its children.
+
+    Args:
+        stage (str): Stage name.
+        **attrs: Initial extra fields.
+
+    Yields:
+        Span: The open span.
+    """
+    parent = current_span()
+    current = Span(
+        stage,
+        parent_id=parent.span_id if parent else None,
+        started_at=time.time(),
+        attrs=attrs,
+    )
+    if not INSTRUMENTATION_ENABLED:
+        yield current
+        return
+
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = str(e) or type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        stack.pop()
+        _recorder.record(current)
+        if METRICS_LOG_ENABLED:
+            metrics_logger.info(json.dumps(asdict(current), default=str))
+
+
+def in_current_span(func):
+    """
+    Wraps ``func`` so spans it opens nest under the caller's current span.
+
+    Used for work handed to thread pools, whose threads otherwise start with
+    no parent span.
+    """
+    parent = current_span()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if parent is None:
+            return func(*args, **kwargs)
+        stack = _local.__dict__.setdefault("stack", [])
+        stack.append(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stack.pop()
+
+    return wrapper
+
+
+def annotate(rows=None, bytes=None, cache=None, **attrs):
+    """
+    Sets fields on the innermost open span; a no-op outside any span.
+
+    Lets a function decorated with ``timed`` report what it did (cache
+    outcome, counts) without opening a nested span.
+    """
+    current = current_span()
+    if current is None:
+        return
+    if rows is not None:
+        current.rows = rows
+    if bytes is not None:
+        current.bytes = bytes
+    if cache is not None:
+        current.cache = cache
+    current.attrs.update(attrs)
+
+
+def frame_nbytes(frame):
+    """
+    Shallow byte size of a DataFrame or Series from its dtypes.
+
+    Much cheaper than ``memory_usage()``, which builds a Series per call.
+    """
+    dtypes = [frame.dtype] if frame.ndim == 1 else frame.dtypes
+    return len(frame) * sum(getattr(dtype, "itemsize", 8) for dtype in dtypes)
+
+
+def payload_size(value):
+    """
+    Row count and byte size of a stage result, where cheaply known.
+
+    Returns:
+        tuple: (rows, bytes), either of which may be None.
+    """
+    if value is None:
+        return None, None
+    if hasattr(value, "memory_usage") and hasattr(value, "shape"):
+        # DataFrame / Series
+        return len(value), frame_nbytes(value)
+    if hasattr(value, "data") and hasattr(value, "layout"):
+        # Plotly figure: one row per trace; its serialized size is recorded
+        # by the ``render:chart`` span that sends it (app.render_chart)
+        return len(value.data), None
+    rows = len(value) if hasattr(value, "__len__") else None
+    size = getattr(value, "nbytes", None)
+    return rows, int(size) if size is not None else None
+
+
+def timed(stage):
+    """
+    Decorator recording each call as a span named ``stage``.
+
+    Row count and bytes are filled from the return value when the function
+    did not set them itself (see ``payload_size``).
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage) as current:
+                result = func(*args, **kwargs)
+                rows, size = payload_size(result)
+                if current.rows is None:
+                    current.rows = rows
+                if current.bytes is None:
+                    current.bytes = size
+                return result
+
+        return wrapper
+
+    return decorator
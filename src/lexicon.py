@@ -0,0 +1,403 @@
+"""
+Vectorized VADER scoring for bulk headline sets.
+
+``LexiconScorer`` computes the same compound score as VADER's
+``SentimentIntensityAnalyzer.polarity_scores`` for many titles at once.
+Titles are split in bulk and their tokens factorized, so punctuation
+stripping, case checks and lexicon lookups run once per distinct token
+rather than once per occurrence. The rules (negation, "no", boosters and
+dampeners, ALL CAPS emphasis, idioms, "least", "but" and punctuation
+emphasis) are then applied to flat token arrays, with the Python loop only
+over the three preceding-word positions VADER inspects. Only VADER's
+order-dependent "but" adjustment is replayed per title, for the titles that
+contain "but".
+
+``score_compound`` splits large inputs into chunks and can score them on a
+process pool.
+"""
+
+import os
+import string
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from src.batch import chunked
+
+# Bulk scoring settings, overridable through the environment (.env)
+# Worker processes for ``score_compound``; 1 scores in-process
+SENTIMENT_WORKERS = int(os.environ.get("STOCK_SENTIMENT_WORKERS", 1))
+# Titles per chunk; inputs no larger than one chunk are scored in-process
+SENTIMENT_CHUNK_SIZE = int(os.environ.get("STOCK_SENTIMENT_CHUNK_SIZE", 20_000))
+
+# Lower-case words the rules test for; each gets a keyword code (index + 1)
+KEYWORDS = (
+    "no",
+    "kind",
+    "of",
+    "but",
+    "least",
+    "at",
+    "very",
+    "never",
+    "so",
+    "this",
+    "without",
+    "doubt",
+    "or",
+    "nor",
+)
+NO, KIND, OF, BUT, LEAST, AT, VERY, NEVER, SO, THIS, WITHOUT, DOUBT, OR, NOR = range(
+    1, len(KEYWORDS) + 1
+)
+
+# VADER's normalization constant for the compound score
+ALPHA = 15
+
+# Below this many titles VADER's own per-title loop is faster
+MIN_BATCH = 32
+
+
+def _shift(values, offset, pos, lengths, fill):
+    """
+    Value of the token ``offset`` positions away in the same title.
+
+    Args:
+        values (np.ndarray): Per-token values.
+        offset (int): Negative for preceding tokens, positive for following.
+        pos (np.ndarray): Position of each token within its title.
+        lengths (np.ndarray): Title length of each token.
+        fill: Value where the neighbour falls outside the title.
+
+    Returns:
+        np.ndarray: Neighbour values aligned with ``values``.
+    """
+    out = np.full_like(values, fill)
+    if offset < 0:
+        out[-offset:] = values[:offset]
+        out[pos < -offset] = fill
+    else:
+        out[:-offset] = values[offset:]
+        out[pos >= lengths - offset] = fill
+    return out
+
+
+class LexiconScorer:
+    """
+    Compound VADER scores for batches of titles.
+
+    The lexicon, booster, negation and idiom tables come from the installed
+    ``vaderSentiment`` package, so scores follow its version.
+    """
+
+    def __init__(self):
+        # Imported lazily so price-only callers never load VADER
+        from vaderSentiment import vaderSentiment as vader
+
+        analyzer = self.analyzer = vader.SentimentIntensityAnalyzer()
+        self.lexicon = analyzer.lexicon
+        self.boosters = vader.BOOSTER_DICT
+        self.negations = frozenset(vader.NEGATE)
+        self.n_scalar = vader.N_SCALAR
+        self.c_incr = vader.C_INCR
+        # VADER replaces emojis one character at a time
+        self.emojis = {c: text for c, text in analyzer.emojis.items() if len(c) == 1}
+        self._emoji_chars = frozenset(self.emojis)
+        # Multi-word idioms and boosters, as word tuples
+        self.special_cases = {
+            tuple(phrase.split()): value
+            for phrase, value in vader.SPECIAL_CASES.items()
+        }
+        self.phrase_boosters = {
+            tuple(phrase.split()): value
+            for phrase, value in self.boosters.items()
+            if " " in phrase
+        }
+
+    def _replace_emojis(self, text):
+        """VADER's emoji-to-description pass; text without emojis is kept."""
+        if text.isascii() or self._emoji_chars.isdisjoint(text):
+            return text.strip()
+        replaced = []
+        prev_space = True
+        for char in text:
+            if char in self.emojis:
+                if not prev_space:
+                    replaced.append(" ")
+                replaced.append(self.emojis[char])
+                prev_space = False
+            else:
+                replaced.append(char)
+                prev_space = char == " "
+        return "".join(replaced).strip()
+
+    @staticmethod
+    def _strip_punctuation(token):
+        """Strips surrounding punctuation unless that leaves 2 or fewer chars."""
+        stripped = token.strip(string.punctuation)
+        return token if len(stripped) <= 2 else stripped
+
+    def _features(self, lowers):
+        """Lexicon features of each distinct lower-case token."""
+        keywords = {word: code for code, word in enumerate(KEYWORDS, 1)}
+        valence = np.array([self.lexicon.get(w, np.nan) for w in lowers])
+        booster = np.array([self.boosters.get(w, np.nan) for w in lowers])
+        negated = np.array(
+            [w in self.negations or "n't" in w for w in lowers], dtype=bool
+        )
+        keyword = np.array([keywords.get(w, 0) for w in lowers], dtype=np.int8)
+        return valence, booster, negated, keyword
+
+    def score(self, titles):
+        """
+        Compound scores of titles, equal to VADER's rounded ``compound``.
+
+        Batches smaller than ``MIN_BATCH`` are scored by VADER directly.
+
+        Args:
+            titles (list): Title strings.
+
+        Returns:
+            np.ndarray: Compound score per title, in input order.
+        """
+        if len(titles) < MIN_BATCH:
+            return np.array(
+                [self.analyzer.polarity_scores(t)["compound"] for t in titles],
+                dtype=float,
+            )
+        texts = [self._replace_emojis(title) for title in titles]
+        split = [text.split() for text in texts]
+        lengths = np.fromiter(map(len, split), dtype=np.intp, count=len(split))
+        if not lengths.sum():
+            return np.zeros(len(texts))
+
+        # Per-token arrays, computed once per distinct token
+        codes, raw = pd.factorize(np.fromiter(chain.from_iterable(split), object))
+        words = [self._strip_punctuation(token) for token in raw]
+        upper = np.array([word.isupper() for word in words], dtype=bool)[codes]
+        word_codes, lowers = pd.factorize(np.array([w.lower() for w in words], object))
+        lower = word_codes[codes]
+        valence, booster, negated, keyword = (
+            feature[lower] for feature in self._features(lowers)
+        )
+        in_lexicon = ~np.isnan(valence)
+        is_booster = ~np.isnan(booster)
+
+        title = np.repeat(np.arange(len(texts)), lengths)
+        starts = np.cumsum(lengths) - lengths
+        pos = np.arange(len(title)) - starts[title]
+        length = lengths[title]
+
+        def shift(values, offset, fill):
+            return _shift(values, offset, pos, length, fill)
+
+        prev_keyword = [None] + [shift(keyword, -k, 0) for k in (1, 2, 3)]
+        prev_lexicon = [None] + [shift(in_lexicon, -k, True) for k in (1, 2, 3)]
+        next_keyword = shift(keyword, 1, 0)
+        next_lexicon = shift(in_lexicon, 1, False)
+
+        # Only all-caps words in titles that are not entirely in caps count
+        n_upper = np.bincount(title, weights=upper, minlength=len(texts))
+        cap_diff = ((n_upper > 0) & (n_upper < lengths))[title]
+
+        scored = in_lexicon & ~is_booster & ~((keyword == KIND) & (next_keyword == OF))
+        base = np.where(in_lexicon, valence, 0.0)
+        v = base.copy()
+        # "no" before a lexicon word negates it instead of scoring itself
+        v[(keyword == NO) & next_lexicon] = 0.0
+        after_no = (
+            (prev_keyword[1] == NO)
+            | (prev_keyword[2] == NO)
+            | ((prev_keyword[3] == NO) & np.isin(prev_keyword[1], (OR, NOR)))
+        )
+        v = np.where(after_no, base * self.n_scalar, v)
+        caps = upper & cap_diff
+        v = np.where(caps, np.where(v > 0, v + self.c_incr, v - self.c_incr), v)
+
+        for k in range(3):
+            offset = -(k + 1)
+            # Boosters/dampeners up to three words back, fading with distance
+            applies = scored & (pos > k) & ~prev_lexicon[k + 1]
+            b = shift(booster, offset, np.nan)
+            s = np.where(np.isnan(b), 0.0, np.where(v < 0, -b, b))
+            b_caps = ~np.isnan(b) & shift(upper, offset, False) & cap_diff
+            s = np.where(b_caps, np.where(v > 0, s + self.c_incr, s - self.c_incr), s)
+            s = s * (1.0, 0.95, 0.9)[k]
+            v = np.where(applies, v + s, v)
+            v = np.where(
+                applies,
+                self._negate(v, k, prev_keyword, shift(negated, offset, False)),
+                v,
+            )
+            if k == 2:
+                v = np.where(applies, self._idioms(v, lower, lowers, shift), v)
+
+        # "least" negates the next word, except in "at least" / "very least"
+        least = (prev_keyword[1] == LEAST) & ~prev_lexicon[1]
+        least &= (pos == 1) | ((pos > 1) & ~np.isin(prev_keyword[2], (AT, VERY)))
+        v = np.where(least, v * self.n_scalar, v)
+        sentiments = np.where(scored, v, 0.0)
+
+        self._but_check(sentiments, keyword, title, starts, lengths)
+        return self._compound(sentiments, title, pos, lengths, texts)
+
+    def _negate(self, v, k, prev_keyword, negated):
+        """VADER's negation check for the word ``k + 1`` positions back."""
+        if k == 0:
+            return np.where(negated, v * self.n_scalar, v)
+        so_this = (SO, THIS)
+        if k == 1:
+            never = (prev_keyword[2] == NEVER) & np.isin(prev_keyword[1], so_this)
+            doubt = (prev_keyword[2] == WITHOUT) & (prev_keyword[1] == DOUBT)
+        else:
+            never = (
+                (prev_keyword[3] == NEVER) & np.isin(prev_keyword[2], so_this)
+            ) | np.isin(prev_keyword[1], so_this)
+            doubt = (prev_keyword[3] == WITHOUT) & (
+                (prev_keyword[2] == DOUBT) | (prev_keyword[1] == DOUBT)
+            )
+        return np.where(
+            never,
+            v * 1.25,
+            np.where(~doubt & negated, v * self.n_scalar, v),
+        )
+
+    def _idioms(self, v, lower, lowers, shift):
+        """VADER's special-case idioms and multi-word boosters."""
+        positions = {word: i for i, word in enumerate(lowers)}
+        shifted = {offset: shift(lower, offset, -1) for offset in (-3, -2, -1, 1, 2)}
+        shifted[0] = lower
+
+        def matches(phrase, offsets):
+            found = np.ones(len(lower), dtype=bool)
+            for word, offset in zip(phrase, offsets, strict=True):
+                code = positions.get(word)
+                if code is None:
+                    return None
+                found &= shifted[offset] == code
+            return found
+
+        v = v.copy()
+        # The first preceding window that is an idiom sets the valence
+        matched = np.zeros(len(lower), dtype=bool)
+        for offsets in ((-1, 0), (-2, -1, 0), (-2, -1), (-3, -2, -1), (-3, -2)):
+            for phrase, value in self.special_cases.items():
+                if len(phrase) != len(offsets):
+                    continue
+                found = matches(phrase, offsets)
+                if found is not None:
+                    found &= ~matched
+                    v[found] = value
+                    matched |= found
+        # Idioms starting at the word override it
+        for offsets in ((0, 1), (0, 1, 2)):
+            for phrase, value in self.special_cases.items():
+                if len(phrase) == len(offsets):
+                    found = matches(phrase, offsets)
+                    if found is not None:
+                        v[found] = value
+        for offsets in ((-3, -2, -1), (-3, -2), (-2, -1)):
+            for phrase, value in self.phrase_boosters.items():
+                if len(phrase) == len(offsets):
+                    found = matches(phrase, offsets)
+                    if found is not None:
+                        v[found] += value
+        return v
+
+    @staticmethod
+    def _but_check(sentiments, keyword, title, starts, lengths):
+        """
+        Halves sentiment before the first "but" and boosts it by half after.
+
+        Replays VADER's loop, which locates each value by equality and so
+        can update an earlier equal value instead; only titles with "but"
+        are visited.
+        """
+        first_but = (
+            pd.Series(np.flatnonzero(keyword == BUT))
+            .groupby(title[keyword == BUT])
+            .first()
+        )
+        for t, index in first_but.items():
+            start = starts[t]
+            values = sentiments[start : start + lengths[t]].tolist()
+            bi = index - start
+            for sentiment in values:
+                si = values.index(sentiment)
+                if si < bi:
+                    values[si] = sentiment * 0.5
+                elif si > bi:
+                    values[si] = sentiment * 1.5
+            sentiments[start : start + lengths[t]] = values
+
+    def _compound(self, sentiments, title, pos, lengths, texts):
+        """Normalized sum of sentiments plus punctuation emphasis."""
+        # Summed position by position, in VADER's order
+        total = np.zeros(len(texts))
+        order = np.argsort(pos, kind="stable")
+        bounds = np.searchsorted(pos[order], np.arange(lengths.max() + 1))
+        for first, last in zip(bounds[:-1], bounds[1:], strict=True):
+            tokens = order[first:last]
+            total[title[tokens]] += sentiments[tokens]
+
+        exclaim = np.minimum([text.count("!") for text in texts], 4) * 0.292
+        questions = np.array([text.count("?") for text in texts])
+        question = np.where(
+            questions > 1, np.where(questions <= 3, questions * 0.18, 0.96), 0
+        )
+        emphasis = exclaim + question
+        total = np.where(
+            total > 0, total + emphasis, np.where(total < 0, total - emphasis, total)
+        )
+        compound = np.clip(total / np.sqrt(total * total + ALPHA), -1.0, 1.0)
+        # Python's round, as VADER rounds with it
+        return np.array([round(score, 4) for score in compound.tolist()])
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer():
+    """
+    Returns the process-wide scorer, loading the lexicon on first use.
+
+    Returns:
+        LexiconScorer: Shared scorer.
+    """
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = LexiconScorer()
+        return _scorer
+
+
+def _score_chunk(titles):
+    return get_scorer().score(titles)
+
+
+def score_compound(
+    titles, max_workers=SENTIMENT_WORKERS, chunk_size=SENTIMENT_CHUNK_SIZE
+):
+    """
+    Compound VADER scores for any number of titles.
+
+    Args:
+        titles (list): Title strings.
+        max_workers (int): Worker processes; 1 scores in-process.
+        chunk_size (int): Titles scored per call (and per worker task).
+
+    Returns:
+        np.ndarray: Compound score per title, in input order.
+    """
+    titles = list(titles)
+    if not titles:
+        return np.zeros(0)
+    chunks = chunked(titles, chunk_size)
+    if max_workers <= 1 or len(chunks) == 1:
+        return np.concatenate([_score_chunk(chunk) for chunk in chunks])
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        return np.concatenate(list(pool.map(_score_chunk, chunks)))
@@ -0,0 +1,155 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import CACHE_HIT, CACHE_MISS, span
+
+logger = logging.getLogger(__name__)
+
+# Per-session memory budget for memoized results, overridable via .env
+SESSION_CACHE_MAX_MB = float(os.environ.get("STOCK_SESSION_CACHE_MB", 64))
+
+
+def time_bucket(ttl, now=None):
+    """
+    Version number that changes every ``ttl`` seconds.
+
+    Used as the data version in memo keys so results expire together with the
+    upstream data they were built from.
+
+    Args:
+        ttl (float): Bucket length in seconds.
+        now (float, optional): Reference time. Defaults to ``time.time()``.
+
+    Returns:
+        int: Current bucket number.
+    """
+    return int((time.time() if now is None else now) // max(ttl, 1))
+
+
+def estimate_size(value):
+    """
+    Approximate memory footprint of a memoized value in bytes.
+
+    Args:
+        value: DataFrame, NumPy array, Plotly figure, dataclass or other object.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    if isinstance(value, pd.DataFrame | pd.Series):
+        return int(value.memory_usage(deep=False).sum())
+    if isinstance(value, np.ndarray) or hasattr(value, "nbytes"):
+        # Arrays and columnar stores such as PriceStore
+        return int(value.nbytes)
+    if is_dataclass(value) and not isinstance(value, type):
+        return sum(estimate_size(getattr(value, f.name)) for f in fields(value))
+    if hasattr(value, "data") and hasattr(value, "layout"):
+        # Plotly figure: dominated by the trace arrays
+        size = 0
+        for trace in value.data:
+            for attr in ("x", "y", "text"):
+                array = getattr(trace, attr, None)
+                if array is not None:
+                    size += estimate_size(np.asarray(array))
+        return size
+    if isinstance(value, list | tuple):
+        return sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class SessionCache:
+    """
+    LRU memo of pipeline results for one user session.
+
+    Keys are tuples whose first element names the stage (e.g. "prices",
+    "figure:line"), followed by the inputs such as tickers, period and data
+    version. Entries beyond ``max_bytes`` are evicted oldest first.
+    """
+
+    def __init__(self, max_bytes=SESSION_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self):
+        return sum(self._sizes.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the memoized value for ``key``, computing it on a miss.
+
+        None results are returned but not stored, so failures are retried.
+        Each call is recorded as a "memo:<stage>" span with the hit/miss
+        outcome.
+
+        Args:
+            key (tuple): Memo key; ``key[0]`` is the stage name.
+            compute (callable): Zero-argument function producing the value.
+
+        Returns:
+            The memoized or freshly computed value.
+        """
+        with span(f"memo:{key[0]}") as current:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    current.cache = CACHE_HIT
+                    current.bytes = self._sizes[key]
+                    return self._entries[key]
+
+            self.misses += 1
+            current.cache = CACHE_MISS
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+                current.bytes = self._sizes.get(key)
+            return value
+
+    def put(self, key, value):
+        """Stores a value, evicting least recently used entries over budget."""
+        size = estimate_size(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                old_key, _ = self._entries.popitem(last=False)
+                self._sizes.pop(old_key)
+                logger.info(f"Session cache evicted {old_key[0]}")
+
+    def invalidate(self, stage=None):
+        """
+        Drops memoized entries.
+
+        Args:
+            stage (str, optional): Only drop entries for this stage, or for
+                stages starting with ``stage + ":"``. Defaults to everything.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if (
+                    stage is None
+                    or key[0] == stage
+                    or str(key[0]).startswith(f"{stage}:")
+                ):
+                    del self._entries[key]
+                    del self._sizes[key]
@@ -0,0 +1,423 @@
+"""
+Portfolio covariance, correlation and weighting for a ticker selection.
+
+The returns covariance is kept as running pairwise sums (count, sum, sum of
+squares and cross products over the dates both tickers traded), so appending
+or dropping a day costs O(N^2) instead of recomputing over all T days. Gaps
+are handled pairwise, as in ``DataFrame.cov()``/``corr()``.
+
+``PortfolioModel`` caches the Cholesky factor of the covariance (and its
+inverse), so minimum-variance weights, portfolio volatility and risk
+contributions can be recomputed interactively with matrix-vector products.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import TRADING_DAYS
+from src.cache import INTERVAL_BARS_PER_YEAR
+from src.instrumentation import annotate, timed
+
+# Paired observations needed before a covariance entry is trusted
+MIN_PERIODS = 20
+
+# Relative ridge added to the diagonal when the covariance is not positive
+# definite (e.g. more tickers than days, or duplicate series)
+RIDGE = 1e-10
+MAX_RIDGE_STEPS = 12
+
+# Trailing rows re-checked by PortfolioModel.sync, where provisional bars are
+# revised; older history is assumed final
+REVISED_ROWS = 5
+
+
+def _cholesky(cov):
+    """
+    Lower Cholesky factor of ``cov``, adding a growing ridge to the diagonal
+    until the matrix is positive definite.
+    """
+    scale = np.mean(np.diag(cov)) if len(cov) else 1.0
+    for step in range(MAX_RIDGE_STEPS):
+        ridge = 0.0 if step == 0 else RIDGE * 10 ** (step - 1) * scale
+        try:
+            return np.linalg.cholesky(cov + ridge * np.eye(len(cov)))
+        except np.linalg.LinAlgError:
+            continue
+    raise np.linalg.LinAlgError("Covariance is not positive definite")
+
+
+class CovarianceAccumulator:
+    """
+    Running pairwise sums for the covariance of N return series.
+
+    Entry ``[i, j]`` of each sum only includes dates where both series are
+    valid, so ``add``/``remove`` of a block of rows costs O(rows x N^2).
+    """
+
+    def __init__(self, n_assets):
+        shape = (n_assets, n_assets)
+        self.count = np.zeros(shape)
+        # sum_x[i, j]: sum of x_i over dates where x_i and x_j are both valid
+        self.sum_x = np.zeros(shape)
+        self.sum_xx = np.zeros(shape)
+        self.sum_xy = np.zeros(shape)
+
+    @property
+    def n_assets(self):
+        return len(self.count)
+
+    @property
+    def nbytes(self):
+        return 4 * self.count.nbytes
+
+    def add(self, returns, sign=1.0):
+        """
+        Adds rows of returns (NaN for gaps) to the sums.
+
+        Args:
+            returns (array-like): One row (N,) or a block (rows x N).
+            sign (float): -1 removes the rows instead.
+        """
+        returns = np.asarray(returns, dtype=float).reshape(-1, self.n_assets)
+        if not len(returns):
+            return
+        valid = ~np.isnan(returns)
+        mask = valid.astype(float)
+        filled = np.where(valid, returns, 0.0)
+        self.count += sign * (mask.T @ mask)
+        self.sum_x += sign * (filled.T @ mask)
+        self.sum_xx += sign * ((filled * filled).T @ mask)
+        self.sum_xy += sign * (filled.T @ filled)
+
+    def remove(self, returns):
+        """Removes rows previously added, e.g. days leaving a window."""
+        self.add(returns, sign=-1.0)
+
+    def _moments(self, min_periods):
+        count = np.round(self.count)
+        ready = count >= max(min_periods, 2)
+        n = np.where(ready, count, 2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (self.sum_xy - self.sum_x * self.sum_x.T / n) / (n - 1)
+            var_i = (self.sum_xx - self.sum_x**2 / n) / (n - 1)
+        return cov, np.maximum(var_i, 0.0), ready
+
+    def covariance(self, min_periods=2):
+        """
+        Sample covariance matrix (ddof=1).
+
+        Args:
+            min_periods (int): Paired observations required per entry.
+
+        Returns:
+            np.ndarray: (N x N) covariance, NaN where too few observations.
+        """
+        cov, _, ready = self._moments(min_periods)
+        return np.where(ready, cov, np.nan)
+
+    def correlation(self, min_periods=2):
+        """
+        Pearson correlation matrix over pairwise-complete observations.
+
+        Returns:
+            np.ndarray: (N x N) correlation in [-1, 1], NaN where undefined.
+        """
+        cov, var_i, ready = self._moments(min_periods)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.sqrt(var_i * var_i.T)
+        corr = np.where(ready & np.isfinite(corr), corr, np.nan)
+        return np.clip(corr, -1.0, 1.0)
+
+
+class PortfolioModel:
+    """
+    Covariance model and weights for one ticker selection.
+
+    ``sync`` brings the model in line with the latest returns matrix by
+    applying only the dates that entered, left or changed. Tickers without
+    ``min_periods`` returns get zero weight.
+    """
+
+    def __init__(self, tickers, min_periods=MIN_PERIODS, periods_per_year=TRADING_DAYS):
+        self.tickers = list(tickers)
+        self.min_periods = min_periods
+        # Returns per year, for annualizing (252 for daily bars)
+        self.periods_per_year = periods_per_year
+        self.accumulator = CovarianceAccumulator(len(self.tickers))
+        self.dates = pd.DatetimeIndex([])
+        self._returns = np.empty((0, len(self.tickers)))
+        # Last risk-parity weights, kept across syncs as the next starting point
+        self._warm_start = None
+        self._reset_cache()
+
+    @classmethod
+    def from_snapshot(cls, snapshot, min_periods=MIN_PERIODS):
+        """
+        Builds a model from a ``MarketSnapshot``'s returns.
+
+        Args:
+            snapshot (MarketSnapshot): Snapshot of the selection.
+            min_periods (int): Returns required per ticker and pair.
+
+        Returns:
+            PortfolioModel: Model over ``snapshot.tickers``, annualized at the
+            snapshot's bar interval.
+        """
+        model = cls(
+            snapshot.tickers, min_periods, INTERVAL_BARS_PER_YEAR[snapshot.interval]
+        )
+        model.sync(snapshot.dates, snapshot.returns)
+        return model
+
+    def _reset_cache(self):
+        self._cov = None
+        self._factor = None
+        self._risk_parity = {}
+
+    @property
+    def nbytes(self):
+        cached = sum(
+            a.nbytes for a in (self._cov, *(self._factor or ())) if a is not None
+        )
+        return self.accumulator.nbytes + cached
+
+    @timed("portfolio:sync")
+    def sync(self, dates, returns):
+        """
+        Updates the sums to match a (dates x tickers) returns matrix.
+
+        Dates only in the previous matrix are removed, dates only in the new
+        one are added, and dates present in both are re-applied only if their
+        returns changed (e.g. a revised bar, or the first row of a shifted
+        window). When the new dates continue the old ones, only the first and
+        the last ``REVISED_ROWS`` shared rows are compared, so appending a day
+        costs O(N^2) plus an O(T) date check.
+
+        Args:
+            dates (pd.DatetimeIndex): Sorted dates of ``returns``.
+            returns (np.ndarray): (dates x tickers) simple returns in
+                ``self.tickers`` order, NaN for gaps. Not copied; do not
+                modify it afterwards.
+
+        Returns:
+            int: Number of rows added or removed.
+        """
+        if returns is self._returns:
+            return 0
+        dates = pd.DatetimeIndex(dates)
+        returns = np.asarray(returns, dtype=float)
+        if returns.shape != (len(dates), len(self.tickers)):
+            raise ValueError(
+                f"Expected {len(dates)} x {len(self.tickers)} returns, "
+                f"got {returns.shape}"
+            )
+
+        drop, take = self._changed_rows(dates, returns)
+        self.accumulator.remove(self._returns[drop])
+        self.accumulator.add(returns[take])
+        self.dates, self._returns = dates, returns
+        changed = int(drop.sum() + take.sum())
+        if changed:
+            self._reset_cache()
+        annotate(rows=changed, tickers=len(self.tickers))
+        return changed
+
+    def _changed_rows(self, dates, returns):
+        """
+        Masks of old rows to remove and new rows to add.
+
+        Returns:
+            tuple: (drop, take) boolean arrays over the old and new rows.
+        """
+        old_dates, new_dates = self.dates.asi8, dates.asi8
+        start = np.searchsorted(old_dates, new_dates[0]) if len(new_dates) else 0
+        overlap = min(len(old_dates) - start, len(new_dates))
+        contiguous = overlap > 0 and np.array_equal(
+            old_dates[start : start + overlap], new_dates[:overlap]
+        )
+        if contiguous:
+            shared = np.unique(
+                np.r_[0, np.arange(max(overlap - REVISED_ROWS, 0), overlap)]
+            )
+            old_rows, new_rows = start + shared, shared
+        else:
+            _, old_rows, new_rows = np.intersect1d(
+                old_dates, new_dates, assume_unique=True, return_indices=True
+            )
+
+        old, new = self._returns[old_rows], returns[new_rows]
+        unchanged = ((old == new) | (np.isnan(old) & np.isnan(new))).all(axis=1)
+
+        drop = np.ones(len(old_dates), dtype=bool)
+        take = np.ones(len(new_dates), dtype=bool)
+        if contiguous:
+            # Shared rows between the checked edges are kept as they are
+            drop[start : start + overlap] = False
+            take[:overlap] = False
+            drop[old_rows[~unchanged]] = True
+            take[new_rows[~unchanged]] = True
+        else:
+            drop[old_rows[unchanged]] = False
+            take[new_rows[unchanged]] = False
+        return drop, take
+
+    def covariance(self, annualize=True):
+        """Returns covariance matrix (annualized by default); NaN if undefined."""
+        if self._cov is None:
+            self._cov = self.accumulator.covariance(self.min_periods)
+        return self._cov * self.periods_per_year if annualize else self._cov
+
+    def correlation(self):
+        """Returns correlation matrix; NaN where a pair has too few dates."""
+        return self.accumulator.correlation(self.min_periods)
+
+    @property
+    def usable(self):
+        """Mask of tickers with enough returns to be weighted."""
+        variance = np.diag(self.covariance(annualize=False))
+        return np.isfinite(variance) & (variance > 0)
+
+    def _usable_covariance(self):
+        cov = self.covariance(annualize=False)[np.ix_(self.usable, self.usable)]
+        # Pairs that never traded together are treated as uncorrelated
+        return np.nan_to_num(cov, nan=0.0)
+
+    def factor(self):
+        """
+        Cached Cholesky factor of the usable covariance and its inverse.
+
+        A small ridge is added to the diagonal if the matrix is not positive
+        definite.
+
+        Returns:
+            tuple: (L, L_inv) lower-triangular arrays with cov = L @ L.T.
+        """
+        if self._factor is None:
+            lower = _cholesky(self._usable_covariance())
+            self._factor = (lower, np.linalg.inv(lower))
+        return self._factor
+
+    def _expand(self, usable_weights):
+        weights = np.zeros(len(self.tickers))
+        weights[self.usable] = usable_weights
+        return weights
+
+    def min_variance_weights(self, long_only=True):
+        """
+        Fully invested weights with the lowest portfolio variance.
+
+        Solves ``cov @ w = 1`` as ``L_inv' (L_inv 1)`` with the cached factor,
+        two O(N^2) products. With ``long_only``, tickers given negative weight
+        are dropped and the rest re-solved until none is short, a standard
+        active-set approximation.
+
+        Args:
+            long_only (bool): Disallow short positions.
+
+        Returns:
+            np.ndarray: Weights summing to 1, in ``self.tickers`` order.
+        """
+        if not self.usable.any():
+            return np.zeros(len(self.tickers))
+        _, inverse = self.factor()
+        active = np.ones(len(inverse), dtype=bool)
+        while True:
+            if active.all():
+                raw = inverse.T @ (inverse @ np.ones(len(inverse)))
+            else:
+                # Dropping tickers changes the matrix, so factor the subset
+                lower = _cholesky(self._usable_covariance()[np.ix_(active, active)])
+                raw = np.zeros(len(active))
+                raw[active] = np.linalg.solve(
+                    lower.T, np.linalg.solve(lower, np.ones(active.sum()))
+                )
+            weights = raw / raw.sum()
+            short = active & (weights < 0)
+            if not long_only or not short.any():
+                return self._expand(weights)
+            active &= ~short
+
+    def risk_parity_weights(self, budgets=None, tol=1e-8, max_iter=500):
+        """
+        Weights whose risk contributions match ``budgets`` (equal by default).
+
+        Uses cyclical coordinate descent on ``0.5 y'Cy - sum(b log y)``, which
+        costs O(N^2) per sweep. The last solution is reused as the starting
+        point, also after ``sync`` brings in new days, so adjusting budgets or
+        refreshing the data converges in a few sweeps.
+
+        Args:
+            budgets (array-like, optional): Target risk share per ticker in
+                ``self.tickers`` order; normalized to sum to 1.
+            tol (float): Maximum deviation of any risk share from its budget.
+            max_iter (int): Maximum number of sweeps.
+
+        Returns:
+            np.ndarray: Long-only weights summing to 1.
+        """
+        usable = self.usable
+        if not usable.any():
+            return np.zeros(len(self.tickers))
+        cov = self._usable_covariance()
+        n = len(cov)
+        b = np.ones(n) if budgets is None else np.asarray(budgets, float)[usable]
+        b = b / b.sum()
+
+        key = tuple(np.round(b, 12))
+        if key in self._risk_parity:
+            return self._expand(self._risk_parity[key])
+        diag = np.diag(cov)
+        start = None if self._warm_start is None else self._warm_start[usable]
+        if start is None or not (start > 0).all():
+            y = 1 / np.sqrt(diag)
+        else:
+            # At the optimum y'Cy = sum(b) = 1, so rescale the weights to it
+            y = start / np.sqrt(start @ cov @ start)
+
+        cy = cov @ y
+        for _ in range(max_iter):
+            for i in range(n):
+                other = cy[i] - diag[i] * y[i]
+                new = (-other + np.sqrt(other * other + 4 * diag[i] * b[i])) / (
+                    2 * diag[i]
+                )
+                cy += cov[:, i] * (new - y[i])
+                y[i] = new
+            shares = y * cy / (y @ cy)
+            if np.max(np.abs(shares - b)) < tol:
+                break
+
+        weights = y / y.sum()
+        self._risk_parity[key] = weights
+        self._warm_start = self._expand(weights)
+        return self._warm_start.copy()
+
+    def volatility(self, weights):
+        """
+        Annualized portfolio volatility (%) for the given weights.
+
+        Args:
+            weights (array-like): Weights in ``self.tickers`` order.
+
+        Returns:
+            float: Volatility using the cached factor, ``||L' w||``.
+        """
+        weights = np.asarray(weights, dtype=float)[self.usable]
+        lower, _ = self.factor()
+        return float(
+            np.linalg.norm(lower.T @ weights) * np.sqrt(self.periods_per_year) * 100
+        )
+
+    def risk_contributions(self, weights):
+        """
+        Share of portfolio variance contributed by each ticker.
+
+        Returns:
+            np.ndarray: Shares summing to 1 (zero for unweighted tickers).
+        """
+        weights = np.asarray(weights, dtype=float)
+        cov = np.zeros((len(self.tickers), len(self.tickers)))
+        cov[np.ix_(self.usable, self.usable)] = self._usable_covariance()
+        marginal = cov @ weights
+        total = weights @ marginal
+        return weights * marginal / total if total > 0 else np.zeros_like(weights)
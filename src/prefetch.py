@@ -0,0 +1,131 @@
+import logging
+import os
+import random
+import threading
+
+from src.cache import NEWS_TTL_SECONDS, PRICE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Scheduler settings, overridable through the environment (.env)
+PREFETCH_ENABLED = os.environ.get("STOCK_PREFETCH_ENABLED", "1") == "1"
+PREFETCH_INTERVAL = float(
+    os.environ.get(
+        "STOCK_PREFETCH_INTERVAL", min(PRICE_TTL_SECONDS, NEWS_TTL_SECONDS) / 2
+    )
+)
+PREFETCH_BATCH_SIZE = int(os.environ.get("STOCK_PREFETCH_BATCH_SIZE", 6))
+PREFETCH_MAX_BACKOFF = float(os.environ.get("STOCK_PREFETCH_MAX_BACKOFF", 15 * 60))
+
+
+class PrefetchScheduler:
+    """
+    Background thread that keeps price and news caches warm for a universe.
+
+    Each round walks the universe in batches, refreshing anything older than
+    ``interval`` through ``get_stock_data``/``get_stock_news`` so results land
+    in the shared caches those functions read. Batches are spread across the
+    interval with random jitter; a failed batch (e.g. rate limiting) doubles
+    the pause before the next attempt, up to ``max_backoff``.
+    """
+
+    def __init__(
+        self,
+        tickers,
+        period="2y",
+        interval=PREFETCH_INTERVAL,
+        batch_size=PREFETCH_BATCH_SIZE,
+        max_backoff=PREFETCH_MAX_BACKOFF,
+        jitter=0.25,
+    ):
+        self.tickers = list(tickers)
+        self.period = period
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.failures = 0
+        self.rounds = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Starts the background thread (no-op if already running)."""
+        if self.running:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="prefetch-scheduler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Prefetch scheduler started for {len(self.tickers)} tickers")
+        return self
+
+    def stop(self, timeout=None):
+        """Signals the thread to stop and waits up to ``timeout`` seconds."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def batches(self):
+        return [
+            self.tickers[i : i + self.batch_size]
+            for i in range(0, len(self.tickers), self.batch_size)
+        ]
+
+    def refresh_batch(self, batch):
+        """
+        Refreshes prices and news for one batch of tickers.
+
+        News failures are isolated per ticker by ``get_stock_news``, so only
+        the price download decides whether the batch counts as failed.
+
+        Returns:
+            bool: True if prices were refreshed.
+        """
+        # Imported here so the app can import this module before first paint
+        from src.data import get_stock_data, get_stock_news
+
+        stocks_df = get_stock_data(
+            " ".join(batch), period=self.period, max_age=self.interval
+        )
+        get_stock_news(batch, max_age=self.interval)
+        return stocks_df is not None
+
+    def run_once(self):
+        """Runs one full round over the universe; returns the batches that failed."""
+        failed = []
+        for batch in self.batches():
+            if self._stop.is_set():
+                break
+            try:
+                ok = self.refresh_batch(batch)
+            except Exception as e:
+                logger.warning(f"Prefetch failed for {' '.join(batch)}: {e!s}")
+                ok = False
+            if not ok:
+                failed.append(batch)
+            self._pause(ok)
+        self.rounds += 1
+        return failed
+
+    def _pause(self, ok):
+        if ok:
+            self.failures = 0
+            delay = self.interval / max(len(self.batches()), 1)
+        else:
+            self.failures += 1
+            delay = min(self.max_backoff, self.interval * 2**self.failures)
+            logger.warning(f"Prefetch backing off for {delay:.0f}s")
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._stop.wait(delay)
+
+    def _run(self):
+        # Stagger replicas so they don't all start fetching at once
+        self._stop.wait(random.uniform(0, self.jitter * self.interval))
+        while not self._stop.is_set():
+            self.run_once()
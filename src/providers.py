@@ -0,0 +1,404 @@
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Provider selection, overridable through the environment (.env)
+DEFAULT_PROVIDER = os.environ.get("STOCK_DATA_PROVIDER", "yfinance")
+FIXTURE_DIR = os.environ.get("STOCK_FIXTURE_DIR")
+FIXTURE_LATENCY = float(os.environ.get("STOCK_FIXTURE_LATENCY", 0.0))
+# Intraday bars the fixture feed releases per poll, and before the first one
+FIXTURE_REPLAY_STEP = int(os.environ.get("STOCK_FIXTURE_REPLAY_STEP", 1))
+FIXTURE_REPLAY_START = int(os.environ.get("STOCK_FIXTURE_REPLAY_START", 30))
+
+# Supported intraday bar intervals and their length
+INTRADAY_INTERVALS = {"1m": pd.Timedelta(minutes=1), "5m": pd.Timedelta(minutes=5)}
+
+# Regular session of the synthetic intraday feed (09:30 New York, in UTC)
+SESSION_OPEN = pd.Timedelta(hours=14, minutes=30)
+SESSION_MINUTES = 390
+
+# First bar of every synthetic series, so any window slices the same history
+SYNTHETIC_ORIGIN = pd.Timestamp("1995-01-02")
+
+SYNTHETIC_HEADLINES = [
+    "{ticker} shares rally after strong quarterly earnings beat",
+    "{ticker} faces lawsuit over disappointing product recall",
+    "Analysts upgrade {ticker} citing robust growth outlook",
+    "{ticker} announces new buyback program",
+    "{ticker} stock slumps as regulators open probe",
+    "{ticker} to present at investor conference next week",
+]
+
+
+class SymbolError(ValueError):
+    """
+    Raised by a provider when a request fails because of one of its symbols
+    (unknown, delisted or malformed), not because of the feed itself.
+    """
+
+
+def split_by_ticker(raw, tickers):
+    """
+    Splits a ``group_by="ticker"`` yfinance download into per-ticker frames.
+
+    Args:
+        raw (pd.DataFrame): Downloaded frame.
+        tickers (list): Tickers that were requested.
+
+    Returns:
+        dict: Ticker -> date-indexed OHLCV DataFrame for tickers present.
+    """
+    if raw is None or raw.empty:
+        return {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        return {tickers[0]: raw} if len(tickers) == 1 else {}
+    available = set(raw.columns.get_level_values(0))
+    return {ticker: raw[ticker] for ticker in tickers if ticker in available}
+
+
+class MarketDataProvider(ABC):
+    """
+    Source of daily OHLCV history and raw news items.
+
+    Implementations return yfinance-shaped data so ``src.data`` can clean and
+    cache it the same way whatever the feed. ``download`` and ``news`` are
+    required; feeds without intraday bars can keep the default ``intraday``.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def download(self, tickers, period=None, start=None):
+        """
+        Downloads daily OHLCV bars.
+
+        Args:
+            tickers (list): Ticker symbols.
+            period (str, optional): yfinance period string, e.g. "2y".
+            start (str, optional): First date (YYYY-MM-DD); overrides period.
+
+        Returns:
+            dict: Ticker -> date-indexed OHLCV DataFrame for tickers found.
+
+        Raises:
+            SymbolError: If a symbol made the whole request fail. Any other
+                error is treated as transient (throttling, transport).
+        """
+
+    def intraday(self, tickers, interval="1m", since=None):
+        """
+        Downloads intraday bars for the current session.
+
+        Args:
+            tickers (list): Ticker symbols.
+            interval (str): Bar length, one of ``INTRADAY_INTERVALS``.
+            since (pd.Timestamp, optional): Only bars at or after this time
+                (UTC); the bar at ``since`` may be revised while it forms.
+                Defaults to the whole session so far.
+
+        Returns:
+            dict: Ticker -> time-indexed (UTC, tz-naive) OHLCV DataFrame for
+            tickers with bars. The default has no intraday feed and returns
+            no bars, so live quotes stay empty.
+        """
+        return {}
+
+    @abstractmethod
+    def news(self, ticker):
+        """
+        Fetches raw news items for a ticker.
+
+        Args:
+            ticker (str): Ticker symbol.
+
+        Returns:
+            list: yfinance-style news dicts (possibly empty).
+        """
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live Yahoo Finance feed through yfinance."""
+
+    name = "yfinance"
+
+    def download(self, tickers, period=None, start=None):
+        import yfinance as yf
+
+        kwargs = {"start": start} if start else {"period": period or "2y"}
+        raw = yf.download(
+            " ".join(tickers), group_by="ticker", progress=False, **kwargs
+        )
+        return split_by_ticker(raw, tickers)
+
+    def intraday(self, tickers, interval="1m", since=None):
+        import yfinance as yf
+
+        kwargs = {"start": pd.Timestamp(since, tz="UTC")} if since else {}
+        raw = yf.download(
+            " ".join(tickers),
+            interval=interval,
+            group_by="ticker",
+            progress=False,
+            **({"period": "1d"} if not kwargs else kwargs),
+        )
+        frames = {}
+        for ticker, frame in split_by_ticker(raw, tickers).items():
+            frame = frame.dropna(how="all")
+            if frame.index.tz is not None:
+                frame.index = frame.index.tz_convert("UTC").tz_localize(None)
+            if since is not None:
+                frame = frame.loc[frame.index >= pd.Timestamp(since)]
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+    def news(self, ticker):
+        import yfinance as yf
+
+        ticker_obj = yf.Ticker(ticker)
+        if not hasattr(ticker_obj, "news"):
+            raise AttributeError(f"Ticker {ticker} does not have news attribute")
+        return ticker_obj.news or []
+
+
+class FixtureProvider(MarketDataProvider):
+    """
+    Deterministic offline feed for tests, benchmarks and air-gapped CI.
+
+    Serves recorded data from ``directory`` when present (``<TICKER>.csv`` for
+    OHLCV, ``<TICKER>_news.json`` for news, as written by
+    :func:`record_fixtures`) and otherwise synthesizes a reproducible random
+    walk and headlines per ticker. Every call sleeps ``latency`` seconds to
+    mimic a network round-trip.
+
+    Intraday bars replay one synthetic session on the last daily bar, opening
+    at the previous close: the first poll gets ``replay_start`` bars and each
+    later poll ``replay_step`` more, until the session closes.
+    """
+
+    name = "fixture"
+
+    def __init__(
+        self,
+        directory=None,
+        latency=0.0,
+        seed=0,
+        end=None,
+        replay_step=FIXTURE_REPLAY_STEP,
+        replay_start=FIXTURE_REPLAY_START,
+    ):
+        self.directory = Path(directory) if directory else None
+        self.latency = latency
+        self.seed = seed
+        self.end = pd.Timestamp(end).normalize() if end else None
+        self.replay_step = replay_step
+        self.replay_start = replay_start
+        self._series = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _sleep(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _rng(self, ticker):
+        return np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+
+    def _history(self, ticker):
+        with self._lock:
+            if ticker in self._series:
+                return self._series[ticker]
+
+        path = self.directory / f"{ticker}.csv" if self.directory else None
+        if path is not None and path.exists():
+            frame = pd.read_csv(path, index_col="Date", parse_dates=True)
+        else:
+            frame = self._synthesize(ticker)
+
+        with self._lock:
+            self._series[ticker] = frame
+        return frame
+
+    def _synthesize(self, ticker):
+        end = self.end or pd.Timestamp.now().normalize()
+        index = pd.bdate_range(SYNTHETIC_ORIGIN, end, name="Date")
+        rng = self._rng(ticker)
+
+        drift, vol = rng.uniform(0.0001, 0.0008), rng.uniform(0.01, 0.03)
+        close = rng.uniform(20, 400) * np.exp(
+            np.cumsum(rng.normal(drift, vol, len(index)))
+        )
+        spread = np.abs(rng.normal(0, vol / 2, len(index)))
+        open_ = close * (1 + rng.normal(0, vol / 4, len(index)))
+        return pd.DataFrame(
+            {
+                "Open": open_,
+                "High": np.maximum(open_, close) * (1 + spread),
+                "Low": np.minimum(open_, close) * (1 - spread),
+                "Close": close,
+                "Volume": rng.integers(1_000_000, 50_000_000, len(index)).astype(float),
+            },
+            index=index,
+        )
+
+    def download(self, tickers, period=None, start=None):
+        from src.cache import period_start
+
+        self._sleep()
+        first = pd.Timestamp(start) if start else period_start(period or "2y")
+        frames = {}
+        for ticker in tickers:
+            history = self._history(ticker)
+            frame = history.loc[history.index >= first]
+            if not frame.empty:
+                frames[ticker] = frame.copy()
+        return frames
+
+    def _session(self, ticker, interval):
+        with self._lock:
+            if (ticker, interval) in self._sessions:
+                return self._sessions[ticker, interval]
+
+        history = self._history(ticker)
+        previous_close = history["Close"].iloc[-2]
+        # Per-minute volatility from the recent daily moves
+        daily_vol = np.log(history["Close"].iloc[-61:]).diff().std()
+        vol = daily_vol / np.sqrt(SESSION_MINUTES)
+
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode()), 1])
+        index = pd.date_range(
+            history.index[-1] + SESSION_OPEN,
+            periods=SESSION_MINUTES,
+            freq="min",
+            name="Datetime",
+        )
+        close = previous_close * np.exp(np.cumsum(rng.normal(0, vol, len(index))))
+        open_ = np.append(previous_close, close[:-1])
+        spread = np.abs(rng.normal(0, vol / 2, len(index)))
+        bars = pd.DataFrame(
+            {
+                "Open": open_,
+                "High": np.maximum(open_, close) * (1 + spread),
+                "Low": np.minimum(open_, close) * (1 - spread),
+                "Close": close,
+                "Volume": rng.integers(1_000, 100_000, len(index)).astype(float),
+            },
+            index=index,
+        )
+        if interval != "1m":
+            bars = bars.resample(INTRADAY_INTERVALS[interval]).agg(
+                {
+                    "Open": "first",
+                    "High": "max",
+                    "Low": "min",
+                    "Close": "last",
+                    "Volume": "sum",
+                }
+            )
+
+        with self._lock:
+            self._sessions[ticker, interval] = bars
+        return bars
+
+    def intraday(self, tickers, interval="1m", since=None):
+        self._sleep()
+        frames = {}
+        for ticker in tickers:
+            bars = self._session(ticker, interval)
+            if since is None:
+                frame = bars.iloc[: self.replay_start]
+            else:
+                # The bar at ``since`` plus the next ``replay_step`` ones
+                first = bars.index.searchsorted(pd.Timestamp(since))
+                frame = bars.iloc[first : first + 1 + self.replay_step]
+            if not frame.empty:
+                frames[ticker] = frame.copy()
+        return frames
+
+    def news(self, ticker):
+        self._sleep()
+        path = self.directory / f"{ticker}_news.json" if self.directory else None
+        if path is not None and path.exists():
+            return json.loads(path.read_text())
+
+        rng = self._rng(ticker)
+        now = int((self.end or pd.Timestamp.now().normalize()).timestamp())
+        items = []
+        for i in rng.permutation(len(SYNTHETIC_HEADLINES))[:4]:
+            items.append(
+                {
+                    "title": SYNTHETIC_HEADLINES[i].format(ticker=ticker),
+                    "providerPublishTime": now - int(rng.integers(0, 7 * 86400)),
+                    "link": f"https://example.com/{ticker.lower()}/{i}",
+                }
+            )
+        return items
+
+
+def record_fixtures(tickers, directory, provider=None, period="2y"):
+    """
+    Records OHLCV and news from a provider into a fixture directory.
+
+    Args:
+        tickers (list): Ticker symbols to record.
+        directory (str | Path): Destination directory.
+        provider (MarketDataProvider, optional): Source. Defaults to yfinance.
+        period (str): History period to record.
+    """
+    provider = provider or YFinanceProvider()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    for ticker, frame in provider.download(tickers, period=period).items():
+        frame.to_csv(directory / f"{ticker}.csv", index_label="Date")
+    for ticker in tickers:
+        items = provider.news(ticker)
+        (directory / f"{ticker}_news.json").write_text(json.dumps(items, default=str))
+    logger.info(f"Recorded fixtures for {len(tickers)} tickers to {directory}")
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """
+    Returns the active market-data provider.
+
+    The default is chosen by ``STOCK_DATA_PROVIDER`` ("yfinance" or "fixture").
+
+    Returns:
+        MarketDataProvider: Active provider.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            if DEFAULT_PROVIDER == "fixture":
+                _provider = FixtureProvider(FIXTURE_DIR, latency=FIXTURE_LATENCY)
+            elif DEFAULT_PROVIDER == "yfinance":
+                _provider = YFinanceProvider()
+            else:
+                raise ValueError(f"Unknown data provider: {DEFAULT_PROVIDER}")
+        return _provider
+
+
+def set_provider(provider):
+    """
+    Replaces the active market-data provider.
+
+    Args:
+        provider (MarketDataProvider): Provider used by ``src.data`` from now on.
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
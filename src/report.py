@@ -0,0 +1,341 @@
+"""
+Headless batch runner for universe-wide analytics.
+
+Processes a ticker list without a browser session, e.g. as a nightly job:
+    python -m src.report tickers.txt --out reports/ --format parquet --figures
+
+Tickers are split into chunks processed on a process pool. Each chunk reuses
+the dashboard pipeline (``src.data`` -> ``src.analysis`` -> ``src.charts``)
+and the shared on-disk caches. Results are written as ``metrics`` and
+``sentiment`` tables (CSV or Parquet), an optional HTML chart per ticker and
+a ``manifest.json`` describing the run. ``load_report`` reads them back.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import TRADING_DAYS, analyze_sentiment, compute_market_snapshot
+from src.batch import chunked
+from src.charts import create_line_chart_figure
+from src.data import get_price_store, get_stock_news
+from src.rolling import max_drawdown
+
+logger = logging.getLogger(__name__)
+
+# Batch runner settings, overridable through the environment (.env)
+REPORT_CHUNK_SIZE = int(os.environ.get("STOCK_REPORT_CHUNK_SIZE", 50))
+REPORT_WORKERS = int(os.environ.get("STOCK_REPORT_WORKERS", os.cpu_count() or 1))
+
+REPORT_FORMATS = ("csv", "parquet")
+
+
+def read_tickers(path):
+    """
+    Reads ticker symbols from a text file.
+
+    Symbols may be separated by whitespace, commas or newlines; anything after
+    ``#`` on a line is a comment. Duplicates are dropped, order is kept.
+
+    Args:
+        path (str | Path): Ticker file.
+
+    Returns:
+        list: Upper-case ticker symbols.
+    """
+    tickers = []
+    for line in Path(path).read_text().splitlines():
+        line = line.split("#", 1)[0].replace(",", " ")
+        tickers.extend(symbol.strip().upper() for symbol in line.split())
+    return list(dict.fromkeys(t for t in tickers if t))
+
+
+def compute_metrics(store, tickers):
+    """
+    Per-ticker price metrics for a chunk.
+
+    Args:
+        store (PriceStore): Prices for the chunk.
+        tickers (list): Tickers to report, in order.
+
+    Returns:
+        pd.DataFrame: One row per ticker with data.
+    """
+    snapshot = compute_market_snapshot(store, tickers)
+    if snapshot is None:
+        return pd.DataFrame()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nanmean(snapshot.returns, axis=0)
+        std = np.nanstd(snapshot.returns, axis=0, ddof=1)
+        sharpe = mean / std * np.sqrt(TRADING_DAYS)
+    drawdowns = max_drawdown(snapshot.close)[-1]
+
+    rows = []
+    for col, ticker in enumerate(snapshot.tickers):
+        first, last = store.valid_range(ticker)
+        first_close = store.series(ticker, valid_only=True)[0]
+        rows.append(
+            {
+                "ticker": ticker,
+                "status": store.status.get(ticker),
+                "first_date": first,
+                "last_date": last,
+                "observations": int(snapshot.observations[col]),
+                "last_price": snapshot.last_price[col],
+                "change_pct": snapshot.delta_pct[col],
+                "total_return_pct": (snapshot.last_price[col] / first_close - 1) * 100,
+                "volatility_pct": snapshot.volatility[col],
+                "sharpe": sharpe[col],
+                "max_drawdown_pct": drawdowns[col],
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def summarize_sentiment(sentiment_df):
+    """
+    Per-ticker summary of scored headlines.
+
+    Args:
+        sentiment_df (pd.DataFrame): Output of ``analyze_sentiment``.
+
+    Returns:
+        pd.DataFrame: Headline count, mean/min/max score, share of positive
+        and negative headlines and latest publish time per ticker.
+    """
+    if sentiment_df is None or sentiment_df.empty:
+        return pd.DataFrame()
+
+    scores = sentiment_df.assign(
+        positive=sentiment_df["sentiment_score"] > 0.05,
+        negative=sentiment_df["sentiment_score"] < -0.05,
+    )
+    summary = scores.groupby("symbol", sort=False).agg(
+        headlines=("title", "size"),
+        mean_sentiment=("sentiment_score", "mean"),
+        min_sentiment=("sentiment_score", "min"),
+        max_sentiment=("sentiment_score", "max"),
+        positive_share=("positive", "mean"),
+        negative_share=("negative", "mean"),
+        latest_headline=("publishedAt", "max"),
+    )
+    return summary.reset_index().rename(columns={"symbol": "ticker"})
+
+
+def process_chunk(tickers, period="2y", news=True, figures_dir=None):
+    """
+    Runs the analytics pipeline for one chunk of tickers.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+
+    Args:
+        tickers (list): Ticker symbols.
+        period (str): History period.
+        news (bool): Fetch and score news.
+        figures_dir (str, optional): Write one HTML chart per ticker here.
+
+    Returns:
+        tuple: (metrics, sentiment) DataFrames for the chunk.
+    """
+    store = get_price_store(" ".join(tickers), period=period)
+    metrics = pd.DataFrame()
+    if store is not None:
+        metrics = compute_metrics(store, [t for t in tickers if t in store])
+
+        if figures_dir is not None:
+            snapshot = compute_market_snapshot(store, tickers)
+            for ticker in snapshot.tickers:
+                fig = create_line_chart_figure([ticker], store, snapshot)
+                fig.update_layout(title=f"{ticker} Historical Market Performance")
+                fig.write_html(
+                    Path(figures_dir) / f"{ticker}.html", include_plotlyjs="cdn"
+                )
+
+    sentiment = pd.DataFrame()
+    if news:
+        sentiment = summarize_sentiment(analyze_sentiment(get_stock_news(tickers)))
+    return metrics, sentiment
+
+
+def write_table(frame, path, fmt):
+    """Writes a results table as CSV or Parquet; returns the file path."""
+    path = Path(path).with_suffix(f".{fmt}")
+    if fmt == "parquet":
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+    return path
+
+
+def run_report(
+    tickers,
+    out_dir,
+    period="2y",
+    fmt="csv",
+    news=True,
+    figures=False,
+    chunk_size=REPORT_CHUNK_SIZE,
+    max_workers=REPORT_WORKERS,
+):
+    """
+    Computes metrics and sentiment for a ticker universe and writes them out.
+
+    Args:
+        tickers (list): Ticker symbols.
+        out_dir (str | Path): Output directory (created if missing).
+        period (str): History period.
+        fmt (str): "csv" or "parquet".
+        news (bool): Fetch and score news.
+        figures (bool): Write one HTML chart per ticker to ``out_dir/figures``.
+        chunk_size (int): Tickers per worker task.
+        max_workers (int): Worker processes; 1 runs in-process.
+
+    Returns:
+        dict: Manifest of the run (also written to ``manifest.json``).
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {fmt}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    figures_dir = None
+    if figures:
+        figures_dir = out_dir / "figures"
+        figures_dir.mkdir(exist_ok=True)
+
+    started = time.time()
+    chunks = chunked(list(tickers), chunk_size)
+    args = (period, news, str(figures_dir) if figures_dir else None)
+    metrics, sentiment, failed_chunks = [], [], []
+
+    for chunk, result in _run_chunks(chunks, args, max_workers):
+        if isinstance(result, Exception):
+            logger.error(f"Chunk starting at {chunk[0]} failed: {result!s}")
+            failed_chunks.append(chunk)
+            continue
+        metrics.append(result[0])
+        sentiment.append(result[1])
+
+    # Chunks finish in any order; restore the input order
+    order = {ticker: i for i, ticker in enumerate(tickers)}
+    metrics_df = _concat_ordered(metrics, order)
+    sentiment_df = _concat_ordered(sentiment, order)
+
+    reported = set(metrics_df["ticker"]) if not metrics_df.empty else set()
+    manifest = {
+        "generated_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        "period": period,
+        "format": fmt,
+        "tickers": len(tickers),
+        "reported": len(reported),
+        "missing": [t for t in tickers if t not in reported],
+        "failed_chunks": len(failed_chunks),
+        "seconds": round(time.time() - started, 3),
+        "files": {
+            "metrics": write_table(metrics_df, out_dir / "metrics", fmt).name,
+            "sentiment": write_table(sentiment_df, out_dir / "sentiment", fmt).name,
+        },
+    }
+    if figures_dir is not None:
+        manifest["files"]["figures"] = figures_dir.name
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n")
+    logger.info(
+        f"Report for {len(reported)}/{len(tickers)} tickers written to {out_dir} "
+        f"in {manifest['seconds']:.1f}s"
+    )
+    return manifest
+
+
+def _run_chunks(chunks, args, max_workers):
+    """Yields (chunk, result or exception) as chunks finish."""
+    if max_workers <= 1:
+        for chunk in chunks:
+            try:
+                yield chunk, process_chunk(chunk, *args)
+            except Exception as e:
+                yield chunk, e
+        return
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        futures = {pool.submit(process_chunk, chunk, *args): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+
+
+def _concat_ordered(frames, order):
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    combined = pd.concat(frames, ignore_index=True)
+    return combined.sort_values(
+        "ticker", key=lambda column: column.map(order), kind="stable"
+    ).reset_index(drop=True)
+
+
+def load_report(out_dir):
+    """
+    Reads a report written by ``run_report``.
+
+    Args:
+        out_dir (str | Path): Report directory.
+
+    Returns:
+        tuple: (manifest dict, metrics DataFrame, sentiment DataFrame).
+    """
+    out_dir = Path(out_dir)
+    manifest = json.loads((out_dir / "manifest.json").read_text())
+    tables = []
+    for name in ("metrics", "sentiment"):
+        path = out_dir / manifest["files"][name]
+        if manifest["format"] == "parquet":
+            tables.append(pd.read_parquet(path))
+        else:
+            tables.append(pd.read_csv(path))
+    return manifest, *tables
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compute metrics and sentiment for a ticker universe."
+    )
+    parser.add_argument("tickers", type=Path, help="File with ticker symbols")
+    parser.add_argument("--out", type=Path, default=Path("reports"))
+    parser.add_argument("--period", default="2y", help="History period, e.g. 1y")
+    parser.add_argument("--format", choices=REPORT_FORMATS, default="csv")
+    parser.add_argument("--figures", action="store_true", help="Write HTML charts")
+    parser.add_argument("--no-news", action="store_true", help="Skip news sentiment")
+    parser.add_argument("--chunk-size", type=int, default=REPORT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS)
+    args = parser.parse_args(argv)
+
+    tickers = read_tickers(args.tickers)
+    if not tickers:
+        logger.error(f"No tickers found in {args.tickers}")
+        return 1
+
+    manifest = run_report(
+        tickers,
+        args.out,
+        period=args.period,
+        fmt=args.format,
+        news=not args.no_news,
+        figures=args.figures,
+        chunk_size=args.chunk_size,
+        max_workers=args.workers,
+    )
+    return 0 if manifest["reported"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+"""
+Rolling-window risk metrics computed in a single streaming pass.
+
+Moments are maintained with Welford-style updates as each observation enters
+and leaves the window, and rolling extremes use the van Herk/Gil-Werman block
+scheme (prefix/suffix running maxima), so every metric costs O(n) regardless
+of window length. Inputs may be 1-D (one series) or 2-D (dates x tickers);
+2-D inputs are processed for all tickers at once, with the Python loop only
+over dates. NaNs are skipped: a statistic uses the valid observations inside
+its window and is NaN until ``min_periods`` of them are available.
+"""
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+def _as_2d(values):
+    """Returns a float (dates x series) view and whether the input was 1-D."""
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        return values[:, None], True
+    if values.ndim != 2:
+        raise ValueError(f"Expected a 1-D or 2-D array, got {values.ndim}-D")
+    return values, False
+
+
+def _restore(values, squeeze):
+    return values[:, 0] if squeeze else values
+
+
+def _min_periods(window, min_periods):
+    if window < 2:
+        raise ValueError(f"window must be at least 2, got {window}")
+    min_periods = window if min_periods is None else min_periods
+    return max(2, min(min_periods, window))
+
+
+def simple_returns(prices):
+    """
+    Simple period returns of a price array (first row NaN).
+
+    Args:
+        prices (array-like): Prices, oldest first; 1-D or (dates x tickers).
+
+    Returns:
+        np.ndarray: Returns with the same shape as ``prices``.
+    """
+    prices = np.asarray(prices, dtype=float)
+    returns = np.full_like(prices, np.nan)
+    returns[1:] = prices[1:] / prices[:-1] - 1
+    return returns
+
+
+def _rolling_moments(x, y, window, min_periods):
+    """
+    Streams rolling count, means, second moments and co-moment.
+
+    Only rows where both ``x`` and ``y`` are valid contribute. ``y`` may be
+    None, in which case only ``x`` moments are tracked.
+
+    Returns:
+        tuple: (mean_x, var_x, var_y, cov) arrays, NaN where the window holds
+        fewer than ``min_periods`` observations. ``var_y``/``cov`` are None
+        when ``y`` is None.
+    """
+    n_rows, n_cols = x.shape
+    valid = ~np.isnan(x)
+    if y is not None:
+        valid &= ~np.isnan(y)
+
+    count = np.zeros(n_cols)
+    mean_x, m2_x = np.zeros(n_cols), np.zeros(n_cols)
+    mean_y, m2_y, c_xy = np.zeros(n_cols), np.zeros(n_cols), np.zeros(n_cols)
+
+    out_mean = np.full(x.shape, np.nan)
+    out_var_x = np.full(x.shape, np.nan)
+    out_var_y = np.full(x.shape, np.nan) if y is not None else None
+    out_cov = np.full(x.shape, np.nan) if y is not None else None
+
+    def update(row, sign):
+        ok = valid[row]
+        count[:] += sign * ok
+        divisor = np.maximum(count, 1)
+        dx = np.where(ok, x[row] - mean_x, 0.0)
+        mean_x[:] += sign * dx / divisor
+        m2_x[:] += sign * dx * np.where(ok, x[row] - mean_x, 0.0)
+        if y is not None:
+            dy = np.where(ok, y[row] - mean_y, 0.0)
+            mean_y[:] += sign * dy / divisor
+            resid_y = np.where(ok, y[row] - mean_y, 0.0)
+            m2_y[:] += sign * dy * resid_y
+            c_xy[:] += sign * dx * resid_y
+
+    for row in range(n_rows):
+        update(row, 1)
+        if row >= window:
+            update(row - window, -1)
+            empty = count == 0
+            for arr in (mean_x, m2_x, mean_y, m2_y, c_xy):
+                arr[empty] = 0.0
+
+        ready = count >= min_periods
+        if not ready.any():
+            continue
+        dof = np.where(ready, count - 1, 1)
+        out_mean[row] = np.where(ready, mean_x, np.nan)
+        out_var_x[row] = np.where(ready, np.maximum(m2_x, 0.0) / dof, np.nan)
+        if y is not None:
+            out_var_y[row] = np.where(ready, np.maximum(m2_y, 0.0) / dof, np.nan)
+            out_cov[row] = np.where(ready, c_xy / dof, np.nan)
+
+    return out_mean, out_var_x, out_var_y, out_cov
+
+
+def rolling_mean_std(values, window, min_periods=None):
+    """
+    Rolling mean and sample standard deviation.
+
+    Args:
+        values (array-like): Observations, oldest first; 1-D or 2-D.
+        window (int): Window length in observations.
+        min_periods (int, optional): Valid observations required for a result.
+            Defaults to ``window``.
+
+    Returns:
+        tuple: (mean, std) arrays with the same shape as ``values``.
+    """
+    x, squeeze = _as_2d(values)
+    mean, var, _, _ = _rolling_moments(
+        x, None, window, _min_periods(window, min_periods)
+    )
+    return _restore(mean, squeeze), _restore(np.sqrt(var), squeeze)
+
+
+def rolling_volatility(returns, window=21, min_periods=None):
+    """
+    Rolling annualized volatility (%) of returns.
+
+    Args:
+        returns (array-like): Simple returns, oldest first; 1-D or 2-D.
+        window (int): Window length in trading days.
+        min_periods (int, optional): Valid returns required for a result.
+
+    Returns:
+        np.ndarray: Annualized volatility per observation.
+    """
+    _, std = rolling_mean_std(returns, window, min_periods)
+    return std * np.sqrt(TRADING_DAYS) * 100
+
+
+def rolling_sharpe(returns, window=63, risk_free=0.0, min_periods=None):
+    """
+    Rolling annualized Sharpe ratio.
+
+    Args:
+        returns (array-like): Simple returns, oldest first; 1-D or 2-D.
+        window (int): Window length in trading days.
+        risk_free (float): Annual risk-free rate, e.g. 0.04 for 4%.
+        min_periods (int, optional): Valid returns required for a result.
+
+    Returns:
+        np.ndarray: Sharpe ratio per observation (NaN where std is zero).
+    """
+    excess = np.asarray(returns, dtype=float) - risk_free / TRADING_DAYS
+    mean, std = rolling_mean_std(excess, window, min_periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = mean / std * np.sqrt(TRADING_DAYS)
+    sharpe[~np.isfinite(sharpe)] = np.nan
+    return sharpe
+
+
+def rolling_beta(returns, benchmark_returns, window=63, min_periods=None):
+    """
+    Rolling beta of returns against a benchmark.
+
+    Args:
+        returns (array-like): Asset returns; 1-D or (dates x tickers).
+        benchmark_returns (array-like): 1-D benchmark returns on the same dates.
+        window (int): Window length in trading days.
+        min_periods (int, optional): Paired observations required for a result.
+
+    Returns:
+        np.ndarray: Beta per observation, same shape as ``returns``.
+    """
+    cov, _, var_bench = _rolling_pair(returns, benchmark_returns, window, min_periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = cov / var_bench
+    beta[~np.isfinite(beta)] = np.nan
+    return beta
+
+
+def rolling_correlation(returns, other_returns, window=63, min_periods=None):
+    """
+    Rolling Pearson correlation between returns and another series.
+
+    Args:
+        returns (array-like): Returns; 1-D or (dates x tickers).
+        other_returns (array-like): 1-D series on the same dates, or an array
+            of the same shape as ``returns`` for column-wise correlation.
+        window (int): Window length in trading days.
+        min_periods (int, optional): Paired observations required for a result.
+
+    Returns:
+        np.ndarray: Correlation per observation, same shape as ``returns``.
+    """
+    cov, var_x, var_y = _rolling_pair(returns, other_returns, window, min_periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _rolling_pair(values, other, window, min_periods):
+    x, squeeze = _as_2d(values)
+    y = np.asarray(other, dtype=float)
+    if y.ndim == 1:
+        y = np.broadcast_to(y[:, None], x.shape)
+    if y.shape != x.shape:
+        raise ValueError(f"Shape mismatch: {x.shape} vs {y.shape}")
+    _, var_x, var_y, cov = _rolling_moments(
+        x, y, window, _min_periods(window, min_periods)
+    )
+    return (
+        _restore(cov, squeeze),
+        _restore(var_x, squeeze),
+        _restore(var_y, squeeze),
+    )
+
+
+def rolling_max(values, window):
+    """
+    Rolling maximum of the valid values in each window.
+
+    Splits the series into blocks of ``window`` rows and combines a running
+    maximum within each block with a reversed one, so each output needs two
+    lookups instead of a scan of the window.
+
+    Args:
+        values (array-like): Observations, oldest first; 1-D or 2-D.
+        window (int): Window length in observations.
+
+    Returns:
+        np.ndarray: Rolling maximum, same shape as ``values``.
+    """
+    x, squeeze = _as_2d(values)
+    return _restore(_block_extreme(x, window, np.fmax), squeeze)
+
+
+def rolling_min(values, window):
+    """
+    Rolling minimum of the valid values in each window.
+
+    Args:
+        values (array-like): Observations, oldest first; 1-D or 2-D.
+        window (int): Window length in observations.
+
+    Returns:
+        np.ndarray: Rolling minimum, same shape as ``values``.
+    """
+    x, squeeze = _as_2d(values)
+    return _restore(_block_extreme(x, window, np.fmin), squeeze)
+
+
+def _block_extreme(x, window, op):
+    if window < 1:
+        raise ValueError(f"window must be positive, got {window}")
+    n_rows, n_cols = x.shape
+    if n_rows == 0:
+        return x.copy()
+
+    # Pad to whole blocks; NaN is ignored by fmax/fmin
+    n_blocks = -(-n_rows // window)
+    padded = np.full((n_blocks * window, n_cols), np.nan)
+    padded[:n_rows] = x
+    blocks = padded.reshape(n_blocks, window, n_cols)
+
+    with np.errstate(invalid="ignore"):
+        prefix = op.accumulate(blocks, axis=1).reshape(-1, n_cols)
+        suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, n_cols)
+
+    # Window [i - window + 1, i] spans the suffix of one block and the prefix
+    # of the next (or lies within a single block when i ends a block)
+    out = prefix[:n_rows].copy()
+    starts = np.arange(n_rows) - window + 1
+    spans = starts >= 0
+    out[spans] = op(suffix[starts[spans]], prefix[np.arange(n_rows)[spans]])
+    return out
+
+
+def drawdown(prices, window=None):
+    """
+    Drawdown (%) from the running peak, or from the rolling ``window`` peak.
+
+    Args:
+        prices (array-like): Prices, oldest first; 1-D or 2-D.
+        window (int, optional): Look-back for the peak. Defaults to all history.
+
+    Returns:
+        np.ndarray: Drawdown per observation (0 at a new high, negative below).
+    """
+    prices = np.asarray(prices, dtype=float)
+    if window is None:
+        peak = np.fmax.accumulate(prices, axis=0)
+    else:
+        peak = rolling_max(prices, window)
+    return (prices / peak - 1) * 100
+
+
+def max_drawdown(prices, window=None):
+    """
+    Maximum drawdown (%), since inception or within a rolling window.
+
+    A window's drawdown is its worst fall from a peak to a later trough, both
+    inside the window. With the block scheme of ``rolling_max``, a window
+    spans the suffix of one block and the prefix of the next, so its worst
+    fall is the worst within the suffix, within the prefix, or from the
+    suffix's high to the prefix's low.
+
+    Args:
+        prices (array-like): Prices, oldest first; 1-D or 2-D.
+        window (int, optional): Rolling window for both peak and trough.
+            Defaults to expanding (all history so far).
+
+    Returns:
+        np.ndarray: Most negative drawdown seen per observation.
+    """
+    if window is None:
+        return np.fmin.accumulate(drawdown(prices), axis=0)
+    if window < 1:
+        raise ValueError(f"window must be positive, got {window}")
+    x, squeeze = _as_2d(prices)
+    n_rows, n_cols = x.shape
+    if n_rows == 0:
+        return _restore(x.copy(), squeeze)
+
+    n_blocks = -(-n_rows // window)
+    padded = np.full((n_blocks * window, n_cols), np.nan)
+    padded[:n_rows] = x
+    blocks = padded.reshape(n_blocks, window, n_cols)
+    backward = blocks[:, ::-1]
+
+    def flat(values):
+        return values.reshape(-1, n_cols)
+
+    # Worst price ratio (trough / earlier peak) from each block's start up to
+    # each row, and from each row to the block's end, with the lows and highs
+    with np.errstate(invalid="ignore", divide="ignore"):
+        prefix_fall = flat(
+            np.fmin.accumulate(blocks / np.fmax.accumulate(blocks, axis=1), axis=1)
+        )
+        prefix_low = flat(np.fmin.accumulate(blocks, axis=1))
+        suffix_fall = flat(
+            np.fmin.accumulate(np.fmin.accumulate(backward, axis=1) / backward, axis=1)[
+                :, ::-1
+            ]
+        )
+        suffix_high = flat(np.fmax.accumulate(backward, axis=1)[:, ::-1])
+
+        out = prefix_fall[:n_rows].copy()
+        rows = np.arange(n_rows)
+        starts = rows - window + 1
+        # Windows starting on a block boundary are that block's prefix
+        spans = (starts >= 0) & (starts % window != 0)
+        first, last = starts[spans], rows[spans]
+        out[spans] = np.fmin(
+            np.fmin(suffix_fall[first], prefix_fall[last]),
+            prefix_low[last] / suffix_high[first],
+        )
+    return _restore((out - 1) * 100, squeeze)
@@ -0,0 +1,277 @@
+"""
+Time-weighted news sentiment by symbol and trading day.
+
+``daily_sentiment`` buckets scored headlines into (trading day x symbol)
+matrices with NumPy: one factorization of the symbols, one sort of the
+trading days and a ``bincount`` per sum, with no pandas groupby over the
+news frame. An exponentially decayed mean is then carried from one news day
+to the next for every symbol at once, with the Python loop only over days.
+
+``align_returns`` joins the result to daily returns (``get_stock_data``
+layout) with an as-of merge, so each return sees the latest sentiment known
+at its close. ``lagged_correlations`` correlates the two at several leads and
+lags for every symbol in one vectorized pass per lag.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Sentiment time-series settings, overridable through the environment (.env)
+# Days for a headline's weight to halve
+SENTIMENT_HALF_LIFE_DAYS = float(os.environ.get("STOCK_SENTIMENT_HALF_LIFE_DAYS", 2))
+# Headlines published after this UTC hour count for the next trading day
+SENTIMENT_CUTOFF_HOUR = int(os.environ.get("STOCK_SENTIMENT_CUTOFF_HOUR", 20))
+
+# Leads/lags (trading days) of a correlation study; positive = sentiment leads
+DEFAULT_LAGS = tuple(range(-5, 6))
+
+
+@dataclass(frozen=True)
+class SentimentPanel:
+    """
+    Decayed sentiment on the trading days that had news.
+
+    Between news days a decayed mean does not change (the weighted sum and the
+    weights decay alike), so these rows are all an as-of join needs.
+
+    Attributes:
+        tickers (list): Symbols, in column order.
+        dates (pd.DatetimeIndex): Trading days with at least one headline.
+        score (np.ndarray): (dates x tickers) decayed mean score, NaN before a
+            symbol's first headline.
+        count (np.ndarray): (dates x tickers) headlines bucketed on each day.
+    """
+
+    tickers: list
+    dates: pd.DatetimeIndex
+    score: np.ndarray
+    count: np.ndarray
+
+    def index_of(self, ticker):
+        """Column of ``ticker``, or None if it has no news."""
+        try:
+            return self.tickers.index(ticker)
+        except ValueError:
+            return None
+
+    def latest(self):
+        """Latest decayed score per ticker, in column order."""
+        return self.score[-1]
+
+    def to_frame(self):
+        """
+        Long format: one row per symbol and day it had news.
+
+        Returns:
+            pd.DataFrame: Columns Date, symbol, sentiment and news_count,
+            sorted by Date.
+        """
+        days, cols = np.nonzero(self.count)
+        return pd.DataFrame(
+            {
+                "Date": self.dates[days],
+                "symbol": np.asarray(self.tickers, dtype=object)[cols],
+                "sentiment": self.score[days, cols],
+                "news_count": self.count[days, cols],
+            }
+        )
+
+
+def trading_days(published, cutoff_hour=SENTIMENT_CUTOFF_HOUR):
+    """
+    Trading day each headline counts for.
+
+    Headlines published after ``cutoff_hour`` (UTC) count for the next day,
+    and weekend headlines for the Monday. Exchange holidays are not known
+    here; an as-of join moves them to the next trading day with returns.
+
+    Args:
+        published (pd.Series): Publish times (tz-aware or naive UTC).
+        cutoff_hour (int): UTC hour after which a day's session is closed.
+
+    Returns:
+        np.ndarray: datetime64[D] trading day per headline.
+    """
+    published = pd.to_datetime(published, utc=True).dt.tz_convert(None)
+    shifted = published + pd.Timedelta(hours=24 - cutoff_hour)
+    return np.busday_offset(
+        shifted.to_numpy().astype("datetime64[D]"), 0, roll="forward"
+    )
+
+
+def daily_sentiment(
+    news_df,
+    half_life=SENTIMENT_HALF_LIFE_DAYS,
+    cutoff_hour=SENTIMENT_CUTOFF_HOUR,
+):
+    """
+    Buckets scored headlines by symbol and trading day with time decay.
+
+    A headline's weight halves every ``half_life`` days, measured from its
+    publish time to the close of each later trading day, so a day's score is
+    the decayed mean of every headline up to that close.
+
+    Args:
+        news_df (pd.DataFrame): Output of ``analyze_sentiment`` (symbol,
+            publishedAt and sentiment_score columns).
+        half_life (float): Half-life of a headline's weight in days.
+        cutoff_hour (int): UTC hour of the daily close.
+
+    Returns:
+        SentimentPanel: Decayed sentiment, or None without scored headlines.
+    """
+    columns = ("symbol", "publishedAt", "sentiment_score")
+    if news_df is None or news_df.empty or not set(columns) <= set(news_df):
+        return None
+    scores = news_df["sentiment_score"].to_numpy(dtype=float)
+    published = pd.to_datetime(news_df["publishedAt"], utc=True)
+    valid = ~np.isnan(scores) & published.notna().to_numpy()
+    if not valid.any():
+        return None
+
+    codes, tickers = pd.factorize(news_df["symbol"].to_numpy()[valid])
+    scores = scores[valid]
+    published = published[valid]
+    days, day_index = np.unique(
+        trading_days(published, cutoff_hour), return_inverse=True
+    )
+
+    # Times in days since the first close, so exponents stay small
+    closes = days.astype("datetime64[s]") + np.timedelta64(cutoff_hour * 3600, "s")
+    epoch = closes[0]
+    close_days = (closes - epoch) / np.timedelta64(1, "D")
+    published_days = (
+        published.dt.tz_convert(None).to_numpy().astype("datetime64[s]") - epoch
+    ) / np.timedelta64(1, "D")
+    rate = np.log(2) / half_life
+    weights = np.exp(-rate * (close_days[day_index] - published_days))
+
+    # One bincount per sum over flat (day, symbol) buckets
+    shape = (len(days), len(tickers))
+    buckets = day_index * len(tickers) + codes
+    size = shape[0] * shape[1]
+    weighted = np.bincount(buckets, weights * scores, size).reshape(shape)
+    total = np.bincount(buckets, weights, size).reshape(shape)
+    count = np.bincount(buckets, minlength=size).reshape(shape)
+
+    decay = np.exp(-rate * np.diff(close_days))
+    for d in range(1, len(days)):
+        weighted[d] += weighted[d - 1] * decay[d - 1]
+        total[d] += total[d - 1] * decay[d - 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score = np.where(total > 0, weighted / total, np.nan)
+
+    return SentimentPanel(
+        tickers=list(tickers),
+        dates=pd.DatetimeIndex(days.astype("datetime64[ns]"), name="Date"),
+        score=score,
+        count=count,
+    )
+
+
+def align_returns(panel, stocks_df, max_age=None):
+    """
+    Joins decayed sentiment to daily closes and returns with an as-of merge.
+
+    Each (date, symbol) row takes the latest sentiment of that symbol on or
+    before the date, i.e. everything published before that day's close.
+
+    Args:
+        panel (SentimentPanel): Output of ``daily_sentiment``.
+        stocks_df (pd.DataFrame): MultiIndex (ticker, field) prices, e.g. from
+            ``get_stock_data`` or ``PriceStore.to_frame``.
+        max_age (pd.Timedelta, optional): Oldest sentiment to carry forward.
+
+    Returns:
+        pd.DataFrame: Columns Date, symbol, Close, return and sentiment (NaN
+        before a symbol's first headline), sorted by Date.
+    """
+    close = stocks_df.xs("Close", axis=1, level=1)
+    values = close.to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.full_like(values, np.nan)
+        returns[1:] = values[1:] / values[:-1] - 1
+
+    dates = pd.DatetimeIndex(close.index).as_unit("ns")
+    prices = pd.DataFrame(
+        {
+            "Date": np.repeat(dates, close.shape[1]),
+            "symbol": np.tile(close.columns.to_numpy(dtype=object), len(dates)),
+            "Close": values.ravel(),
+            "return": returns.ravel(),
+        }
+    )
+    prices = prices[~np.isnan(prices["Close"].to_numpy())].reset_index(drop=True)
+    if panel is None:
+        return prices.assign(sentiment=np.nan)
+
+    sentiment = panel.to_frame()[["Date", "symbol", "sentiment"]]
+    return pd.merge_asof(
+        prices,
+        sentiment,
+        on="Date",
+        by="symbol",
+        direction="backward",
+        tolerance=max_age,
+    )
+
+
+def _column_correlation(x, y, min_periods):
+    """Pearson correlation of each column pair, over rows where both are set."""
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    n = valid.sum(axis=0)
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = x.sum(axis=0) / n
+        mean_y = y.sum(axis=0) / n
+        dx = np.where(valid, x - mean_x, 0.0)
+        dy = np.where(valid, y - mean_y, 0.0)
+        corr = (dx * dy).sum(axis=0) / np.sqrt(
+            (dx * dx).sum(axis=0) * (dy * dy).sum(axis=0)
+        )
+    return np.where(n >= max(min_periods, 2), corr, np.nan)
+
+
+def lagged_correlations(aligned, lags=DEFAULT_LAGS, min_periods=20):
+    """
+    Correlation of sentiment with returns at several leads and lags.
+
+    At lag ``k`` each return is paired with the sentiment ``k`` trading days
+    earlier (negative ``k``: later), for every symbol at once.
+
+    Args:
+        aligned (pd.DataFrame): Output of ``align_returns``.
+        lags (iterable): Lags in trading days.
+        min_periods (int): Pairs needed for a correlation.
+
+    Returns:
+        pd.DataFrame: Correlation per lag (rows) and symbol (columns), NaN
+        where there are fewer than ``min_periods`` pairs.
+    """
+    lags = list(lags)
+    row, dates = pd.factorize(aligned["Date"], sort=True)
+    col, symbols = pd.factorize(aligned["symbol"])
+    shape = (len(dates), len(symbols))
+    returns = np.full(shape, np.nan)
+    sentiment = np.full(shape, np.nan)
+    returns[row, col] = aligned["return"].to_numpy(dtype=float)
+    sentiment[row, col] = aligned["sentiment"].to_numpy(dtype=float)
+
+    result = np.full((len(lags), len(symbols)), np.nan)
+    for i, lag in enumerate(lags):
+        if abs(lag) >= len(dates):
+            continue
+        if lag >= 0:
+            x, y = sentiment[: len(dates) - lag], returns[lag:]
+        else:
+            x, y = sentiment[-lag:], returns[: len(dates) + lag]
+        result[i] = _column_correlation(x, y, min_periods)
+    return pd.DataFrame(
+        result,
+        index=pd.Index(lags, name="lag"),
+        columns=pd.Index(symbols, name="symbol"),
+    )
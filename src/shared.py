@@ -0,0 +1,383 @@
+"""
+Shared cache tier with request coalescing for multi-session deployments.
+
+Every Streamlit session (and every replica) asking for the same ticker should
+cost one upstream request, not one per user. ``SharedCache.get_or_fetch_many``
+serves keys from a shared store with a per-key TTL and, on a miss, lets only
+one caller fetch each key:
+
+* within a process, callers wait on the in-flight fetch (singleflight);
+* across processes and replicas, the fetcher holds a short lease on the key
+  and the others poll until the value is published or the lease lapses.
+
+The store is a local SQLite file by default, shared by every process on the
+host. Set ``STOCK_SHARED_CACHE_URL=redis://host:6379/0`` to share it between
+hosts through a Redis-compatible server (requires the ``redis`` package).
+Values are pickled, so only point it at a server you trust.
+"""
+
+import logging
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.cache import CACHE_DIR
+from src.instrumentation import annotate
+
+logger = logging.getLogger(__name__)
+
+# Shared cache settings, overridable through the environment (.env)
+SHARED_CACHE_ENABLED = os.environ.get("STOCK_SHARED_CACHE", "1") == "1"
+SHARED_CACHE_URL = os.environ.get("STOCK_SHARED_CACHE_URL", "")
+# How long a fetcher may hold a key before another caller takes over
+LEASE_SECONDS = float(os.environ.get("STOCK_SHARED_LEASE_SECONDS", 60))
+POLL_SECONDS = float(os.environ.get("STOCK_SHARED_POLL_SECONDS", 0.05))
+
+# Marks keys the fetch function returned no value for
+_MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteBackend:
+    """Shared entries and leases in a local SQLite file."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else CACHE_DIR / "shared.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def get_many(self, keys):
+        with self._connect() as con:
+            rows = con.execute(
+                "SELECT key, value FROM entries WHERE expires_at > ? "
+                f"AND key IN ({','.join('?' * len(keys))})",
+                [time.time(), *keys],
+            ).fetchall()
+        return dict(rows)
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (key, value, now + ttl),
+            )
+            con.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+
+    def acquire(self, keys, owner, ttl):
+        now = time.time()
+        acquired = []
+        with self._connect() as con:
+            con.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+            for key in keys:
+                cursor = con.execute(
+                    "INSERT OR IGNORE INTO leases VALUES (?, ?, ?)",
+                    (key, owner, now + ttl),
+                )
+                if cursor.rowcount:
+                    acquired.append(key)
+        return acquired
+
+    def leased(self, keys):
+        with self._connect() as con:
+            rows = con.execute(
+                "SELECT key FROM leases WHERE expires_at > ? "
+                f"AND key IN ({','.join('?' * len(keys))})",
+                [time.time(), *keys],
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def release(self, keys, owner):
+        with self._connect() as con:
+            con.executemany(
+                "DELETE FROM leases WHERE key = ? AND owner = ?",
+                [(key, owner) for key in keys],
+            )
+
+    def clear(self):
+        with self._connect() as con:
+            con.execute("DELETE FROM entries")
+            con.execute("DELETE FROM leases")
+
+
+class RedisBackend:
+    """Shared entries and leases on a Redis-compatible server."""
+
+    # Deletes a lease only if the caller still owns it
+    _RELEASE = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) end return 0"
+    )
+
+    def __init__(self, url, prefix="stock:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._release = self._client.register_script(self._RELEASE)
+        self.prefix = prefix
+
+    def get_many(self, keys):
+        values = self._client.mget([f"{self.prefix}entry:{key}" for key in keys])
+        return {key: value for key, value in zip(keys, values, strict=True) if value}
+
+    def set(self, key, value, ttl):
+        self._client.set(f"{self.prefix}entry:{key}", value, px=int(ttl * 1000))
+
+    def acquire(self, keys, owner, ttl):
+        return [
+            key
+            for key in keys
+            if self._client.set(
+                f"{self.prefix}lease:{key}", owner, nx=True, px=int(ttl * 1000)
+            )
+        ]
+
+    def leased(self, keys):
+        names = [f"{self.prefix}lease:{key}" for key in keys]
+        owners = self._client.mget(names)
+        return {key for key, owner in zip(keys, owners, strict=True) if owner}
+
+    def release(self, keys, owner):
+        for key in keys:
+            self._release(keys=[f"{self.prefix}lease:{key}"], args=[owner])
+
+    def clear(self):
+        for name in self._client.scan_iter(f"{self.prefix}*"):
+            self._client.delete(name)
+
+
+class SharedCache:
+    """
+    Key/value cache with per-key TTL and coalesced fetches.
+
+    Backend errors (a locked file, an unreachable server) are logged and
+    treated as misses, so callers degrade to fetching for themselves with
+    in-process coalescing only.
+    """
+
+    def __init__(self, backend=None, lease_seconds=LEASE_SECONDS, poll=POLL_SECONDS):
+        self.backend = backend if backend is not None else SQLiteBackend()
+        self.lease_seconds = lease_seconds
+        self.poll = poll
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys, max_age=None, since=None):
+        """
+        Reads cached values.
+
+        Args:
+            keys (list): Cache keys.
+            max_age (float, optional): Ignore values stored more than this many
+                seconds ago. Defaults to the TTL each value was stored with.
+            since (float, optional): Always accept values stored after this
+                epoch time, whatever their age.
+
+        Returns:
+            dict: Key -> value for the keys found.
+        """
+        if not keys:
+            return {}
+        blobs = self._call("get_many", {}, keys)
+        now = time.time()
+        found = {}
+        for key, blob in blobs.items():
+            stored_at, value = pickle.loads(blob)
+            fresh = max_age is None or now - stored_at < max_age
+            if fresh or (since is not None and stored_at >= since):
+                found[key] = value
+        return found
+
+    def set(self, key, value, ttl):
+        """Stores ``value`` under ``key`` for ``ttl`` seconds."""
+        blob = pickle.dumps((time.time(), value), protocol=pickle.HIGHEST_PROTOCOL)
+        self._call("set", None, key, blob, ttl)
+
+    def get_or_fetch_many(self, keys, fetch, ttl, max_age=None):
+        """
+        Returns cached values, fetching each missing key at most once.
+
+        Keys nobody holds are claimed and fetched in one ``fetch`` call; keys
+        another thread is fetching are awaited; keys leased by another process
+        are polled for until published. A key whose fetcher gave no value is
+        left out rather than fetched again, so a failing upstream is not hit
+        once per waiting session.
+
+        Args:
+            keys (list): Cache keys.
+            fetch (callable): Takes a list of claimed keys and returns a dict
+                key -> value; keys it leaves out are not cached.
+            ttl (float): Seconds the fetched values are kept.
+            max_age (float, optional): See ``get_many``; 0 forces a fetch.
+
+        Returns:
+            dict: Key -> value for every key that has one. An exception from
+            ``fetch`` propagates to every caller waiting on that fetch.
+        """
+        started = time.time()
+        pending = list(dict.fromkeys(keys))
+        results = self.get_many(pending, max_age)
+        hits, fetched, awaited = len(results), 0, 0
+
+        while True:
+            pending = [key for key in pending if key not in results]
+            if not pending:
+                break
+            owned, local, remote = self._claim(pending)
+            if owned:
+                fetched += len(owned)
+                results.update(self._fetch_owned(owned, fetch, ttl))
+            for key, future in local:
+                awaited += 1
+                value = future.result()
+                if value is not _MISSING:
+                    results[key] = value
+            if not remote:
+                break
+            awaited += len(remote)
+            found, retry = self._wait_remote(remote, max_age, started)
+            results.update(found)
+            # Keys released without a value are claimed again on the next pass
+            pending = retry
+
+        annotate(shared_hits=hits, shared_fetched=fetched, shared_awaited=awaited)
+        return results
+
+    def clear(self):
+        self._call("clear", None)
+
+    def _claim(self, keys):
+        """Splits keys into (owned, awaited in-process, leased elsewhere)."""
+        with self._lock:
+            local = [
+                (key, self._inflight[key]) for key in keys if key in self._inflight
+            ]
+            free = [key for key in keys if key not in self._inflight]
+            owned = self._call("acquire", free, free, self.owner, self.lease_seconds)
+            for key in owned:
+                self._inflight[key] = Future()
+        remote = [key for key in free if key not in owned]
+        return owned, local, remote
+
+    def _fetch_owned(self, keys, fetch, ttl):
+        values = {}
+        error = None
+        try:
+            values = {key: value for key, value in fetch(keys).items() if key in keys}
+            for key, value in values.items():
+                self.set(key, value, ttl)
+            return values
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            # Publish before releasing, so pollers see the value once the
+            # lease is gone
+            self._call("release", None, keys, self.owner)
+            with self._lock:
+                for key in keys:
+                    future = self._inflight.pop(key)
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(values.get(key, _MISSING))
+
+    def _wait_remote(self, keys, max_age, since):
+        """
+        Polls for keys another process is fetching.
+
+        Returns:
+            tuple: (found values, keys released or timed out without one).
+        """
+        waiting = list(keys)
+        found = {}
+        deadline = time.monotonic() + self.lease_seconds
+        while waiting and time.monotonic() < deadline:
+            time.sleep(self.poll)
+            found.update(self.get_many(waiting, max_age, since))
+            waiting = [key for key in waiting if key not in found]
+            if waiting:
+                leased = self._call("leased", set(), waiting)
+                released = [key for key in waiting if key not in leased]
+                if released:
+                    # The value may have landed just before the lease went
+                    found.update(self.get_many(released, max_age, since))
+                    return found, [key for key in waiting if key not in found]
+        return found, waiting
+
+    def _call(self, method, fallback, *args):
+        try:
+            return getattr(self.backend, method)(*args)
+        except Exception as e:
+            logger.warning(f"Shared cache {method} failed: {e!s}")
+            return fallback
+
+
+_default_shared_cache = None
+_default_shared_lock = threading.Lock()
+
+
+def make_backend(url=SHARED_CACHE_URL):
+    """
+    Builds the backend for a cache URL.
+
+    Args:
+        url (str): ``redis://``/``rediss://`` URL, or empty for local SQLite.
+
+    Returns:
+        SQLiteBackend | RedisBackend: Backend instance.
+    """
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisBackend(url)
+        except ImportError:
+            logger.warning("redis package not installed, using local shared cache")
+    elif url:
+        logger.warning(f"Unsupported shared cache URL {url!r}, using local cache")
+    return SQLiteBackend()
+
+
+def get_shared_cache():
+    """
+    Returns the process-wide shared cache, creating it on first use.
+
+    Returns:
+        SharedCache: Shared instance, or None if disabled (STOCK_SHARED_CACHE=0).
+    """
+    global _default_shared_cache
+    if not SHARED_CACHE_ENABLED:
+        return None
+    with _default_shared_lock:
+        if _default_shared_cache is None:
+            _default_shared_cache = SharedCache(make_backend())
+        return _default_shared_cache
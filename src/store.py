@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+
+from src.cache import INTERVAL_BARS_PER_YEAR, PRICE_FIELDS
+
+
+class PriceStore:
+    """
+    Columnar in-memory OHLCV store for many tickers on a shared date index.
+
+    Each field is one contiguous ``(tickers x dates)`` NumPy array, so a
+    ticker's series is a zero-copy row view and ``matrix`` exposes a
+    ``(dates x tickers)`` view for vectorized analytics. Dates a ticker did
+    not trade are NaN for that ticker only; nothing is dropped across the
+    universe.
+    """
+
+    def __init__(self, tickers, dates, arrays, interval="1d"):
+        """
+        Args:
+            tickers (list): Ticker symbols, one per array row.
+            dates (pd.DatetimeIndex): Shared sorted date index.
+            arrays (dict): Field name -> (tickers x dates) array.
+            interval (str): Bar interval, "1d", "1wk" or "1mo".
+        """
+        self.tickers = list(tickers)
+        self.dates = pd.DatetimeIndex(dates, name="Date")
+        self.arrays = arrays
+        self.interval = interval
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        # Ticker -> download outcome, filled in by src.data.get_price_store
+        self.status = {}
+
+        close = arrays.get("Close")
+        self.valid = ~np.isnan(close) if close is not None else None
+        if self.valid is not None and self.valid.size:
+            has_data = self.valid.any(axis=1)
+            first = np.argmax(self.valid, axis=1)
+            last = self.valid.shape[1] - 1 - np.argmax(self.valid[:, ::-1], axis=1)
+            self.first_valid = np.where(has_data, first, -1)
+            self.last_valid = np.where(has_data, last, -1)
+        else:
+            self.first_valid = self.last_valid = np.full(len(self.tickers), -1)
+
+    @classmethod
+    def from_frames(cls, frames, dtype=np.float64, interval="1d"):
+        """
+        Builds a store from per-ticker date-indexed OHLCV frames.
+
+        Args:
+            frames (dict): Ticker -> DataFrame with OHLCV columns.
+            dtype: Float dtype for the arrays; float32 halves memory.
+            interval (str): Bar interval of the frames.
+
+        Returns:
+            PriceStore: Store over the union of all dates.
+        """
+        frames = {t: f for t, f in frames.items() if f is not None and not f.empty}
+        if not frames:
+            return cls([], pd.DatetimeIndex([]), {}, interval)
+
+        dates = pd.DatetimeIndex(
+            np.unique(np.concatenate([f.index.values for f in frames.values()]))
+        )
+        present = set().union(*(f.columns for f in frames.values()))
+        fields = [field for field in PRICE_FIELDS if field in present]
+        arrays = {
+            field: np.full((len(frames), len(dates)), np.nan, dtype=dtype)
+            for field in fields
+        }
+
+        for row, frame in enumerate(frames.values()):
+            positions = dates.get_indexer(frame.index)
+            for field in fields:
+                if field in frame.columns:
+                    arrays[field][row, positions] = frame[field].to_numpy()
+        return cls(list(frames), dates, arrays, interval)
+
+    @classmethod
+    def from_frame(cls, stocks_df, dtype=np.float64):
+        """
+        Builds a store from a MultiIndex (ticker, field) DataFrame.
+
+        Args:
+            stocks_df (pd.DataFrame): Frame as returned by ``get_stock_data``.
+            dtype: Float dtype for the arrays.
+
+        Returns:
+            PriceStore: Equivalent store.
+        """
+        tickers = stocks_df.columns.get_level_values(0).unique()
+        return cls.from_frames({t: stocks_df[t] for t in tickers}, dtype=dtype)
+
+    def merge(self, other):
+        """
+        Combines two stores, e.g. archived history and the bars after it.
+
+        Args:
+            other (PriceStore): Store at the same interval; its bars replace
+                this store's on dates both have.
+
+        Returns:
+            PriceStore: Store over the union of tickers and dates, with the
+            status of both.
+        """
+        if other.empty:
+            return self
+        if self.empty:
+            return other
+
+        tickers = self.tickers + [t for t in other.tickers if t not in self]
+        dates = self.dates.union(other.dates)
+        positions = {ticker: i for i, ticker in enumerate(tickers)}
+        fields = [f for f in PRICE_FIELDS if f in self.arrays or f in other.arrays]
+        # Keep the inputs' precision (e.g. float32 stores stay float32)
+        dtype = np.result_type(*self.arrays.values(), *other.arrays.values())
+        arrays = {
+            field: np.full((len(tickers), len(dates)), np.nan, dtype=dtype)
+            for field in fields
+        }
+        for store in (self, other):
+            index = np.ix_(
+                [positions[t] for t in store.tickers], dates.get_indexer(store.dates)
+            )
+            for field, values in store.arrays.items():
+                arrays[field][index] = np.where(
+                    np.isnan(values), arrays[field][index], values
+                )
+
+        merged = PriceStore(tickers, dates, arrays, self.interval)
+        merged.status = {**self.status, **other.status}
+        return merged
+
+    @property
+    def empty(self):
+        return not self.tickers or len(self.dates) == 0
+
+    @property
+    def bars_per_year(self):
+        """Bars per year at the store's interval, for annualizing."""
+        return INTERVAL_BARS_PER_YEAR[self.interval]
+
+    @property
+    def fields(self):
+        return list(self.arrays)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def __contains__(self, ticker):
+        return ticker in self._positions
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def index_of(self, ticker):
+        """Row of ``ticker``, or None if not stored."""
+        return self._positions.get(ticker)
+
+    def series(self, ticker, field="Close", valid_only=False):
+        """
+        Zero-copy view of one ticker's field.
+
+        Args:
+            ticker (str): Ticker symbol.
+            field (str): OHLCV field name.
+            valid_only (bool): Trim to the ticker's first..last valid date.
+
+        Returns:
+            np.ndarray: 1-D view aligned with ``dates`` (or the trimmed range).
+        """
+        row = self._positions[ticker]
+        values = self.arrays[field][row]
+        if valid_only:
+            first, last = self.first_valid[row], self.last_valid[row]
+            return values[first : last + 1] if first >= 0 else values[:0]
+        return values
+
+    def valid_range(self, ticker):
+        """
+        First and last dates with a Close price for ``ticker``.
+
+        Returns:
+            tuple: (first, last) Timestamps, or (None, None) if no data.
+        """
+        row = self._positions[ticker]
+        if self.first_valid[row] < 0:
+            return None, None
+        return self.dates[self.first_valid[row]], self.dates[self.last_valid[row]]
+
+    def matrix(self, field="Close", tickers=None):
+        """
+        (dates x tickers) array of one field.
+
+        A view when ``tickers`` is None; selecting a subset copies.
+
+        Args:
+            field (str): OHLCV field name.
+            tickers (list, optional): Tickers to include, in order.
+
+        Returns:
+            np.ndarray: Field values with one column per ticker.
+        """
+        values = self.arrays[field]
+        if tickers is not None:
+            values = values[[self._positions[t] for t in tickers]]
+        return values.T
+
+    def ticker_frame(self, ticker):
+        """Date-indexed OHLCV DataFrame for one ticker over its valid range."""
+        row = self._positions[ticker]
+        first, last = self.first_valid[row], self.last_valid[row]
+        if first < 0:
+            return pd.DataFrame(columns=self.fields)
+        return pd.DataFrame(
+            {field: self.arrays[field][row, first : last + 1] for field in self.fields},
+            index=self.dates[first : last + 1],
+        )
+
+    def to_frame(self):
+        """MultiIndex (ticker, field) DataFrame in ``get_stock_data`` layout."""
+        columns = pd.MultiIndex.from_product(
+            [self.tickers, self.fields], names=["Ticker", "Price"]
+        )
+        data = np.stack([self.arrays[f] for f in self.fields], axis=1)
+        return pd.DataFrame(
+            data.reshape(len(self.tickers) * len(self.fields), -1).T,
+            index=self.dates,
+            columns=columns,
+        )
@@ -0,0 +1,298 @@
+"""
+Intraday quote streaming with incremental updates.
+
+A ``QuoteStream`` polls (or is pushed) 1m/5m bars for a ticker selection and
+appends them to a ``BarBuffer``: preallocated columnar arrays that grow by
+doubling, so each update costs O(new bars) however long the session is. The
+latest-price metrics are kept alongside and read in O(tickers) through
+``QuoteStream.quotes``; nothing is re-downloaded or recomputed from history.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import annotate, timed
+
+logger = logging.getLogger(__name__)
+
+# Streaming settings, overridable through the environment (.env)
+STREAM_POLL_SECONDS = float(os.environ.get("STOCK_STREAM_POLL_SECONDS", 5))
+# Bars kept per stream; the oldest half is dropped when full
+STREAM_MAX_BARS = int(os.environ.get("STOCK_STREAM_MAX_BARS", 4096))
+
+STREAM_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+@dataclass(frozen=True)
+class QuoteSnapshot:
+    """
+    Latest intraday quote per ticker, shaped like ``MarketSnapshot``'s
+    price fields so ``render_metrics`` can show either.
+
+    Attributes:
+        tickers (list): Tickers, in column order.
+        last_price (np.ndarray): Latest close per ticker.
+        prev_price (np.ndarray): Previous session close (or first open).
+        delta_pct (np.ndarray): Change since ``prev_price`` (%).
+        observations (np.ndarray): Bars received per ticker.
+        updated_at (pd.Timestamp): Time of the latest bar, or None.
+    """
+
+    tickers: list
+    last_price: np.ndarray
+    prev_price: np.ndarray
+    delta_pct: np.ndarray
+    observations: np.ndarray
+    updated_at: pd.Timestamp
+
+    def index_of(self, ticker):
+        """Column of ``ticker``, or None if it has no data."""
+        try:
+            return self.tickers.index(ticker)
+        except ValueError:
+            return None
+
+
+class BarBuffer:
+    """
+    Append-only (tickers x bars) OHLCV arrays on a shared time axis.
+
+    Bars arrive in time order; a bar at the latest time replaces it (the
+    forming bar is revised until it closes). Capacity doubles when full, up
+    to ``max_bars``, after which the oldest half is dropped, so appends are
+    amortized O(new bars).
+    """
+
+    def __init__(self, tickers, max_bars=STREAM_MAX_BARS, capacity=256):
+        self.tickers = list(tickers)
+        self.max_bars = max_bars
+        self.size = 0
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._times = np.empty(min(capacity, max_bars), dtype="datetime64[ns]")
+        self._arrays = {
+            field: np.full((len(self.tickers), len(self._times)), np.nan)
+            for field in STREAM_FIELDS
+        }
+        self.last_price = np.full(len(self.tickers), np.nan)
+        self.first_open = np.full(len(self.tickers), np.nan)
+        self.observations = np.zeros(len(self.tickers), dtype=int)
+
+    @property
+    def times(self):
+        """View of the bar times held."""
+        return self._times[: self.size]
+
+    @property
+    def last_time(self):
+        return pd.Timestamp(self._times[self.size - 1]) if self.size else None
+
+    def series(self, ticker, field="Close"):
+        """View of one ticker's field, aligned with ``times``."""
+        return self._arrays[field][self._positions[ticker], : self.size]
+
+    def append(self, frames):
+        """
+        Appends new bars.
+
+        Args:
+            frames (dict): Ticker -> time-indexed OHLCV DataFrame of bars at or
+                after ``last_time``; older bars, and those of a backlog longer
+                than ``max_bars`` that were not kept, are ignored.
+
+        Returns:
+            int: Bars (rows) added to the time axis.
+        """
+        last = self._times[self.size - 1] if self.size else None
+        frames = {
+            ticker: frame
+            for ticker, frame in frames.items()
+            if ticker in self._positions and not frame.empty
+        }
+        if not frames:
+            return 0
+
+        stamps = np.unique(
+            np.concatenate([frame.index.values for frame in frames.values()])
+        ).astype("datetime64[ns]")
+        new = stamps if last is None else stamps[stamps > last]
+        # A backlog longer than the buffer only keeps its newest bars
+        new = new[-(self.max_bars - 1) :]
+        self._reserve(len(new))
+        start = self.size
+        self._times[start : start + len(new)] = new
+        self.size += len(new)
+        # Revisions of the latest bar land on the row before the new ones
+        first = start if last is None else start - 1
+        axis = self._times[first : self.size]
+
+        for ticker, frame in frames.items():
+            row = self._positions[ticker]
+            index = frame.index.values.astype("datetime64[ns]")
+            slots = np.searchsorted(axis, index)
+            # Only bars at a time on the axis: those before the latest bar or
+            # in the part of a long backlog that was not kept have no slot
+            keep = slots < len(axis)
+            keep[keep] = axis[slots[keep]] == index[keep]
+            if not keep.any():
+                continue
+            positions = first + slots[keep]
+            revised = positions[0] < start and not np.isnan(
+                self._arrays["Close"][row, positions[0]]
+            )
+            for field in STREAM_FIELDS:
+                if field in frame.columns:
+                    values = frame[field].to_numpy(dtype=float)[keep]
+                    self._arrays[field][row, positions] = values
+
+            closes = frame["Close"].to_numpy(dtype=float)[keep]
+            valid = ~np.isnan(closes)
+            if valid.any():
+                self.last_price[row] = closes[valid][-1]
+            self.observations[row] += int(valid.sum()) - int(revised)
+            if np.isnan(self.first_open[row]) and "Open" in frame.columns:
+                self.first_open[row] = frame["Open"].to_numpy(dtype=float)[keep][0]
+        return len(new)
+
+    def _reserve(self, extra):
+        """Makes room for ``extra`` more bars, growing or dropping old ones."""
+        needed = self.size + extra
+        if needed <= len(self._times):
+            return
+        if needed > self.max_bars:
+            # Keep the newest half; the cost is spread over the bars since
+            # the last trim. The latest bar stays, as it may still be revised
+            drop = min(self.size - 1, max(needed - self.max_bars, self.size // 2))
+            self._shift(drop)
+            needed -= drop
+        capacity = len(self._times)
+        while capacity < needed:
+            capacity *= 2
+        capacity = max(min(capacity, self.max_bars), needed)
+        if capacity > len(self._times):
+            self._resize(capacity)
+
+    def _shift(self, drop):
+        keep = self.size - drop
+        self._times[:keep] = self._times[drop : self.size]
+        for array in self._arrays.values():
+            array[:, :keep] = array[:, drop : self.size]
+            array[:, keep:] = np.nan
+        self.size = keep
+
+    def _resize(self, capacity):
+        times = np.empty(capacity, dtype="datetime64[ns]")
+        times[: self.size] = self._times[: self.size]
+        self._times = times
+        for field, array in self._arrays.items():
+            grown = np.full((len(self.tickers), capacity), np.nan)
+            grown[:, : self.size] = array[:, : self.size]
+            self._arrays[field] = grown
+
+
+class QuoteStream:
+    """
+    Live intraday bars for a ticker selection.
+
+    ``poll`` asks the provider only for bars at or after the latest one held;
+    ``push`` accepts bars from a push feed (e.g. a websocket callback). Both
+    are thread-safe.
+    """
+
+    def __init__(self, tickers, interval="1m", daily=None, max_bars=STREAM_MAX_BARS):
+        """
+        Args:
+            tickers (list): Ticker symbols.
+            interval (str): Bar length, "1m" or "5m".
+            daily (PriceStore, optional): Daily history; day changes are
+                measured from its last close before the session. Defaults to
+                the session's first open.
+            max_bars (int): Bars kept per ticker.
+        """
+        self.tickers = list(tickers)
+        self.interval = interval
+        self.daily = daily
+        self.buffer = BarBuffer(self.tickers, max_bars=max_bars)
+        self.reference = np.full(len(self.tickers), np.nan)
+        self.polled_at = None
+        self._lock = threading.Lock()
+
+    @timed("stream:poll")
+    def poll(self):
+        """
+        Fetches and appends bars since the latest one held.
+
+        Returns:
+            int: New bars on the time axis.
+        """
+        # Imported here so the app can import this module before first paint
+        from src.data import get_intraday_bars
+
+        frames = get_intraday_bars(
+            self.tickers, self.interval, since=self.buffer.last_time
+        )
+        self.polled_at = time.time()
+        added = self.push(frames)
+        annotate(rows=added, bars=self.buffer.size)
+        return added
+
+    def push(self, frames):
+        """
+        Appends bars received from a feed.
+
+        Args:
+            frames (dict): Ticker -> time-indexed OHLCV DataFrame.
+
+        Returns:
+            int: New bars on the time axis.
+        """
+        with self._lock:
+            first_bars = self.buffer.size == 0
+            added = self.buffer.append(frames)
+            if first_bars and added:
+                self._set_reference()
+        return added
+
+    def quotes(self):
+        """
+        Latest prices and day changes, in O(tickers).
+
+        Returns:
+            QuoteSnapshot: Current quotes.
+        """
+        with self._lock:
+            buffer = self.buffer
+            reference = np.where(
+                np.isnan(self.reference), buffer.first_open, self.reference
+            )
+            with np.errstate(invalid="ignore", divide="ignore"):
+                delta = (buffer.last_price / reference - 1) * 100
+            return QuoteSnapshot(
+                tickers=list(self.tickers),
+                last_price=buffer.last_price.copy(),
+                prev_price=reference,
+                delta_pct=delta,
+                observations=buffer.observations.copy(),
+                updated_at=buffer.last_time,
+            )
+
+    def _set_reference(self):
+        """Previous daily close per ticker, from the day before the session."""
+        # Weekly/monthly tiers end on the session's bar; keep the first open
+        if self.daily is None or self.daily.interval != "1d":
+            return
+        session = self.buffer.last_time.normalize()
+        # Last daily bar strictly before the session date
+        end = self.daily.dates.searchsorted(session)
+        for i, ticker in enumerate(self.tickers):
+            if ticker not in self.daily or end == 0:
+                continue
+            closes = self.daily.series(ticker)[:end]
+            valid = closes[~np.isnan(closes)]
+            if len(valid):
+                self.reference[i] = valid[-1]
@@ -0,0 +1,336 @@
+"""
+Offline tests for the analytics modules.
+
+Checks the vectorized and streaming implementations against pandas:
+    python -m pytest test_analysis.py
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import charts, rolling
+from src.analysis import calculate_volatility, compute_market_snapshot
+from src.lexicon import LexiconScorer, score_compound
+from src.portfolio import CovarianceAccumulator, PortfolioModel
+from src.sentiment import align_returns, daily_sentiment, lagged_correlations
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(7)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (600, 4)), axis=0))
+    prices[200:215, 1] = np.nan
+    return prices
+
+
+def test_snapshot_matches_per_ticker_volatility(prices):
+    index = pd.bdate_range("2024-01-01", periods=len(prices), name="Date")
+    stocks_df = pd.concat(
+        {
+            t: pd.DataFrame({"Close": prices[:, i]}, index=index)
+            for i, t in enumerate("ABCD")
+        },
+        axis=1,
+    ).dropna()
+
+    snapshot = compute_market_snapshot(stocks_df, ["B", "A", "Z"])
+
+    assert snapshot.tickers == ["B", "A"]
+    assert snapshot.index_of("Z") is None
+    assert snapshot.volatility[1] == pytest.approx(
+        calculate_volatility(stocks_df["A"]["Close"])
+    )
+    assert snapshot.last_price[0] == stocks_df["B"]["Close"].iloc[-1]
+
+
+def test_rolling_mean_std_matches_pandas(prices):
+    returns = rolling.simple_returns(prices)
+    frame = pd.DataFrame(returns).rolling(21, min_periods=10)
+
+    mean, std = rolling.rolling_mean_std(returns, 21, min_periods=10)
+
+    np.testing.assert_allclose(mean, frame.mean().to_numpy(), atol=1e-12)
+    np.testing.assert_allclose(std, frame.std().to_numpy(), atol=1e-12)
+
+
+def test_rolling_extremes_match_pandas(prices):
+    frame = pd.DataFrame(prices).rolling(30, min_periods=1)
+
+    np.testing.assert_array_equal(rolling.rolling_max(prices, 30), frame.max())
+    np.testing.assert_array_equal(rolling.rolling_min(prices, 30), frame.min())
+
+
+def test_rolling_beta_and_correlation_match_pandas(prices):
+    returns = rolling.simple_returns(prices)
+    frame = pd.DataFrame(returns)
+    bench = frame[0]
+
+    beta = rolling.rolling_beta(returns, returns[:, 0], 63)
+    corr = rolling.rolling_correlation(returns, returns[:, 0], 63)
+
+    expected_beta = (
+        frame.rolling(63).cov(bench).to_numpy()
+        / bench.rolling(63).var().to_numpy()[:, None]
+    )
+    np.testing.assert_allclose(beta, expected_beta, atol=1e-10)
+    np.testing.assert_allclose(
+        corr, frame.rolling(63).corr(bench).to_numpy(), atol=1e-10
+    )
+
+
+def test_max_drawdown():
+    prices = np.array([100.0, 120.0, 90.0, 110.0, 60.0, 130.0])
+
+    np.testing.assert_allclose(rolling.max_drawdown(prices), [0, 0, -25, -25, -50, -50])
+    # Peak and trough both lie inside each window
+    np.testing.assert_allclose(
+        rolling.max_drawdown(prices, window=2), [0, 0, -25, 0, -45.45, 0], atol=0.01
+    )
+
+
+def test_windowed_max_drawdown_matches_pandas(prices):
+    frame = pd.DataFrame(prices)
+    frame.iloc[5:9, 0] = np.nan
+    expected = frame.rolling(21, min_periods=1).apply(
+        lambda x: np.nanmin(x / np.fmax.accumulate(x) - 1) * 100, raw=True
+    )
+
+    np.testing.assert_allclose(
+        rolling.max_drawdown(frame.to_numpy(), window=21), expected, atol=1e-10
+    )
+
+
+def test_covariance_accumulator_matches_pandas(prices):
+    returns = rolling.simple_returns(prices)
+    frame = pd.DataFrame(returns)
+    accumulator = CovarianceAccumulator(returns.shape[1])
+    accumulator.add(returns)
+
+    np.testing.assert_allclose(accumulator.covariance(), frame.cov(), atol=1e-12)
+    np.testing.assert_allclose(accumulator.correlation(), frame.corr(), atol=1e-10)
+
+
+def test_portfolio_sync_matches_full_rebuild(prices):
+    returns = rolling.simple_returns(prices)
+    dates = pd.bdate_range("2024-01-01", periods=len(prices))
+    model = PortfolioModel("ABCD")
+    model.sync(dates[:500], returns[:500])
+
+    # Window rolls forward by one day; its first return becomes NaN
+    shifted = returns[1:501].copy()
+    shifted[0] = np.nan
+    assert model.sync(dates[1:501], shifted) == 4
+
+    rebuilt = PortfolioModel("ABCD")
+    rebuilt.sync(dates[1:501], shifted)
+    np.testing.assert_allclose(model.covariance(), rebuilt.covariance(), atol=1e-12)
+
+
+def test_portfolio_weights(prices):
+    returns = rolling.simple_returns(prices)
+    model = PortfolioModel("ABCD")
+    model.sync(pd.bdate_range("2024-01-01", periods=len(prices)), returns)
+    cov = model.covariance()
+
+    unconstrained = np.linalg.solve(cov, np.ones(4))
+    np.testing.assert_allclose(
+        model.min_variance_weights(long_only=False),
+        unconstrained / unconstrained.sum(),
+        atol=1e-10,
+    )
+
+    weights = model.risk_parity_weights()
+    assert weights.sum() == pytest.approx(1)
+    np.testing.assert_allclose(model.risk_contributions(weights), 0.25, atol=1e-6)
+    assert model.volatility(weights) == pytest.approx(
+        np.sqrt(weights @ cov @ weights) * 100
+    )
+
+
+def test_risk_parity_warm_starts_after_an_appended_day(prices):
+    returns = rolling.simple_returns(prices)
+    dates = pd.bdate_range("2024-01-01", periods=len(prices))
+    model = PortfolioModel("ABCD")
+    model.sync(dates[:-1], returns[:-1])
+    model.risk_parity_weights()
+
+    # One sweep from the previous solution is already close to the budgets
+    model.sync(dates, returns)
+    weights = model.risk_parity_weights(max_iter=1)
+    np.testing.assert_allclose(model.risk_contributions(weights), 0.25, atol=1e-4)
+
+
+def test_large_line_chart_uses_webgl_within_budget(prices, monkeypatch):
+    index = pd.bdate_range("2024-01-01", periods=len(prices), name="Date")
+    stocks_df = pd.concat(
+        {
+            t: pd.DataFrame({"Close": prices[:, i]}, index=index)
+            for i, t in enumerate("ABCD")
+        },
+        axis=1,
+    )
+    snapshot = compute_market_snapshot(stocks_df, list("ABCD"))
+
+    small = charts.create_line_chart_figure(list("AB"), stocks_df, max_points=100)
+    assert {trace.type for trace in small.data} == {"scatter"}
+
+    monkeypatch.setattr(charts, "WEBGL_POINTS_THRESHOLD", 500)
+    monkeypatch.setattr(charts, "FIGURE_MAX_POINTS", 800)
+    fig = charts.create_line_chart_figure(list("ABCD"), stocks_df, snapshot)
+
+    assert {trace.type for trace in fig.data} == {"scattergl"}
+    assert sum(len(trace.y) for trace in fig.data) <= 800
+    # Extremes survive the reduction
+    assert max(fig.data[0].y) == np.nanmax(prices[:, 0])
+    assert fig.layout.xaxis.type == "date"
+
+    restored = charts.figure_from_json(charts.figure_to_json(fig))
+    np.testing.assert_array_equal(restored.data[3].x, fig.data[3].x)
+    assert restored.layout.title.text == fig.layout.title.text
+
+
+def test_returns_aggregate_to_fit_bar_budget(prices):
+    dates = pd.bdate_range("2024-01-01", periods=len(prices))
+    returns = rolling.simple_returns(prices)
+
+    labels = [
+        charts.aggregate_returns(dates, returns, max_bars)[2]
+        for max_bars in (600, 200, 100, 20)
+    ]
+    _, monthly, _ = charts.aggregate_returns(dates, returns, 100)
+
+    assert labels == ["Daily", "Weekly", "Monthly", "Quarterly"]
+    # Weekly bars are never relabelled as daily, and aggregate on bar count
+    weekly = [
+        charts.aggregate_returns(dates[:120], returns[:120], n, "1wk")[2]
+        for n in (200, 100, 20)
+    ]
+    assert weekly == ["Weekly", "Monthly", "Quarterly"]
+    np.testing.assert_allclose(
+        np.prod(1 + monthly[:, 0]), np.prod(1 + returns[1:, 0]), rtol=1e-9
+    )
+
+
+def test_lexicon_scorer_matches_vader():
+    vader = pytest.importorskip("vaderSentiment.vaderSentiment")
+    analyzer = vader.SentimentIntensityAnalyzer()
+    titles = [
+        "VADER is VERY SMART, handsome, and FUNNY!!!",
+        "Shares are not bad at all",
+        "At least it isn't a horrible quarter.",
+        "Guidance was good, but margins are weak and growth is not great.",
+        "Without a doubt, an excellent idea.",
+        "One of the least compelling launches this year",
+        "Earnings have never been this good???",
+        "No growth or profit in sight",
+        "The stock is kind of a bad ass buy 😁",
+        "Analysts sort of like the deal, yeah right",
+        "",
+        "TESLA RALLIES",
+    ]
+    # Random word salads cover rule combinations headlines rarely hit
+    rng = np.random.default_rng(7)
+    vocabulary = [
+        *list(analyzer.lexicon)[::40],
+        *vader.BOOSTER_DICT,
+        *vader.NEGATE,
+        *("no", "but", "least", "at", "so", "this", "doubt", "or", "the", "of"),
+        *("STRONG", "Weak,", "!", "??", ":)", "shares", "Apple"),
+    ]
+    titles += [
+        " ".join(rng.choice(vocabulary, rng.integers(0, 12))) for _ in range(3000)
+    ]
+
+    expected = [analyzer.polarity_scores(title)["compound"] for title in titles]
+    np.testing.assert_array_equal(LexiconScorer().score(titles), expected)
+    np.testing.assert_array_equal(
+        score_compound(titles, max_workers=2, chunk_size=1000), expected
+    )
+
+
+def test_daily_sentiment_decays_and_aligns_without_lookahead(prices):
+    news = pd.DataFrame(
+        {
+            "symbol": ["AAA", "AAA", "BBB", "AAA"],
+            "publishedAt": pd.to_datetime(
+                [
+                    "2024-01-05 10:00",  # Friday, before the close
+                    "2024-01-06 12:00",  # Saturday: counts for Monday
+                    "2024-01-08 21:30",  # Monday after the close: Tuesday
+                    "2024-01-09 08:00",
+                ],
+                utc=True,
+            ),
+            "sentiment_score": [0.8, -0.4, 0.5, 0.2],
+        }
+    )
+    panel = daily_sentiment(news, half_life=1, cutoff_hour=20)
+
+    assert panel.tickers == ["AAA", "BBB"]
+    assert list(panel.dates.strftime("%a %d")) == ["Fri 05", "Mon 08", "Tue 09"]
+    # Weights halve per day from publish time to each close
+    ages = np.array([4 * 24 + 10, 3 * 24 + 8, 12]) / 24
+    weights = 0.5**ages
+    expected = (weights * [0.8, -0.4, 0.2]).sum() / weights.sum()
+    assert panel.score[-1, 0] == pytest.approx(expected)
+    assert np.isnan(panel.score[1, 1]) and panel.score[2, 1] == 0.5
+
+    dates = pd.bdate_range("2024-01-02", "2024-01-12")
+    columns = pd.MultiIndex.from_product([["AAA", "BBB"], ["Close"]])
+    stocks_df = pd.DataFrame(prices[: len(dates), :2], index=dates, columns=columns)
+    aligned = align_returns(panel, stocks_df).set_index(["Date", "symbol"])
+    sentiment = aligned["sentiment"]
+    assert np.isnan(sentiment[("2024-01-04", "AAA")])
+    assert sentiment[("2024-01-05", "AAA")] == 0.8
+    # BBB's Monday-evening headline is only known from Tuesday's close
+    assert np.isnan(sentiment[("2024-01-08", "BBB")])
+    assert sentiment[("2024-01-12", "BBB")] == 0.5
+    assert sentiment[("2024-01-12", "AAA")] == pytest.approx(expected)
+
+
+def test_lagged_correlations_match_pandas(prices):
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2023-01-02", periods=120)
+    frames = []
+    for symbol, column in (("AAA", 0), ("BBB", 1)):
+        returns = pd.Series(prices[1:121, column] / prices[:120, column] - 1)
+        sentiment = returns.shift(-2) + rng.normal(0, 0.01, 120)
+        sentiment[rng.random(120) < 0.2] = np.nan
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Date": dates,
+                    "symbol": symbol,
+                    "return": returns,
+                    "sentiment": sentiment,
+                }
+            )
+        )
+    aligned = pd.concat(frames).sort_values("Date", kind="stable")
+
+    result = lagged_correlations(aligned, lags=(-1, 0, 2))
+    for symbol, frame in zip(("AAA", "BBB"), frames, strict=True):
+        for lag in (-1, 0, 2):
+            expected = frame["sentiment"].shift(lag).corr(frame["return"])
+            assert result.loc[lag, symbol] == pytest.approx(expected)
+    # Sentiment built from returns two days ahead leads them by two days
+    assert (result.loc[2] > 0.8).all()
+
+
+def test_startup_imports_stay_light():
+    deferred = {"src.data", "src.lexicon", "vaderSentiment", "yfinance"}
+    code = "import sys, app; print(*sys.modules)"
+    loaded = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent,
+    ).stdout.split()
+
+    assert not deferred & set(loaded)
@@ -0,0 +1,582 @@
+"""
+Offline tests for the data layer.
+
+Uses the deterministic FixtureProvider so they run without network access:
+    python -m pytest test_data.py
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import archive as archive_module
+from src import data
+from src.analysis import compute_market_snapshot
+from src.archive import PriceArchive, build_archive
+from src.batch import (
+    DOWNLOAD_MAX_FAILURES,
+    STATUS_NO_DATA,
+    STATUS_OK,
+    download_batched,
+)
+from src.cache import (
+    PRICE_TTL_SECONDS,
+    NewsStore,
+    PriceCache,
+    interval_for_period,
+    resample_ohlcv,
+)
+from src.instrumentation import get_recorder, span
+from src.providers import (
+    FixtureProvider,
+    MarketDataProvider,
+    SymbolError,
+    set_provider,
+)
+from src.report import load_report, read_tickers, run_report
+from src.shared import SharedCache, SQLiteBackend
+from src.store import PriceStore
+from src.stream import BarBuffer, QuoteStream
+
+
+class CountingProvider(FixtureProvider):
+    """Fixture provider that records every download request."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    def download(self, tickers, period=None, start=None):
+        self.calls.append((list(tickers), period, start))
+        return super().download(tickers, period=period, start=start)
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    provider = CountingProvider(end="2026-10-16")
+    set_provider(provider)
+    cache = PriceCache(path=tmp_path / "prices.sqlite")
+    news_store = NewsStore(path=tmp_path / "news.sqlite")
+    shared = SharedCache(SQLiteBackend(tmp_path / "shared.sqlite"))
+    monkeypatch.setattr(data, "get_price_cache", lambda: cache)
+    monkeypatch.setattr(data, "get_news_store", lambda: news_store)
+    monkeypatch.setattr(data, "get_shared_cache", lambda: shared)
+    yield provider
+    set_provider(None)
+
+
+def test_get_stock_data_layout(provider):
+    stocks_df = data.get_stock_data("MSFT TSLA")
+
+    assert list(stocks_df.columns.get_level_values(0).unique()) == ["MSFT", "TSLA"]
+    assert "Close" in stocks_df["MSFT"].columns
+    assert not stocks_df.isna().any().any()
+
+
+def test_get_stock_data_serves_repeat_requests_from_cache(provider):
+    first = data.get_stock_data("MSFT TSLA")
+    second = data.get_stock_data("MSFT TSLA")
+
+    assert len(provider.calls) == 1
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+
+
+def test_get_stock_data_refreshes_only_the_tail(provider):
+    data.get_stock_data("MSFT TSLA")
+    data.get_price_cache().ttl = 0
+    data.get_stock_data("MSFT TSLA AAPL")
+
+    assert provider.calls[1] == (["AAPL"], "2y", None)
+    assert provider.calls[2][0] == ["MSFT", "TSLA"]
+    assert provider.calls[2][2] == "2026-10-16"
+
+
+def test_tail_refresh_redownloads_history_after_a_split(provider, monkeypatch):
+    before = data.get_stock_data("MSFT TSLA")
+    download = provider.download
+
+    def split(tickers, period=None, start=None):
+        # A 2:1 split re-adjusts every MSFT price the provider returns
+        frames = download(tickers, period=period, start=start)
+        frames["MSFT"] = frames["MSFT"].assign(Close=frames["MSFT"]["Close"] / 2)
+        return frames
+
+    monkeypatch.setattr(provider, "download", split)
+    data.get_price_cache().ttl = 0
+    after = data.get_stock_data("MSFT TSLA")
+
+    assert provider.calls[-1] == (["MSFT"], "2y", None)
+    np.testing.assert_allclose(after["MSFT"]["Close"], before["MSFT"]["Close"] / 2)
+    pd.testing.assert_series_equal(after["TSLA"]["Close"], before["TSLA"]["Close"])
+
+
+def test_price_cache_plans_periodic_full_refresh(provider):
+    data.get_stock_data("MSFT")
+    cache = data.get_price_cache()
+    start = pd.Timestamp("2025-01-01")
+
+    assert list(cache.plan(["MSFT"], start, max_age=0)[1]) == ["MSFT"]
+    assert cache.plan(["MSFT"], start, max_age=0, full_age=0)[2] == ["MSFT"]
+
+
+def test_price_cache_tiers_track_daily_bars(tmp_path):
+    history = FixtureProvider(end="2026-10-16").download(["MSFT"], "5y")["MSFT"]
+    cache = PriceCache(path=tmp_path / "prices.sqlite")
+    start = history.index[0]
+    cache.store("MSFT", history.iloc[:-3], covered_from=start)
+    # The tail revises the last stored bars and closes the current week
+    cache.store("MSFT", history.iloc[-5:] * 1.01)
+    daily = cache.load("MSFT", start)
+
+    for interval in ("1wk", "1mo"):
+        tier = cache.load("MSFT", start, interval)
+        pd.testing.assert_frame_equal(tier, resample_ohlcv(daily, interval))
+    weekly = cache.load("MSFT", start, "1wk")
+    assert weekly.index[-1] == history.index[-1]
+    assert weekly["Volume"].sum() == pytest.approx(daily["Volume"].sum())
+
+
+def test_long_periods_read_a_coarser_tier(provider):
+    now = pd.Timestamp("2026-10-16")
+    periods = ("1y", "2y", "10y", "max")
+    assert [interval_for_period(p, now=now) for p in periods] == [
+        "1d",
+        "1d",
+        "1wk",
+        "1mo",
+    ]
+
+    store = data.get_price_store("MSFT TSLA", period="max", interval="1mo")
+    daily = data.get_price_store("MSFT TSLA", period="2y")
+
+    assert len(provider.calls) == 1
+    assert store.interval == "1mo" and daily.interval == "1d"
+    assert len(store.dates) < len(daily.dates)
+    close = store.series("MSFT", valid_only=True)
+    returns = close[1:] / close[:-1] - 1
+    assert compute_market_snapshot(store).volatility[0] == pytest.approx(
+        returns.std(ddof=1) * np.sqrt(12) * 100
+    )
+
+
+@pytest.fixture
+def archive(tmp_path):
+    history = FixtureProvider(end="2026-09-30").download(["MSFT", "TSLA"], "5y")
+    cache = PriceCache(path=tmp_path / "archived.sqlite")
+    for ticker, frame in history.items():
+        cache.store(ticker, frame, covered_from=frame.index[0])
+    build_archive(tmp_path / "archive", ["MSFT", "TSLA", "NONE"], cache, batch_size=1)
+    return PriceArchive(tmp_path / "archive"), cache
+
+
+def test_price_archive_slices_match_the_cache(archive):
+    archive, cache = archive
+    start = pd.Timestamp("2025-01-01")
+
+    assert archive.tickers == ["MSFT", "TSLA"] and "NONE" not in archive
+    assert isinstance(archive.series("MSFT"), np.memmap)
+    for interval in ("1d", "1wk"):
+        store = archive.store(["TSLA", "NONE"], start, interval=interval)
+        assert store.tickers == ["TSLA"] and store.interval == interval
+        pd.testing.assert_frame_equal(
+            store.ticker_frame("TSLA"),
+            cache.load("TSLA", start, interval),
+            check_freq=False,
+            check_names=False,
+        )
+        assert not isinstance(store.matrix("Close"), np.memmap)
+
+
+def test_get_price_store_serves_history_from_the_archive(
+    provider, archive, monkeypatch
+):
+    archive, _ = archive
+    monkeypatch.setattr(data, "get_archive", lambda: archive)
+    store = data.get_price_store("MSFT AAPL TSLA")
+
+    # Only the bars after the archive are downloaded for archived tickers
+    assert sorted(call[0][0] for call in provider.calls) == ["AAPL", "MSFT"]
+    assert (["MSFT", "TSLA"], None, "2026-10-01") in provider.calls
+    assert store.status["MSFT"] == STATUS_OK
+    expected = FixtureProvider(end="2026-10-16").download(["MSFT"], "2y")["MSFT"]
+    np.testing.assert_allclose(store.series("MSFT", valid_only=True), expected["Close"])
+    assert store.dates[-1] == expected.index[-1]
+
+    # A period reaching back before the archive is loaded without it
+    archive.start = pd.Timestamp("2025-01-01")
+    data.get_price_store("TSLA", period="2y", use_cache=False)
+    assert provider.calls[-1] == (["TSLA"], "2y", None)
+
+
+def test_price_store_merge_keeps_float32():
+    history = FixtureProvider(end="2026-10-16").download(["MSFT", "TSLA"], "1mo")
+    head = {t: f.iloc[:-5] for t, f in history.items()}
+    tail = {"MSFT": history["MSFT"].iloc[-5:]}
+    merged = PriceStore.from_frames(head, dtype=np.float32).merge(
+        PriceStore.from_frames(tail, dtype=np.float32)
+    )
+
+    assert merged.matrix("Close").dtype == np.float32
+    np.testing.assert_allclose(
+        merged.series("MSFT"), history["MSFT"]["Close"], rtol=1e-6
+    )
+    assert np.isnan(merged.series("TSLA")[-5:]).all()
+
+
+def test_archive_rebuild_keeps_the_full_history(provider, tmp_path, monkeypatch):
+    (tmp_path / "tickers.txt").write_text("MSFT TSLA")
+    out = tmp_path / "archive"
+    monkeypatch.setattr(archive_module, "ARCHIVE_DIR", str(out))
+    argv = [str(tmp_path / "tickers.txt"), "--out", str(out), "--period", "2y"]
+
+    assert archive_module.main(argv) == 0
+    first = PriceArchive(out)
+    # Sessions served from the archive leave only the tail in the price cache
+    data.get_price_store("MSFT TSLA")
+    assert archive_module.main(argv) == 0
+    rebuilt = PriceArchive(out)
+
+    assert rebuilt.tickers == first.tickers and rebuilt.start == first.start
+    for ticker in first.tickers:
+        np.testing.assert_array_equal(rebuilt.series(ticker), first.series(ticker))
+    assert provider.calls[-1] == (["MSFT", "TSLA"], "2y", None)
+
+
+def test_archive_build_reports_tickers_left_out(provider, tmp_path, monkeypatch):
+    tickers = [f"T{i:02d}" for i in range(12)]
+    (tmp_path / "tickers.txt").write_text(" ".join(tickers))
+    argv = [str(tmp_path / "tickers.txt"), "--out", str(tmp_path / "archive")]
+    argv += ["--period", "1y"]
+    # An LRU bound far below the universe must not drop earlier batches
+    monkeypatch.setattr(PriceCache.__init__, "__defaults__", (PRICE_TTL_SECONDS, 2))
+
+    assert archive_module.main([*argv, "--batch-size", "2"]) == 0
+    assert PriceArchive(tmp_path / "archive").tickers == tickers
+
+    download = provider.download
+    monkeypatch.setattr(
+        provider,
+        "download",
+        lambda batch, **kw: {
+            t: f for t, f in download(batch, **kw).items() if t != "T03"
+        },
+    )
+    assert archive_module.main(argv) == 1
+    assert "T03" not in PriceArchive(tmp_path / "archive")
+
+
+def test_concurrent_sessions_share_one_download(provider, monkeypatch):
+    provider.latency = 0.2
+    fetch = provider.news
+    news_calls = []
+    monkeypatch.setattr(provider, "news", lambda t: news_calls.append(t) or fetch(t))
+
+    def session(_):
+        return data.get_stock_data("MSFT TSLA"), data.get_stock_news(["MSFT"])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(session, range(8)))
+
+    assert [tickers for tickers, _, _ in provider.calls] == [["MSFT", "TSLA"]]
+    assert news_calls == ["MSFT"]
+    for stocks_df, news_df in results:
+        pd.testing.assert_frame_equal(stocks_df, results[0][0], check_freq=False)
+        assert len(news_df) == len(results[0][1])
+
+
+def test_get_stock_data_rejects_empty_input(provider):
+    assert data.get_stock_data("  ") is None
+
+
+def test_get_stock_news(provider):
+    news_df = data.get_stock_news(["MSFT", "TSLA"])
+
+    assert set(news_df["symbol"]) == {"MSFT", "TSLA"}
+    assert news_df["publishedAt"].notna().all()
+    assert news_df["url"].notna().all()
+
+
+def test_get_stock_news_fetches_concurrently_in_order(provider):
+    provider.latency = 0.2
+    tickers = ["MSFT", "TSLA", "AAPL", "GOOGL", "AMZN", "META"]
+
+    start = time.monotonic()
+    news_df = data.get_stock_news(tickers, max_workers=6)
+
+    assert time.monotonic() - start < 0.2 * len(tickers) / 2
+    assert list(news_df["symbol"].unique()) == tickers
+
+
+def test_get_stock_news_isolates_failing_tickers(provider, monkeypatch):
+    fetch = provider.news
+
+    def flaky(ticker):
+        if ticker == "TSLA":
+            raise RuntimeError("throttled")
+        if ticker == "AAPL":
+            time.sleep(1)
+        return fetch(ticker)
+
+    monkeypatch.setattr(provider, "news", flaky)
+    news_df = data.get_stock_news(["MSFT", "TSLA", "AAPL"], timeout=0.3)
+
+    assert set(news_df["symbol"]) == {"MSFT"}
+
+
+def test_get_stock_news_times_out_each_ticker_from_its_own_start(provider, monkeypatch):
+    fetch = provider.news
+    release = threading.Event()
+
+    def hanging(ticker):
+        if ticker == "HANG":
+            release.wait(5)
+        return fetch(ticker)
+
+    monkeypatch.setattr(provider, "news", hanging)
+    tickers = ["HANG", "MSFT", "TSLA", "AAPL", "GOOGL", "AMZN"]
+    start = time.monotonic()
+    news_df = data.get_stock_news(tickers, max_workers=2, timeout=0.5)
+    elapsed = time.monotonic() - start
+    release.set()
+
+    # One timeout, not one per round of workers (3 x 0.5s)
+    assert 0.5 <= elapsed < 1.0
+    assert set(news_df["symbol"]) == set(tickers[1:])
+
+
+def test_get_stock_news_serves_fresh_tickers_from_cache(provider, monkeypatch):
+    data.get_stock_news(["MSFT", "TSLA"])
+    fetched = []
+    fetch = provider.news
+    monkeypatch.setattr(provider, "news", lambda t: fetched.append(t) or fetch(t))
+
+    news_df = data.get_stock_news(["MSFT", "AAPL", "TSLA"])
+
+    assert fetched == ["AAPL"]
+    assert list(news_df["symbol"].unique()) == ["MSFT", "AAPL", "TSLA"]
+
+
+def test_get_stock_news_ingests_only_new_items(provider, monkeypatch):
+    data.get_stock_news(["MSFT"])
+    fetch = provider.news
+    latest = {
+        "title": "MSFT beats earnings estimates",
+        "providerPublishTime": int(pd.Timestamp("2026-10-16 12:00Z").timestamp()),
+        "link": "https://example.com/msft/latest",
+    }
+    monkeypatch.setattr(provider, "news", lambda t: [latest, *fetch(t)])
+    scored = []
+    score = data.score_titles
+    monkeypatch.setattr(data, "score_titles", lambda t: scored.append(t) or score(t))
+
+    news_df = data.get_stock_news(["MSFT"], max_age=0)
+
+    assert scored == [[latest["title"]]]
+    assert news_df["title"].iloc[0] == latest["title"]
+    assert news_df["publishedAt"].iloc[0] == pd.Timestamp("2026-10-16 12:00Z")
+    assert news_df["sentiment_score"].notna().all()
+    assert not news_df["title"].duplicated().any()
+
+
+def test_get_stock_news_normalizes_mixed_timestamps(provider, monkeypatch):
+    items = [
+        {"id": "a", "content": {"title": "Nested", "pubDate": "2026-10-16T09:30:00Z"}},
+        {"title": "Epoch", "providerPublishTime": 1792143000, "link": "b"},
+        {"title": "Offset", "pubDate": "2026-10-15T10:00:00+02:00", "link": "c"},
+        {"title": "Undated", "link": "d"},
+    ]
+    monkeypatch.setattr(provider, "news", lambda t: items)
+
+    news_df = data.get_stock_news(["MSFT"])
+
+    assert str(news_df["publishedAt"].dtype) == "datetime64[ns, UTC]"
+    published = dict(zip(news_df["title"], news_df["publishedAt"], strict=True))
+    assert published["Nested"] == pd.Timestamp("2026-10-16 09:30Z")
+    assert published["Epoch"] == pd.Timestamp(1792143000, unit="s", tz="UTC")
+    assert published["Offset"] == pd.Timestamp("2026-10-15 08:00Z")
+    assert pd.isna(published["Undated"])
+
+
+def test_pipeline_stages_are_instrumented(provider):
+    recorder = get_recorder()
+    recorder.clear()
+
+    with span("test:run") as root:
+        data.get_stock_news(["MSFT", "TSLA"])
+        data.get_stock_news(["MSFT", "TSLA"])
+
+    trace = [(depth, s.stage, s.cache) for depth, s in recorder.trace(root.span_id)]
+    assert trace[1] == (1, "news:load", "miss")
+    assert (2, "news:ingest", None) in trace
+    assert trace[-1] == (1, "news:load", "hit")
+    ingest = recorder.spans("news:ingest")
+    assert sum(s.rows for s in ingest) == 8
+    assert 'stock_stage_cache_total{stage="news:load",result="hit"} 1' in (
+        recorder.to_prometheus()
+    )
+
+
+def test_get_price_store_keeps_other_tickers_on_gaps(provider, monkeypatch):
+    download = provider.download
+
+    def with_gap(tickers, period=None, start=None):
+        frames = download(tickers, period=period, start=start)
+        if "TSLA" in frames:
+            frames["TSLA"] = frames["TSLA"].iloc[:-5]
+        return frames
+
+    monkeypatch.setattr(provider, "download", with_gap)
+    store = data.get_price_store("MSFT TSLA")
+
+    msft, tsla = store.series("MSFT"), store.series("TSLA")
+    assert not np.isnan(msft).any()
+    assert np.isnan(tsla[-5:]).all()
+    assert store.valid_range("TSLA")[1] == store.dates[-6]
+    assert np.shares_memory(msft, store.matrix("Close"))
+
+
+def test_download_batched_isolates_bad_symbols(provider, monkeypatch):
+    download = provider.download
+
+    def flaky(tickers, period=None, start=None):
+        if "BAD" in tickers:
+            raise SymbolError("invalid symbol")
+        return download(tickers, period=period, start=start)
+
+    monkeypatch.setattr(provider, "download", flaky)
+    tickers = ["MSFT", "TSLA", "BAD", "AAPL", "GOOGL"]
+    result = download_batched(tickers, period="1y", chunk_size=2, sleep=lambda s: None)
+
+    assert result.failed == ["BAD"]
+    assert set(result.frames) == {"MSFT", "TSLA", "AAPL", "GOOGL"}
+    assert result.status["AAPL"] == "ok"
+
+
+def test_download_batched_does_not_multiply_throttled_requests(provider, monkeypatch):
+    calls, sleeps = [], []
+
+    def throttled(tickers, period=None, start=None):
+        calls.append(list(tickers))
+        raise RuntimeError("Too Many Requests")
+
+    monkeypatch.setattr(provider, "download", throttled)
+    tickers = [f"T{i:03d}" for i in range(500)]
+
+    # A throttled chunk fails after its retries instead of being bisected
+    result = download_batched(tickers[:50], period="1y", sleep=sleeps.append)
+    assert len(calls) == 3 and sum(sleeps) < 5
+    assert result.failed == tickers[:50] and not result.frames
+
+    # Across chunks, the download stops at the shared failure cap
+    calls.clear()
+    result = download_batched(tickers, period="1y", sleep=sleeps.append)
+    assert len(calls) == DOWNLOAD_MAX_FAILURES
+    assert all(len(chunk) == 50 for chunk in calls)
+    assert result.failed == tickers
+
+
+def test_download_batched_reports_all_nan_tickers_as_no_data(provider, monkeypatch):
+    download = provider.download
+
+    def delisted(tickers, period=None, start=None):
+        frames = download(tickers, period=period, start=start)
+        frames["TSLA"] = frames["TSLA"] * np.nan
+        return frames
+
+    monkeypatch.setattr(provider, "download", delisted)
+    result = download_batched(["MSFT", "TSLA"], period="1y")
+
+    assert set(result.frames) == {"MSFT"}
+    assert result.status == {"MSFT": STATUS_OK, "TSLA": STATUS_NO_DATA}
+
+
+def test_run_report_round_trip(provider, tmp_path):
+    ticker_file = tmp_path / "tickers.txt"
+    ticker_file.write_text("# universe\nmsft, tsla AAPL\nMSFT  # again\n")
+    tickers = read_tickers(ticker_file)
+
+    manifest = run_report(tickers, tmp_path / "out", chunk_size=2, max_workers=1)
+    _, metrics, sentiment = load_report(tmp_path / "out")
+
+    assert tickers == ["MSFT", "TSLA", "AAPL"]
+    assert manifest["reported"] == 3 and manifest["missing"] == []
+    assert list(metrics["ticker"]) == tickers
+    assert (metrics["max_drawdown_pct"] <= 0).all()
+    assert list(sentiment["ticker"]) == tickers
+    assert (sentiment["headlines"] == 4).all()
+
+
+def test_quote_stream_appends_only_new_bars(provider):
+    provider.replay_start, provider.replay_step = 10, 3
+    store = data.get_price_store("MSFT TSLA", period="1mo")
+    stream = QuoteStream(["MSFT", "TSLA"], "1m", daily=store)
+
+    added = [stream.poll() for _ in range(4)]
+    session = provider.intraday(["MSFT"])["MSFT"]
+    full = provider._session("MSFT", "1m").iloc[:19]
+    quotes = stream.quotes()
+
+    assert added == [10, 3, 3, 3]
+    assert len(session) == 10
+    np.testing.assert_array_equal(stream.buffer.times, full.index.values)
+    np.testing.assert_allclose(stream.buffer.series("MSFT"), full["Close"])
+    assert quotes.observations.tolist() == [19, 19]
+    # Day change is measured from the previous daily close
+    previous_close = store.series("MSFT")[-2]
+    assert quotes.delta_pct[0] == pytest.approx(
+        (full["Close"].iloc[-1] / previous_close - 1) * 100
+    )
+
+
+def test_bar_buffer_drops_bars_trimmed_from_a_long_backlog():
+    times = pd.date_range("2026-10-16 14:30", periods=13, freq="min")
+    bars = pd.DataFrame({"Open": np.arange(13.0), "Close": np.arange(13.0)}, times)
+    buffer = BarBuffer(["A", "B"], max_bars=5, capacity=2)
+    buffer.append({"A": bars.iloc[:3], "B": bars.iloc[:3]})
+
+    # Only the newest 4 backlog bars fit; B's 14:35 bar is in the dropped gap
+    buffer.append({"A": bars.iloc[3:], "B": bars.iloc[5:6].assign(Close=99.0)})
+
+    # The latest held bar stays, as it may still be revised
+    np.testing.assert_array_equal(buffer.times, times[[2, 9, 10, 11, 12]].values)
+    assert np.isnan(buffer.series("B")[1:]).all()
+    assert buffer.last_price[1] == 2.0
+    assert buffer.series("A")[-1] == buffer.last_price[0] == 12.0
+
+
+def test_providers_must_implement_download_and_news():
+    class NoNews(MarketDataProvider):
+        def download(self, tickers, period=None, start=None):
+            return {}
+
+    class DailyOnly(NoNews):
+        def news(self, ticker):
+            return []
+
+    with pytest.raises(TypeError):
+        NoNews()
+    assert DailyOnly().intraday(["MSFT"], since=pd.Timestamp("2026-10-16")) == {}
+
+
+def test_bar_buffer_revises_forming_bar_and_trims_oldest():
+    times = pd.date_range("2026-10-16 14:30", periods=10, freq="min")
+    bars = pd.DataFrame({"Open": np.arange(10.0), "Close": np.arange(10.0)}, times)
+    buffer = BarBuffer(["A"], max_bars=8, capacity=2)
+
+    assert buffer.append({"A": bars.iloc[:4]}) == 4
+    revised = bars.iloc[3:4].assign(Close=99.0)
+    assert buffer.append({"A": revised}) == 0
+    assert buffer.series("A")[-1] == 99.0
+    assert buffer.observations[0] == 4
+
+    # Polls resend the forming bar along with the new ones
+    assert buffer.append({"A": bars.iloc[3:]}) == 6
+    # Full at 8 bars: the oldest were dropped, the newest kept in order
+    assert buffer.size <= 8
+    np.testing.assert_array_equal(buffer.times, times[-buffer.size :].values)
+    np.testing.assert_array_equal(buffer.series("A"), np.arange(10 - buffer.size, 10))
+    assert buffer.last_price[0] == 9.0
@@ -0,0 +1,128 @@
+"""
+Tests for the shared cache tier (src/shared.py).
+
+Two SharedCache instances on one SQLite file stand in for two processes.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.shared import SharedCache, SQLiteBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteBackend(tmp_path / "shared.sqlite")
+
+
+def test_entries_expire_per_key(backend):
+    cache = SharedCache(backend)
+    cache.set("short", 1, ttl=0.05)
+    cache.set("long", 2, ttl=60)
+    time.sleep(0.1)
+
+    assert cache.get_many(["short", "long"]) == {"long": 2}
+    assert cache.get_many(["long"], max_age=0) == {}
+
+
+def test_threads_coalesce_on_one_fetch(backend):
+    cache = SharedCache(backend)
+    calls = []
+
+    def fetch(keys):
+        calls.append(keys)
+        time.sleep(0.2)
+        return {key: key.upper() for key in keys}
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                cache.get_or_fetch_many(["a", "b"], fetch, 60)
+            )
+        )
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [["a", "b"]]
+    assert results == [{"a": "A", "b": "B"}] * 6
+
+
+def test_processes_wait_on_the_lease_holder(backend):
+    leader = SharedCache(backend, poll=0.01)
+    follower = SharedCache(backend, poll=0.01)
+    calls = []
+
+    def fetch(keys):
+        calls.append(keys)
+        time.sleep(0.2)
+        return {key: len(calls) for key in keys if key != "missing"}
+
+    thread = threading.Thread(
+        target=leader.get_or_fetch_many, args=(["a", "missing"], fetch, 60)
+    )
+    thread.start()
+    time.sleep(0.05)
+    result = follower.get_or_fetch_many(["a"], fetch, 60, max_age=0)
+    thread.join()
+
+    assert result == {"a": 1}
+    assert calls == [["a", "missing"]]
+    # The leader found no value for "missing"; the follower claims it next time
+    assert follower.get_or_fetch_many(["missing"], fetch, 60) == {}
+    assert calls[-1] == ["missing"]
+
+
+def test_fetch_errors_reach_every_waiter(backend):
+    cache = SharedCache(backend)
+    started = threading.Event()
+
+    def fetch(keys):
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("throttled")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_fetch_many(["a"], fetch, 60)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    first = threading.Thread(target=call)
+    first.start()
+    started.wait()
+    call()
+    first.join()
+
+    assert errors == ["throttled", "throttled"]
+
+
+def test_figures_are_built_once_across_processes(backend, monkeypatch):
+    from src import charts, shared
+
+    builds = []
+
+    def build():
+        builds.append(1)
+        return charts.create_correlation_heatmap_figure(
+            ["A", "B"], np.array([[1.0, 0.5], [0.5, 1.0]])
+        )
+
+    figures = []
+    for _ in range(2):
+        # A fresh instance per call stands in for another process
+        monkeypatch.setattr(shared, "get_shared_cache", lambda: SharedCache(backend))
+        figures.append(charts.get_or_build_figure("correlation", ("A", "B"), build, 60))
+
+    assert len(builds) == 1
+    np.testing.assert_array_equal(figures[1].data[0].z, figures[0].data[0].z)
+    assert figures[1].layout.title.text == figures[0].layout.title.text